@@ -0,0 +1,63 @@
+"""
+Measures the cost of turning many keys into request keys.
+
+The per key path is how the batch operations used to convert keys: floats
+encoded with encode_numbers over the whole key list, then convert_key called
+for each key. The bulk path is BaseTable.convert_keys. Building a projection
+with serialize_attributes for every request is reported alongside, since it
+is now memoized per attribute tuple. Run with:
+
+    python benchmarks/bulk_keys.py [key_count]
+"""
+import sys
+import timeit
+
+from dynamatic.core import BaseTable, KeyDefinition
+from dynamatic.enums import NUMERIC
+from dynamatic.results import encode_numbers
+
+
+class EventTable(BaseTable):
+    name = "events"
+    partition_key = KeyDefinition("pk")
+    sort_key = KeyDefinition("sk", KeyDefinition.DATATYPE.NUMBER)
+
+
+def make_keys(count: int) -> list:
+    return [(f"tenant#{i % 100}", i * 0.5) for i in range(count)]
+
+
+def main(count: int = 1000000):
+    table = EventTable()
+    keys = make_keys(count)
+    attributes = ["pk", "sk", "status", "amount"]
+
+    def per_key():
+        return [table.convert_key(key) for key in encode_numbers(keys)]
+
+    def bulk():
+        return table.convert_keys(keys, NUMERIC.FLOAT)
+
+    assert per_key() == bulk()
+    print(f"Converting {count} keys")
+    for label, convert in (("per key", per_key), ("bulk", bulk)):
+        seconds = min(timeit.repeat(convert, number=1, repeat=3))
+        print(f"{label:>8}: {seconds:.3f}s, {seconds / count * 1e9:.0f}ns per key")
+
+    # One projection per BatchGetItem request of 100 keys
+    requests = count // 100
+    seconds = min(
+        timeit.repeat(
+            lambda: [table.serialize_attributes(attributes) for _ in range(requests)],
+            number=1,
+            repeat=3,
+        )
+    )
+    print(
+        f"Projections for {requests} requests: {seconds / requests * 1e9:.0f}ns "
+        f"per request"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,65 @@
+"""
+Measures the cost of decoding items under each numeric policy.
+
+Items are decoded from the DynamoDB wire format the same way the boto3
+resource does it, then converted according to the policy. The cost of summing
+a numeric attribute over the decoded items is reported alongside, since that
+is where Decimal values are most expensive. Run with:
+
+    python benchmarks/numeric_decoding.py [item_count]
+"""
+import sys
+import timeit
+
+from boto3.dynamodb.types import TypeDeserializer
+
+from dynamatic.enums import NUMERIC
+from dynamatic.results import decode_numbers
+
+
+def make_items(count: int) -> list:
+    return [
+        {
+            "pk": {"S": f"tenant#{i % 100}"},
+            "sk": {"S": f"event#{i}"},
+            "count": {"N": str(i)},
+            "amount": {"N": f"{i}.25"},
+            "ratio": {"N": "0.3333333333"},
+            "totals": {"L": [{"N": str(i * n)} for n in range(5)]},
+        }
+        for i in range(count)
+    ]
+
+
+def main(count: int = 100000):
+    deserializer = TypeDeserializer()
+    wire_items = make_items(count)
+
+    def decode(numeric):
+        return [
+            decode_numbers(
+                {k: deserializer.deserialize(v) for k, v in wire_item.items()},
+                numeric,
+            )
+            for wire_item in wire_items
+        ]
+
+    print(f"Decoding {count} items")
+    for numeric in NUMERIC:
+        seconds = min(timeit.repeat(lambda: decode(numeric), number=1, repeat=3))
+        items = decode(numeric)
+        summing = min(
+            timeit.repeat(
+                lambda: sum(item["amount"] * item["ratio"] for item in items),
+                number=1,
+                repeat=3,
+            )
+        )
+        print(
+            f"{numeric.value:>8}: decode {seconds / count * 1e6:.2f}us per item, "
+            f"multiply-sum {summing / count * 1e6:.3f}us per item"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
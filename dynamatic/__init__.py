@@ -6,13 +6,20 @@ from .core import (
     Stream,
     SSESpecification,
     ProvisionedThroughput,
+    ConnectionConfig,
 )
 from .indexes import LocalSecondaryIndex, GlobalSecondaryIndex
 from .table_mixins import (
     CreateMixin,
     GetMixin,
+    BatchGetMixin,
+    BatchWriteMixin,
     QueryMixin,
     ScanMixin,
+    CollectionMixin,
+    PlanMixin,
+    AsyncMixin,
+    CapacityMixin,
     PutMixin,
     DeleteMixin,
     UpdateMixin,
@@ -22,8 +29,14 @@ from .table_mixins import (
 class Table(
     CreateMixin,
     GetMixin,
+    BatchGetMixin,
+    BatchWriteMixin,
     QueryMixin,
     ScanMixin,
+    CollectionMixin,
+    PlanMixin,
+    AsyncMixin,
+    CapacityMixin,
     PutMixin,
     DeleteMixin,
     UpdateMixin,
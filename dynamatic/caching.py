@@ -0,0 +1,51 @@
+from __future__ import annotations
+from typing import Hashable
+import collections
+import threading
+import time
+
+
+class NegativeCache:
+    """
+    Remembers keys found to have no item for ttl seconds, so repeated
+    existence checks for them skip DynamoDB. Holds up to max_size keys,
+    dropping the oldest first. Writes made through the table remove the
+    keys they create; writes made elsewhere show up once the entry expires
+    """
+
+    def __init__(self, ttl: float = 5.0, max_size: int = 100000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self._expiries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            expiry = self._expiries.get(key)
+            if expiry is None:
+                return False
+            if expiry <= time.monotonic():
+                del self._expiries[key]
+                return False
+            self.hits += 1
+            return True
+
+    def size(self) -> int:
+        """Returns how many keys are held, expired ones included"""
+        return len(self._expiries)
+
+    def add(self, key: Hashable):
+        with self._lock:
+            self._expiries.pop(key, None)
+            self._expiries[key] = time.monotonic() + self.ttl
+            while len(self._expiries) > self.max_size:
+                self._expiries.popitem(last=False)
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._expiries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._expiries.clear()
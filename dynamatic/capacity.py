@@ -0,0 +1,226 @@
+from __future__ import annotations
+from decimal import Decimal
+from typing import Any, Dict, List, Union
+import math
+
+from boto3.dynamodb.types import Binary
+
+from .expressions import (
+    UpdateExpression,
+    Set,
+    Increase,
+    Decrease,
+    Append,
+    Prepend,
+    Remove,
+    Add,
+    Delete,
+)
+
+INDEX_ENTRY_OVERHEAD = 100
+
+
+def _number_size(value: Union[int, float, Decimal]) -> int:
+    if isinstance(value, float):
+        value = Decimal(repr(value))
+    sign, digits, _ = Decimal(value).normalize().as_tuple()
+    size = (len(digits) + 1) // 2 + 1
+    return size + 1 if sign and any(digits) else size
+
+
+def value_size(value: Any) -> int:
+    """Returns the size DynamoDB bills for a single attribute value"""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, float, Decimal)):
+        return _number_size(value)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, Binary):
+        return len(value.value)
+    if isinstance(value, (set, frozenset)):
+        return sum(value_size(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return 3 + sum(1 + value_size(v) for v in value)
+    if isinstance(value, dict):
+        return 3 + sum(1 + item_size_entry(k, v) for k, v in value.items())
+    raise TypeError(f"Unsupported type for size estimation: {type(value)}")
+
+
+def item_size_entry(name: str, value: Any) -> int:
+    return len(name.encode("utf-8")) + value_size(value)
+
+
+def item_size(item: dict) -> int:
+    """Returns the size of an item in bytes, following DynamoDB's size rules"""
+    return sum(item_size_entry(k, v) for k, v in item.items() if v is not None)
+
+
+def write_units(size: int) -> int:
+    """Write capacity units for an item of the given size (1 WCU per 1KB)"""
+    return max(1, math.ceil(size / 1024))
+
+
+def read_units(size: int, consistent_read: bool = False) -> float:
+    """Read capacity units for an item of the given size (1 RCU per 4KB)"""
+    units = max(1, math.ceil(size / 4096))
+    return units if consistent_read else units / 2
+
+
+def _top_level(path: str) -> str:
+    return path.split(".")[0].split("[")[0]
+
+
+def apply_updates(item: dict, updates: List[UpdateExpression]) -> dict:
+    """
+    Approximates the item that results from applying updates to item. Only
+    top-level attributes are modelled; values only matter for their size
+    """
+    item = dict(item)
+    for update in updates:
+        name = _top_level(update.path)
+        current = item.get(name)
+        if isinstance(update, Remove):
+            item.pop(name, None)
+        elif isinstance(update, (Increase, Decrease, Add)) and isinstance(
+            current, (int, float, Decimal)
+        ):
+            sign = -1 if isinstance(update, Decrease) else 1
+            item[name] = Decimal(str(current)) + sign * Decimal(str(update.value))
+        elif isinstance(update, Add) and isinstance(current, (set, frozenset)):
+            item[name] = set(current) | set(update.value)
+        elif isinstance(update, Delete):
+            if isinstance(current, (set, frozenset)):
+                item[name] = set(current) - set(update.value)
+        elif isinstance(update, Append) and isinstance(current, list):
+            item[name] = current + list(update.value)
+        elif isinstance(update, Prepend) and isinstance(current, list):
+            item[name] = list(update.value) + current
+        else:
+            item[name] = update.value
+    return item
+
+
+class _IndexDefinition:
+    def __init__(self, spec: dict, table_keys: List[str]):
+        self.name = spec["IndexName"]
+        self.keys = [k["AttributeName"] for k in spec["KeySchema"]]
+        projection = spec["Projection"]
+        self.projects_all = projection["ProjectionType"] == "ALL"
+        self.projected = set(self.keys) | set(table_keys)
+        self.projected |= set(projection.get("NonKeyAttributes", []))
+
+    def contains(self, item: dict) -> bool:
+        return item is not None and all(item.get(k) is not None for k in self.keys)
+
+    def entry(self, item: dict) -> dict:
+        if self.projects_all:
+            return item
+        return {k: v for k, v in item.items() if k in self.projected}
+
+    def entry_units(self, item: dict) -> int:
+        return write_units(item_size(self.entry(item)) + INDEX_ENTRY_OVERHEAD)
+
+    def touches(self, attributes: set) -> bool:
+        return self.projects_all or bool(attributes & self.projected)
+
+    def write_units(self, old: dict, new: dict, touched: set = None) -> int:
+        """
+        Index write units for replacing old with new. When the old item is
+        unknown (touched attributes only), key changes are assumed to move the
+        entry (a delete and a put), which is the worst case
+        """
+        if touched is not None:
+            if touched & set(self.keys):
+                return 2 * self.entry_units(new)
+            return self.entry_units(new) if self.touches(touched) else 0
+
+        in_old, in_new = self.contains(old), self.contains(new)
+        if in_old and in_new:
+            if any(old.get(k) != new.get(k) for k in self.keys):
+                return self.entry_units(old) + self.entry_units(new)
+            return self.entry_units(new) if self.entry(old) != self.entry(new) else 0
+        if in_old:
+            return self.entry_units(old)
+        if in_new:
+            return self.entry_units(new)
+        return 0
+
+
+class CapacityEstimate:
+    def __init__(self, size: int, table_units: int, index_units: Dict[str, int]):
+        self.size = size
+        self.table_units = table_units
+        self.index_units = index_units
+
+    @property
+    def total_units(self) -> int:
+        return self.table_units + sum(self.index_units.values())
+
+    def __repr__(self):
+        return (
+            f"CapacityEstimate(size={self.size}, table_units={self.table_units}, "
+            f"index_units={self.index_units})"
+        )
+
+
+class CapacityEstimator:
+    """
+    Estimates the write capacity units a put or update will consume, including
+    the writes it causes on every secondary index, from a table's export()
+    """
+
+    def __init__(self, spec: dict):
+        self.key_names = [k["AttributeName"] for k in spec["KeySchema"]]
+        self.indexes = [
+            _IndexDefinition(index, self.key_names)
+            for index in spec.get("LocalSecondaryIndexes", [])
+            + spec.get("GlobalSecondaryIndexes", [])
+        ]
+
+    def _estimate(self, old: dict, new: dict, touched: set = None):
+        size = item_size(new)
+        table_size = max(size, item_size(old)) if old else size
+        index_units = {
+            index.name: index.write_units(old, new, touched) for index in self.indexes
+        }
+        return CapacityEstimate(size, write_units(table_size), index_units)
+
+    def put(self, item: dict, old_item: dict = None) -> CapacityEstimate:
+        """Estimates a put. Without old_item the put is assumed to be an insert"""
+        return self._estimate(old_item, item)
+
+    def update(
+        self,
+        key: dict,
+        updates: Union[Dict[str, Any], UpdateExpression, List[UpdateExpression]],
+        old_item: dict = None,
+    ) -> CapacityEstimate:
+        """
+        Estimates an update of the item with the given key (as returned by
+        convert_key). Without old_item the estimate is based on the key and
+        the updated values only
+        """
+        if isinstance(updates, UpdateExpression):
+            updates = [updates]
+        if isinstance(updates, dict):
+            updates = [Set(k, v) for k, v in updates.items()]
+        if old_item is not None:
+            return self._estimate(old_item, apply_updates(old_item, updates))
+        touched = {_top_level(update.path) for update in updates}
+        return self._estimate(None, apply_updates(key, updates), touched)
+
+
+def estimate_put(spec: dict, item: dict, old_item: dict = None) -> CapacityEstimate:
+    return CapacityEstimator(spec).put(item, old_item)
+
+
+def estimate_update(
+    spec: dict,
+    key: dict,
+    updates: Union[Dict[str, Any], UpdateExpression, List[UpdateExpression]],
+    old_item: dict = None,
+) -> CapacityEstimate:
+    return CapacityEstimator(spec).update(key, updates, old_item)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+from decimal import Decimal
+from typing import Any, Callable, Hashable
+import asyncio
+import copy
+import functools
+import threading
+
+from boto3.dynamodb.conditions import AttributeBase, ConditionBase
+from boto3.dynamodb.types import Binary
+
+
+def freeze(value: Any) -> Hashable:
+    """
+    Converts a request (dicts, lists, sets and condition objects included)
+    into an equivalent hashable value so identical requests compare equal
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    if isinstance(value, ConditionBase):
+        values = value.get_expression()["values"]
+        return (value.__class__.__name__, freeze(values))
+    if isinstance(value, AttributeBase):
+        return (value.__class__.__name__, value.name)
+    if isinstance(value, Binary):
+        return value.value
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return value
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.followers = 0
+        # A copy of the result taken before the leader returns it, so the
+        # leader's caller can change its result while followers copy theirs
+        self.result = None
+        self.error = None
+
+
+class _AsyncCall:
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: while a call for a key is in flight,
+    later callers with the same key wait for it and receive a copy of its
+    result (or its exception) instead of making their own call. The caller
+    that made the call gets the original
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._async_calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, call: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.requests += 1
+            pending = self._calls.get(key)
+            if pending is None:
+                pending = self._calls[key] = _Call()
+                leader = True
+            else:
+                pending.followers += 1
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return copy.deepcopy(pending.result)
+
+        try:
+            result = call()
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            # No follower can join anymore, they copy the snapshot
+            if pending.followers and pending.error is None:
+                try:
+                    pending.result = copy.deepcopy(result)
+                except Exception as e:
+                    pending.error = e
+            pending.done.set()
+        return result
+
+    async def do_async(self, key: Hashable, call: Callable[[], Any]) -> Any:
+        """
+        Coalesces coroutines on the running event loop. Only the first caller
+        runs the (blocking) call in the loop's executor; it also coalesces
+        with threads using do() for the same key
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        pending = self._async_calls.get(loop_key)
+        if pending is not None:
+            with self._lock:
+                self.requests += 1
+                self.coalesced += 1
+            pending.followers += 1
+            return copy.deepcopy(await asyncio.shield(pending.future))
+
+        pending = self._async_calls[loop_key] = _AsyncCall(loop.create_future())
+        running = loop.run_in_executor(None, self.do, key, call)
+        # Registered before anyone awaits, so the followers are settled before
+        # the leader resumes, and even when the leader is cancelled
+        running.add_done_callback(
+            functools.partial(self._settle_async, loop_key, pending)
+        )
+        return await asyncio.shield(running)
+
+    def _settle_async(self, loop_key: tuple, pending: _AsyncCall, running):
+        del self._async_calls[loop_key]
+        if running.cancelled():
+            pending.future.cancel()
+            return
+        error = running.exception()
+        if error is not None:
+            pending.future.set_exception(error)
+            # Retrieve the exception so asyncio doesn't warn when nobody waits
+            pending.future.exception()
+            return
+        # Followers copy a snapshot, not the result handed to the leader
+        try:
+            pending.future.set_result(
+                copy.deepcopy(running.result()) if pending.followers else None
+            )
+        except Exception as e:
+            pending.future.set_exception(e)
+            pending.future.exception()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "coalesced": self.coalesced}
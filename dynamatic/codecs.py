@@ -0,0 +1,200 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Union
+import json
+import zlib
+
+from boto3.dynamodb.types import Binary
+
+from .expressions import Set, UpdateExpression
+from .results import encode_numbers
+from .wire import dump_value, load_value
+
+try:
+    import lzma
+except ImportError:  # pragma: no cover
+    lzma = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# Encoded values are binary: MAGIC, a codec id byte, a kind byte describing
+# the original value and the compressed payload
+MAGIC = b"\x00DZ"
+_HEADER_SIZE = len(MAGIC) + 2
+
+_STRING = b"s"
+_BYTES = b"b"
+_JSON = b"j"
+
+
+def _to_payload(value: Any) -> (bytes, bytes):
+    if isinstance(value, str):
+        return (_STRING, value.encode("utf-8"))
+    if isinstance(value, Binary):
+        return (_BYTES, value.value)
+    if isinstance(value, (bytes, bytearray)):
+        return (_BYTES, bytes(value))
+    # Anything else goes through the wire format so numbers stay exact and
+    # sets and binary values survive the round trip
+    typed = dump_value(encode_numbers(value))
+    return (_JSON, json.dumps(typed, separators=(",", ":")).encode("utf-8"))
+
+
+def _from_payload(kind: bytes, payload: bytes) -> Any:
+    if kind == _STRING:
+        return payload.decode("utf-8")
+    if kind == _BYTES:
+        return Binary(payload)
+    return load_value(json.loads(payload.decode("utf-8")))
+
+
+class Codec:
+    """
+    Compresses an attribute into a binary value when its encoded size is at
+    least threshold bytes and compression makes it smaller. Strings, bytes
+    and any other value (e.g. a JSON-like dict) are supported
+    """
+
+    codec_id: int
+
+    def __init__(self, threshold: int = 1024):
+        self.threshold = threshold
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decompress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def encode(self, value: Any) -> Any:
+        if value is None:
+            return value
+        kind, payload = _to_payload(value)
+        if len(payload) >= self.threshold:
+            compressed = self.compress(payload)
+            if len(compressed) + _HEADER_SIZE < len(payload):
+                return Binary(MAGIC + bytes((self.codec_id,)) + kind + compressed)
+        if kind == _BYTES and payload.startswith(MAGIC):
+            # Raw bytes that happen to look encoded are stored wrapped so they
+            # can't be mistaken for a compressed value
+            return Binary(MAGIC + bytes((IdentityCodec.codec_id,)) + kind + payload)
+        return value
+
+
+class IdentityCodec(Codec):
+    codec_id = 0
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+
+class ZlibCodec(Codec):
+    codec_id = 1
+
+    def __init__(self, threshold: int = 1024, level: int = 6):
+        super().__init__(threshold)
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class LzmaCodec(Codec):
+    codec_id = 2
+
+    def __init__(self, threshold: int = 1024, preset: int = 6):
+        if lzma is None:  # pragma: no cover
+            raise ImportError("LzmaCodec requires python built with lzma")
+        super().__init__(threshold)
+        self.preset = preset
+
+    def compress(self, data: bytes) -> bytes:
+        # The .lzma container has a 13 byte header against 60 for .xz
+        return lzma.compress(data, format=lzma.FORMAT_ALONE, preset=self.preset)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lzma.decompress(data, format=lzma.FORMAT_ALONE)
+
+
+class ZstdCodec(Codec):
+    codec_id = 3
+
+    def __init__(self, threshold: int = 1024, level: int = 3):
+        if zstandard is None:
+            raise ImportError("ZstdCodec requires the zstandard package")
+        super().__init__(threshold)
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zstandard.ZstdDecompressor().decompress(data)
+
+
+_DECOMPRESSORS = {
+    IdentityCodec.codec_id: IdentityCodec().decompress,
+    ZlibCodec.codec_id: ZlibCodec().decompress,
+}
+if lzma is not None:
+    _DECOMPRESSORS[LzmaCodec.codec_id] = LzmaCodec().decompress
+if zstandard is not None:  # pragma: no cover
+    _DECOMPRESSORS[ZstdCodec.codec_id] = ZstdCodec().decompress
+
+
+def decode_value(value: Any) -> Any:
+    """
+    Decodes a value written by any codec. Values without the marker, like
+    those written before a codec was configured, are returned unchanged
+    """
+    data = value.value if isinstance(value, Binary) else value
+    if not isinstance(data, bytes) or not data.startswith(MAGIC):
+        return value
+    codec_id, kind = data[len(MAGIC)], data[len(MAGIC) + 1 : _HEADER_SIZE]
+    try:
+        decompress = _DECOMPRESSORS[codec_id]
+    except KeyError:
+        raise ValueError(f"Value was compressed with unavailable codec {codec_id}")
+    return _from_payload(kind, decompress(data[_HEADER_SIZE:]))
+
+
+def encode_item(codecs: Dict[str, Codec], item: dict) -> dict:
+    encoded = dict(item)
+    for attribute, codec in codecs.items():
+        if attribute in encoded:
+            encoded[attribute] = codec.encode(encoded[attribute])
+    return encoded
+
+
+def decode_items(codecs: Dict[str, Codec], items: List[dict]) -> List[dict]:
+    for item in items:
+        for attribute in codecs:
+            if attribute in item:
+                item[attribute] = decode_value(item[attribute])
+    return items
+
+
+def encode_updates(
+    codecs: Dict[str, Codec],
+    updates: Union[Dict[str, Any], UpdateExpression, List[UpdateExpression]],
+) -> List[UpdateExpression]:
+    """Encodes the values of plain Set expressions on codec attributes"""
+    if isinstance(updates, UpdateExpression):
+        updates = [updates]
+    if isinstance(updates, dict):
+        updates = [Set(k, v) for k, v in updates.items()]
+    encoded = []
+    for update in updates:
+        if type(update) is Set and update.path in codecs:
+            value = codecs[update.path].encode(update.value)
+            update = Set(update.path, value, update.if_not_exists)
+        encoded.append(update)
+    return encoded
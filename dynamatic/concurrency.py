@@ -0,0 +1,209 @@
+from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, List
+import itertools
+import queue
+import threading
+import time
+import weakref
+
+_DONE = object()
+
+
+class RateLimiter:
+    """
+    Token bucket allowing rate units per second on average with bursts of up
+    to burst units (one second's worth by default). Shared between threads
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst or rate
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, units: float = 1):
+        """Blocks until units tokens are available and takes them"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # Taking the tokens up front (possibly going negative) keeps the
+            # callers in order; each one sleeps until its debt is repaid
+            self._tokens -= units
+            wait_time = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait_time:
+            time.sleep(wait_time)
+
+
+class ElasticPool:
+    """
+    Runs calls on background threads without ever queueing them: an idle
+    thread picks the call up, otherwise a new thread is started. Threads
+    exit after idle_timeout seconds without work, so the pool grows and
+    shrinks with the number of concurrent callers
+    """
+
+    def __init__(self, thread_name_prefix: str, idle_timeout: float = 10.0):
+        self.thread_name_prefix = thread_name_prefix
+        self.idle_timeout = idle_timeout
+        self._tasks = queue.SimpleQueue()
+        # Idle threads not yet promised to a submitted task
+        self._idle = 0
+        self._started = itertools.count()
+        self._lock = threading.Lock()
+
+    def submit(self, call: Callable) -> Future:
+        future = Future()
+        with self._lock:
+            spawn = self._idle == 0
+            if not spawn:
+                self._idle -= 1
+        self._tasks.put((future, call))
+        if spawn:
+            name = f"{self.thread_name_prefix}_{next(self._started)}"
+            threading.Thread(target=self._work, name=name, daemon=True).start()
+        return future
+
+    def _work(self):
+        while True:
+            try:
+                future, call = self._tasks.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    # Only leave when no submitted task is counting on us
+                    if self._idle > 0:
+                        self._idle -= 1
+                        return
+                continue
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(call())
+                except BaseException as e:
+                    future.set_exception(e)
+            del future, call
+            with self._lock:
+                self._idle += 1
+
+
+def chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_bounded(
+    call: Callable, tasks: Iterable, workers: int, thread_name_prefix: str
+) -> Iterator:
+    """
+    Runs call(task) for every task on a pool of workers, yielding the results
+    as they finish. Tasks are pulled from the iterable lazily so at most two
+    per worker are queued at a time. The first error cancels whatever hasn't
+    started and is raised
+    """
+    in_flight = set()
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix=thread_name_prefix
+    ) as executor:
+        try:
+            for task in tasks:
+                if len(in_flight) >= workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                in_flight.add(executor.submit(call, task))
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+
+def _buffered(iterators: List[Iterable], depth: int, names: List[str]) -> Iterator:
+    """
+    Starts iterating over every iterator on its own background thread and
+    returns a generator of their values as they come, with up to depth
+    values buffered. Closing (or dropping) the generator stops the threads
+    after their current value. The first error is raised to the consumer
+    once the values before it are read
+    """
+    if depth < 1:
+        raise ValueError("depth must be at least 1")
+    buffer = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def put(entry) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce(iterator):
+        try:
+            for value in iterator:
+                if not put((value, None)):
+                    return
+        except BaseException as e:
+            put((_DONE, e))
+            return
+        put((_DONE, None))
+
+    def consume():
+        try:
+            remaining = len(iterators)
+            while remaining:
+                value, error = buffer.get()
+                if value is _DONE:
+                    if error is not None:
+                        raise error
+                    remaining -= 1
+                    continue
+                yield value
+        finally:
+            stopped.set()
+
+    for iterator, name in zip(iterators, names):
+        threading.Thread(
+            target=produce, args=(iterator,), name=name, daemon=True
+        ).start()
+    values = consume()
+    # A generator dropped before it was started never runs its finally block
+    weakref.finalize(values, stopped.set)
+    return values
+
+
+def prefetch(
+    iterator: Iterable, depth: int, thread_name: str = "dynamatic-prefetch"
+) -> Iterator:
+    """
+    Iterates over iterator on a background thread, keeping up to depth
+    values buffered ahead of the consumer. Closing the generator (or
+    dropping it) stops the background thread after its current value.
+    Errors are raised to the consumer once the values before them are read.
+    The thread starts right away, not on the first read
+    """
+    return _buffered([iterator], depth, [thread_name])
+
+
+def merge(
+    iterators: List[Iterable], depth: int, thread_name_prefix: str = "dynamatic-merge"
+) -> Iterator:
+    """
+    Iterates over all the iterators at once, each on its own background
+    thread, and yields their values in the order they are produced
+    """
+    names = [f"{thread_name_prefix}_{i}" for i in range(len(iterators))]
+    return _buffered(list(iterators), depth, names)
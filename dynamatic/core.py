@@ -1,13 +1,39 @@
 from __future__ import annotations
-from typing import Dict, Union, Any, Sequence
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Union, Any, Sequence
 import collections
+import functools
+import threading
 
 import boto3
+from boto3.dynamodb.types import Binary
+from botocore.config import Config
+from botocore.credentials import CredentialProvider, CredentialResolver
+import botocore.session
 
-from .enums import BILLING_MODE, RETURN_VALUES, DATATYPE, STREAM_VIEW, SSE_TYPE
+from .enums import (
+    BILLING_MODE,
+    RETURN_VALUES,
+    RESULT_FORMAT,
+    NUMERIC,
+    DATATYPE,
+    STREAM_VIEW,
+    SSE_TYPE,
+    RETRY_MODE,
+)
+from .middleware import OperationContext, run_chain
+from .results import encode_numbers
 
 dynamodb = boto3.resource("dynamodb")
 
+# Key values convert_keys passes through without looking into them
+_SCALAR_TYPES = frozenset((str, int, float, Decimal, bytes, bytearray, Binary))
+
+# Resources and clients shared between every table using an equal
+# ConnectionConfig
+_shared_connections = {}
+_shared_connections_lock = threading.Lock()
+
 
 class KeyDefinition:
     DATATYPE = DATATYPE
@@ -74,11 +100,151 @@ class ProvisionedThroughput:
         }
 
 
+class ConnectionConfig:
+    """
+    Connection settings for the underlying boto3 client. Tables with equal
+    configurations share a single resource (and therefore a single connection
+    pool) so threads never open redundant connections.
+    """
+
+    RETRY_MODE = RETRY_MODE
+
+    def __init__(
+        self,
+        max_pool_connections: int = 10,
+        tcp_keepalive: bool = False,
+        connect_timeout: float = 60,
+        read_timeout: float = 60,
+        retry_mode: RETRY_MODE = RETRY_MODE.LEGACY,
+        max_attempts: int = None,
+        region_name: str = None,
+        endpoint_url: str = None,
+    ):
+        self.max_pool_connections = max_pool_connections
+        self.tcp_keepalive = tcp_keepalive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retry_mode = retry_mode
+        self.max_attempts = max_attempts
+        self.region_name = region_name
+        self.endpoint_url = endpoint_url
+
+    def _key(self) -> tuple:
+        return (
+            self.max_pool_connections,
+            self.tcp_keepalive,
+            self.connect_timeout,
+            self.read_timeout,
+            RETRY_MODE(self.retry_mode).value,
+            self.max_attempts,
+            self.region_name,
+            self.endpoint_url,
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, ConnectionConfig):
+            return False
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def export(self) -> Config:
+        retries = {"mode": RETRY_MODE(self.retry_mode).value}
+        if self.max_attempts is not None:
+            retries["max_attempts"] = self.max_attempts
+        return Config(
+            max_pool_connections=self.max_pool_connections,
+            tcp_keepalive=self.tcp_keepalive,
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+            retries=retries,
+        )
+
+    def _get_shared(self, factory):
+        with _shared_connections_lock:
+            key = (factory.__name__, self)
+            if key not in _shared_connections:
+                _shared_connections[key] = factory(
+                    "dynamodb",
+                    region_name=self.region_name,
+                    endpoint_url=self.endpoint_url,
+                    config=self.export(),
+                )
+            return _shared_connections[key]
+
+    def get_resource(self):
+        return self._get_shared(boto3.resource)
+
+    def get_client(self):
+        """
+        Returns a low-level client. Unlike the resource's own client it sends
+        and receives the DynamoDB wire format (typed attribute-value maps)
+        """
+        return self._get_shared(boto3.client)
+
+
+class _SharedCredentials(CredentialProvider):
+    METHOD = "dynamatic-shared"
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+
+    def load(self):
+        return self.credentials
+
+
+def _client_like(resource_client):
+    """
+    Creates a low-level client with the region, endpoint, config and
+    credentials of a resource's client. The resource's own client can't be
+    used since boto3 makes it convert items to python values and back
+    """
+    meta = resource_client.meta
+    # The credentials object is shared, so refreshable credentials (e.g. an
+    # assumed role) are refreshed for both clients
+    credentials = resource_client._request_signer._credentials
+    session = botocore.session.Session()
+    if credentials is not None:
+        session.register_component(
+            "credential_provider", CredentialResolver([_SharedCredentials(credentials)])
+        )
+    return boto3.Session(botocore_session=session).client(
+        "dynamodb",
+        region_name=meta.region_name,
+        endpoint_url=meta.endpoint_url,
+        config=meta.config,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _key_layout(
+    partition_key: KeyDefinition, sort_key: KeyDefinition = None
+) -> (str, str, bool, bool):
+    """Returns the key attribute names and whether each one is a number"""
+    return (
+        partition_key.name,
+        sort_key.name if sort_key else None,
+        partition_key.datatype == DATATYPE.NUMBER,
+        bool(sort_key) and sort_key.datatype == DATATYPE.NUMBER,
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _projection(attributes: tuple) -> (str, Dict[str, str]):
+    names = {f"#ref{i}": attribute for i, attribute in enumerate(attributes)}
+    return (", ".join(names), names)
+
+
 class BaseTable:
     BILLING_MODE = BILLING_MODE
     RETURN_VALUES = RETURN_VALUES
+    RESULT_FORMAT = RESULT_FORMAT
+    NUMERIC = NUMERIC
 
     resource = dynamodb
+    client = None
+    connection: ConnectionConfig = None
     name: str
     partition_key: KeyDefinition = KeyDefinition("pk")
     sort_key: KeyDefinition = None
@@ -86,6 +252,13 @@ class BaseTable:
     throughput: ProvisionedThroughput = ProvisionedThroughput(5, 5)
     stream: Stream = None
     sse: SSESpecification = None
+    numeric: NUMERIC = NUMERIC.DECIMAL
+    capacity_hook: Callable = None
+    hedging = None
+    coalescing = None
+    negative_cache = None
+    codecs: Dict = {}
+    middleware: Sequence[Callable] = ()
     tags: Dict = {}
 
     def __init__(self, **kwargs):
@@ -96,13 +269,49 @@ class BaseTable:
         self.throughput = kwargs.get("throughput") or self.throughput
         self.stream = kwargs.get("stream") or self.stream
         self.sse = kwargs.get("sse") or self.sse
+        self.numeric = kwargs.get("numeric") or self.numeric
+        self.capacity_hook = kwargs.get("capacity_hook") or self.capacity_hook
+        self.hedging = kwargs.get("hedging") or self.hedging
+        self.coalescing = kwargs.get("coalescing") or self.coalescing
+        self.negative_cache = kwargs.get("negative_cache") or self.negative_cache
+        self.codecs = kwargs.get("codecs") or self.codecs
+        self.middleware = list(kwargs.get("middleware") or self.middleware)
+        self.connection = kwargs.get("connection") or self.connection
+        if self.connection and not kwargs.get("resource"):
+            self.resource = self.connection.get_resource()
         self.resource = kwargs.get("resource") or self.resource
+        self.client = kwargs.get("client") or self.client
         if kwargs.get("tags"):
             self.tags.update(kwargs["tags"])
 
     def get_table(self):
         return self.resource.Table(self.name)
 
+    def get_client(self):
+        if self.client is None:
+            if self.connection:
+                self.client = self.connection.get_client()
+            else:
+                self.client = _client_like(self.resource.meta.client)
+        return self.client
+
+    def _execute(
+        self,
+        operation: str,
+        request: dict,
+        send: Callable[[dict], Any],
+        raw: bool = False,
+    ) -> Any:
+        """
+        Sends request by calling send with it, through the table's middleware
+        when there is any
+        """
+        if not self.middleware:
+            return send(request)
+        index = request.get("IndexName")
+        context = OperationContext(operation, self, request, index, raw)
+        return run_chain(self.middleware, context, send)
+
     def convert_key(self, key: Union[Any, Sequence[Any, Any]]) -> dict:
         if isinstance(key, str) or not isinstance(key, collections.abc.Sequence):
             key = (key,)
@@ -111,16 +320,51 @@ class BaseTable:
             converted[self.sort_key.name] = key[1]
         return converted
 
+    def convert_keys(
+        self,
+        keys: Iterable[Union[Any, Sequence[Any, Any]]],
+        numeric: NUMERIC = NUMERIC.DECIMAL,
+    ) -> List[dict]:
+        """
+        Converts many keys at once, like convert_key but without its per key
+        type checks for the usual scalar and tuple keys. Unless numeric is
+        DECIMAL, floats in number key attributes are converted to Decimals
+        """
+        partition_name, sort_name, encode_partition, encode_sort = _key_layout(
+            self.partition_key, self.sort_key
+        )
+        if numeric == NUMERIC.DECIMAL:
+            encode_partition = encode_sort = False
+        converted = []
+        append = converted.append
+        for key in keys:
+            key_type = type(key)
+            if key_type is tuple or key_type is list:
+                partition_value = key[0]
+                if encode_partition and type(partition_value) is float:
+                    partition_value = Decimal(repr(partition_value))
+                if sort_name is None or len(key) < 2:
+                    append({partition_name: partition_value})
+                    continue
+                sort_value = key[1]
+                if encode_sort and type(sort_value) is float:
+                    sort_value = Decimal(repr(sort_value))
+                append({partition_name: partition_value, sort_name: sort_value})
+            elif key_type in _SCALAR_TYPES:
+                if encode_partition and key_type is float:
+                    key = Decimal(repr(key))
+                append({partition_name: key})
+            else:
+                if numeric != NUMERIC.DECIMAL:
+                    key = encode_numbers(key)
+                append(self.convert_key(key))
+        return converted
+
     def serialize_attributes(self, attributes: Sequence[str]) -> dict:
-        attribute_names = {}
-        attribute_tokens = []
-        counter = 0
-        for attribute in attributes:
-            token = f"#ref{counter}"
-            attribute_names[token] = attribute
-            attribute_tokens.append(token)
-            counter += 1
+        expression, attribute_names = _projection(tuple(attributes))
+        # boto3 adds the names of conditions to the dict, so each request
+        # gets its own copy
         return {
-            "ProjectionExpression": ", ".join(attribute_tokens),
-            "ExpressionAttributeNames": attribute_names,
+            "ProjectionExpression": expression,
+            "ExpressionAttributeNames": dict(attribute_names),
         }
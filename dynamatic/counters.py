@@ -0,0 +1,155 @@
+from __future__ import annotations
+from typing import Any, Sequence, Union
+import atexit
+import threading
+import time
+
+from .expressions import Add
+
+
+class _Shard:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.pending = 0
+
+
+class CounterAggregator:
+    """
+    Accumulates counter deltas in memory and writes them as one update per
+    item. Deltas are flushed every interval seconds, as soon as more than
+    max_pending counters are waiting, on close() and at interpreter exit.
+    Each flushed item gets one update with an Add (or the given expression
+    class, e.g. Increase) per attribute. Failed updates are kept for the
+    next flush
+    """
+
+    def __init__(
+        self,
+        table,
+        interval: float = 1.0,
+        max_pending: int = 10000,
+        shards: int = 16,
+        expression: type = Add,
+    ):
+        self.table = table
+        self.interval = interval
+        self.max_pending = max_pending
+        self.expression = expression
+        self._shards = [_Shard() for _ in range(shards)]
+        self._flush_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._metrics = {
+            "flushes": 0,
+            "updates": 0,
+            "failed_updates": 0,
+            "last_flush_latency": None,
+            "max_flush_latency": 0.0,
+            "last_error": None,
+        }
+        self._thread = threading.Thread(
+            target=self._run, name="dynamatic-counters", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._closed:
+                return
+            try:
+                self.flush()
+            except Exception:
+                pass  # recorded in the metrics, the deltas are retried
+
+    def _merge(self, shard: _Shard, key: tuple, deltas: dict):
+        # Called with the shard lock held
+        counters = shard.counters.setdefault(key, {})
+        for attribute, delta in deltas.items():
+            if attribute not in counters:
+                shard.pending += 1
+                counters[attribute] = delta
+            else:
+                counters[attribute] += delta
+
+    def add(self, key: Union[Any, Sequence[Any, Any]], attribute: str, delta=1):
+        if self._closed:
+            raise RuntimeError("CounterAggregator is closed")
+        key = tuple(self.table.convert_key(key).values())
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            self._merge(shard, key, {attribute: delta})
+            pending = shard.pending
+        if pending * len(self._shards) > self.max_pending:
+            self._wake.set()
+
+    def pending(self) -> int:
+        """Number of (item, attribute) counters waiting to be flushed"""
+        return sum(shard.pending for shard in self._shards)
+
+    def flush(self) -> int:
+        """Writes every pending delta, returning the number of updates sent"""
+        with self._flush_lock:
+            start = time.monotonic()
+            sent, failed, error = 0, 0, None
+            for shard in self._shards:
+                with shard.lock:
+                    counters, shard.counters, shard.pending = shard.counters, {}, 0
+                for key, deltas in counters.items():
+                    updates = [
+                        self.expression(attribute, delta)
+                        for attribute, delta in deltas.items()
+                        if delta
+                    ]
+                    if not updates:
+                        continue
+                    try:
+                        self.table.update(key, updates)
+                        sent += 1
+                    except Exception as e:
+                        failed += 1
+                        error = error or e
+                        with shard.lock:
+                            self._merge(shard, key, deltas)
+            latency = time.monotonic() - start
+
+        with self._metrics_lock:
+            self._metrics["flushes"] += 1
+            self._metrics["updates"] += sent
+            self._metrics["last_flush_latency"] = latency
+            self._metrics["max_flush_latency"] = max(
+                latency, self._metrics["max_flush_latency"]
+            )
+            self._metrics["failed_updates"] += failed
+            if error is not None:
+                self._metrics["last_error"] = repr(error)
+        if error is not None:
+            raise error
+        return sent
+
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        metrics["pending"] = self.pending()
+        return metrics
+
+    def close(self):
+        """Stops the background flusher and flushes what is left"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        atexit.unregister(self.close)
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,252 @@
+from __future__ import annotations
+from decimal import Decimal
+from typing import Iterator, List, Sequence, Union
+import base64
+import hashlib
+import json
+import queue
+import threading
+import uuid
+
+from .concurrency import chunks
+from .enums import NUMERIC
+from .results import encode_numbers
+from .scanning import MemoryCheckpointStore, ScanRunner
+from .wire import serializer
+
+_DONE = object()
+_MASK = (1 << 128) - 1
+
+
+def _normalize(value: dict):
+    """Makes a wire format value deterministic: sorted sets, base64 binary"""
+    ((datatype, data),) = value.items()
+    if datatype == "N":
+        return {"N": str(Decimal(data).normalize())}
+    if datatype == "NS":
+        return {"NS": sorted(str(Decimal(n).normalize()) for n in data)}
+    if datatype == "SS":
+        return {"SS": sorted(data)}
+    if datatype == "B":
+        return {"B": base64.b64encode(getattr(data, "value", data)).decode("ascii")}
+    if datatype == "BS":
+        encoded = (
+            base64.b64encode(getattr(b, "value", b)).decode("ascii") for b in data
+        )
+        return {"BS": sorted(encoded)}
+    if datatype == "M":
+        return {"M": {k: _normalize(v) for k, v in data.items()}}
+    if datatype == "L":
+        return {"L": [_normalize(v) for v in data]}
+    return value
+
+
+def canonical(item: dict) -> bytes:
+    """
+    Serializes an item the same way whatever its attribute or set order.
+    Floats hash like the Decimals they are written as
+    """
+    normalized = {
+        k: _normalize(serializer.serialize(encode_numbers(v))) for k, v in item.items()
+    }
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _digest(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=16).digest(), "big")
+
+
+class Difference:
+    ONLY_IN_A = "ONLY_IN_A"
+    ONLY_IN_B = "ONLY_IN_B"
+    CHANGED = "CHANGED"
+
+    __slots__ = ("kind", "key")
+
+    def __init__(self, kind: str, key: dict):
+        self.kind = kind
+        self.key = key
+
+    def __eq__(self, other):
+        if not isinstance(other, Difference):
+            return False
+        return self.kind == other.kind and self.key == other.key
+
+    def __repr__(self):
+        return f"<Difference {self.kind} {self.key}>"
+
+
+class TableDiff:
+    """
+    Compares the items of two tables (or indexes, or callables returning an
+    iterable of items, e.g. a reader over an export) and yields a Difference
+    for every key found on one side only or whose item differs.
+
+    A first pass scans both sides with parallel segments and folds every
+    item into one of buckets digests, chosen by the hash of its key. Each
+    digest is the sum of the item hashes, so it doesn't depend on scan
+    order. Only the keys in buckets whose digests (or counts) differ are
+    compared item by item, on a second pass. That pass keeps at most
+    max_items item hashes in memory, splitting the mismatched buckets over
+    several scans when needed. Callables are called once per pass
+    """
+
+    def __init__(
+        self,
+        a,
+        b,
+        key_names: Sequence[str] = None,
+        buckets: int = 16384,
+        total_segments: Union[int, str] = ScanRunner.AUTO,
+        workers: int = None,
+        page_size: int = None,
+        consistent_read: bool = False,
+        max_items: int = 1000000,
+        queue_pages: int = 16,
+    ):
+        self.a = a
+        self.b = b
+        self.key_names = list(key_names or self._key_names())
+        self.buckets = buckets
+        self.total_segments = total_segments
+        self.workers = workers
+        self.page_size = page_size
+        self.consistent_read = consistent_read
+        self.max_items = max_items
+        self.queue_pages = queue_pages
+        self.stats = {
+            "items_a": 0,
+            "items_b": 0,
+            "mismatched_buckets": 0,
+            "passes": 0,
+            "differences": 0,
+        }
+
+    def _key_names(self) -> List[str]:
+        for source in (self.a, self.b):
+            table = getattr(source, "_table", None) or source
+            if hasattr(table, "partition_key"):
+                keys = (table.partition_key, table.sort_key)
+                return [k.name for k in keys if k]
+        raise ValueError("key_names is required when neither side is a table")
+
+    def _pages(self, source) -> Iterator[List[dict]]:
+        """
+        Yields the pages of a parallel scan of source. The segments are
+        scanned on background threads while pages wait in a bounded queue
+        """
+        if not hasattr(source, "scan"):
+            yield from chunks(source(), 1000)
+            return
+
+        runner = ScanRunner(
+            source,
+            self.total_segments,
+            store=MemoryCheckpointStore(),
+            scan_id=uuid.uuid4().hex,
+            workers=self.workers,
+            consistent_read=self.consistent_read,
+            page_size=self.page_size,
+            # Exact numbers, whatever the source's numeric policy
+            numeric=NUMERIC.DECIMAL,
+        )
+        pages = queue.Queue(maxsize=self.queue_pages)
+
+        def produce():
+            try:
+                runner.run(pages.put)
+                pages.put(_DONE)
+            except BaseException as e:
+                pages.put(e)
+
+        thread = threading.Thread(target=produce, name="dynamatic-diff", daemon=True)
+        thread.start()
+        try:
+            while True:
+                page = pages.get()
+                if page is _DONE:
+                    return
+                if isinstance(page, BaseException):
+                    raise page
+                yield page
+        finally:
+            runner.stop()
+            # Unblock the segments waiting to hand over a page
+            while thread.is_alive():
+                try:
+                    pages.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+    def _hash(self, item: dict) -> (dict, bytes, int, int):
+        """Returns the key, its canonical form, its bucket and the item hash"""
+        key = {name: item[name] for name in self.key_names}
+        key_bytes = canonical(key)
+        bucket = _digest(key_bytes) % self.buckets
+        return (key, key_bytes, bucket, _digest(key_bytes + b"\x00" + canonical(item)))
+
+    def _summarize(self, source) -> (List[int], List[int]):
+        digests = [0] * self.buckets
+        counts = [0] * self.buckets
+        for page in self._pages(source):
+            for item in page:
+                _, _, bucket, item_hash = self._hash(item)
+                digests[bucket] = (digests[bucket] + item_hash) & _MASK
+                counts[bucket] += 1
+        return (digests, counts)
+
+    def _groups(self, mismatched: List[int], counts: List[int]) -> Iterator[set]:
+        group, size = set(), 0
+        for bucket in mismatched:
+            if group and size + counts[bucket] > self.max_items:
+                yield group
+                group, size = set(), 0
+            group.add(bucket)
+            size += counts[bucket]
+        if group:
+            yield group
+
+    def __iter__(self) -> Iterator[Difference]:
+        digests_a, counts_a = self._summarize(self.a)
+        digests_b, counts_b = self._summarize(self.b)
+        self.stats["items_a"] = sum(counts_a)
+        self.stats["items_b"] = sum(counts_b)
+        self.stats["passes"] = 1
+
+        mismatched = [
+            bucket
+            for bucket in range(self.buckets)
+            if digests_a[bucket] != digests_b[bucket]
+            or counts_a[bucket] != counts_b[bucket]
+        ]
+        self.stats["mismatched_buckets"] = len(mismatched)
+
+        for group in self._groups(mismatched, counts_a):
+            self.stats["passes"] += 1
+            hashes = {}
+            for page in self._pages(self.a):
+                for item in page:
+                    key, key_bytes, bucket, item_hash = self._hash(item)
+                    if bucket in group:
+                        hashes[key_bytes] = (key, item_hash)
+            for page in self._pages(self.b):
+                for item in page:
+                    key, key_bytes, bucket, item_hash = self._hash(item)
+                    if bucket not in group:
+                        continue
+                    found = hashes.pop(key_bytes, None)
+                    if found is None:
+                        yield self._difference(Difference.ONLY_IN_B, key)
+                    elif found[1] != item_hash:
+                        yield self._difference(Difference.CHANGED, key)
+            for key, _ in hashes.values():
+                yield self._difference(Difference.ONLY_IN_A, key)
+
+    def _difference(self, kind: str, key: dict) -> Difference:
+        self.stats["differences"] += 1
+        return Difference(kind, key)
+
+
+def diff_tables(a, b, **kwargs) -> TableDiff:
+    """Returns an iterable of the differences between a and b, see TableDiff"""
+    return TableDiff(a, b, **kwargs)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+from typing import Dict, Optional
+import bisect
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Returns the smallest string greater than every string starting with
+    prefix, or None when there is none. Strings compare by code point, which
+    is the UTF-8 byte order DynamoDB sorts by
+    """
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            following = last + 1
+            if 0xD800 <= following <= 0xDFFF:  # surrogates can't be stored
+                following = 0xE000
+            return prefix[:-1] + chr(following)
+        prefix = prefix[:-1]
+    return None
+
+
+class PrefixRouter:
+    """
+    Maps sort key values to entity names by prefix, e.g.
+    {"user": "USER#", "order": "ORDER#"}. When prefixes nest the longest
+    matching one wins. Lookups are a binary search over the sorted prefixes
+    """
+
+    def __init__(self, entity_prefixes: Dict[str, str]):
+        if not entity_prefixes:
+            raise ValueError("entity_prefixes must not be empty")
+        by_prefix = {}
+        for entity, prefix in entity_prefixes.items():
+            if not prefix:
+                raise ValueError(f"entity {entity!r} has an empty prefix")
+            if prefix in by_prefix:
+                raise ValueError(f"prefix {prefix!r} is used more than once")
+            by_prefix[prefix] = entity
+        self.prefixes = sorted(by_prefix)
+        self.entities = [by_prefix[prefix] for prefix in self.prefixes]
+        # For nested prefixes, the position of the longest shorter prefix
+        # each one extends, so a miss can fall back to it
+        self._parents = []
+        for position, prefix in enumerate(self.prefixes):
+            parent = position - 1
+            while parent >= 0 and not prefix.startswith(self.prefixes[parent]):
+                parent = self._parents[parent]
+            self._parents.append(parent)
+
+    @property
+    def lower_bound(self) -> str:
+        return self.prefixes[0]
+
+    @property
+    def upper_bound(self) -> Optional[str]:
+        return prefix_upper_bound(self.prefixes[-1])
+
+    def route(self, value) -> Optional[str]:
+        """Returns the entity the sort key value belongs to, if any"""
+        if not isinstance(value, str):
+            return None
+        position = bisect.bisect_right(self.prefixes, value) - 1
+        while position >= 0:
+            if value.startswith(self.prefixes[position]):
+                return self.entities[position]
+            position = self._parents[position]
+        return None
@@ -14,6 +14,19 @@ class RETURN_VALUES(str, Enum):
     UPDATED_NEW = "UPDATED_NEW"
 
 
+class RESULT_FORMAT(str, Enum):
+    DICT = "DICT"
+    TUPLE = "TUPLE"
+    ROW = "ROW"
+    RAW = "RAW"
+
+
+class NUMERIC(str, Enum):
+    DECIMAL = "DECIMAL"
+    NATIVE = "NATIVE"
+    FLOAT = "FLOAT"
+
+
 class PROJECTION:
     ALL = ["*"]
 
@@ -40,3 +53,9 @@ class STREAM_VIEW(str, Enum):
 class SSE_TYPE(str, Enum):
     AES256 = "AES256"
     KMS = "KMS"
+
+
+class RETRY_MODE(str, Enum):
+    LEGACY = "legacy"
+    STANDARD = "standard"
+    ADAPTIVE = "adaptive"
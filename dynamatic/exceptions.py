@@ -7,12 +7,18 @@ def handle_client_error(client_error: ClientError):
         "ConditionalCheckFailedException": ConditionalCheckFailedException,
         "ResourceNotFoundException": ResourceNotFoundException,
         "ResourceInUseException": ResourceInUseException,
+        "ProvisionedThroughputExceededException": ProvisionedThroughputExceededException,
+        "ThrottlingException": ThrottlingException,
+        "RequestLimitExceeded": RequestLimitExceeded,
     }
 
     try:
-        raise exception_map[client_error.response["Error"]["Code"]]()
+        exception = exception_map[client_error.response["Error"]["Code"]]
     except (KeyError, AttributeError):
         raise client_error
+    if issubclass(exception, ClientError):
+        raise exception(client_error.response, client_error.operation_name)
+    raise exception()
 
 
 class DynamaticError(Exception):
@@ -33,3 +39,26 @@ class ResourceInUseException(DynamaticError):
 
 class ItemNotFoundException(DynamaticError):
     pass
+
+
+class ThrottledException(DynamaticError, ClientError):
+    """
+    Base class of the errors DynamoDB returns when requests are throttled.
+    Still a ClientError holding the original response, as these errors were
+    raised before they had classes of their own
+    """
+
+    def __reduce__(self):
+        return (self.__class__, (self.response, self.operation_name))
+
+
+class ProvisionedThroughputExceededException(ThrottledException):
+    pass
+
+
+class ThrottlingException(ThrottledException):
+    pass
+
+
+class RequestLimitExceeded(ThrottledException):
+    pass
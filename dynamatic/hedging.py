@@ -0,0 +1,123 @@
+from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, TimeoutError, wait
+from typing import Any, Callable
+import collections
+import threading
+import time
+
+from .concurrency import ElasticPool
+
+
+class HedgingPolicy:
+    """
+    Sends a duplicate of an idempotent read when the first attempt hasn't
+    finished after a delay and returns whichever attempt finishes first. The
+    delay is either fixed or the given percentile of recently observed
+    latencies. At most budget (a fraction) of the last window requests are
+    hedged so hedging can't double the load during an incident. Attempts run
+    on a pool that grows with the number of callers, so reads never queue
+    behind each other
+    """
+
+    def __init__(
+        self,
+        delay: float = None,
+        percentile: float = 95,
+        budget: float = 0.05,
+        window: int = 1000,
+        initial_delay: float = 0.05,
+        min_delay: float = 0.001,
+    ):
+        self.delay = delay
+        self.percentile = percentile
+        self.budget = budget
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._latencies = collections.deque(maxlen=window)
+        self._recent_hedges = collections.deque(maxlen=window)
+        self._recent_hedge_count = 0
+        self._adaptive_delay = None
+        self._lock = threading.Lock()
+        self._pool = ElasticPool("dynamatic-hedge")
+
+    def get_delay(self) -> float:
+        if self.delay is not None:
+            return self.delay
+        with self._lock:
+            if self._adaptive_delay is None:
+                if len(self._latencies) < 20:
+                    return self.initial_delay
+                ordered = sorted(self._latencies)
+                position = int(len(ordered) * self.percentile / 100)
+                delay = ordered[min(position, len(ordered) - 1)]
+                self._adaptive_delay = max(delay, self.min_delay)
+            return self._adaptive_delay
+
+    def _remember(self, hedged: bool):
+        # Called with the lock held
+        if len(self._recent_hedges) == self._recent_hedges.maxlen:
+            self._recent_hedge_count -= self._recent_hedges[0]
+        self._recent_hedges.append(hedged)
+        self._recent_hedge_count += hedged
+
+    def _record(self, latency: float, hedged: bool):
+        with self._lock:
+            self.requests += 1
+            self._latencies.append(latency)
+            # Hedged requests were counted when their hedge was reserved
+            if not hedged:
+                self._remember(False)
+            # Recompute the percentile periodically rather than on every call
+            if self.requests % 50 == 0:
+                self._adaptive_delay = None
+
+    def _reserve_hedge(self) -> bool:
+        """Takes a hedge from the budget if there is one left"""
+        with self._lock:
+            observed = max(len(self._recent_hedges), 1)
+            if self._recent_hedge_count >= self.budget * observed:
+                return False
+            self._remember(True)
+            self.hedged += 1
+            return True
+
+    def call(self, read: Callable[[], Any]) -> Any:
+        start = time.monotonic()
+        primary = self._pool.submit(read)
+        try:
+            result = primary.result(timeout=self.get_delay())
+            self._record(time.monotonic() - start, False)
+            return result
+        except TimeoutError:
+            pass
+
+        if not self._reserve_hedge():
+            result = primary.result()
+            self._record(time.monotonic() - start, False)
+            return result
+
+        secondary = self._pool.submit(read)
+        done, _ = wait([primary, secondary], return_when=FIRST_COMPLETED)
+        winner = secondary if secondary in done else primary
+        loser = primary if winner is secondary else secondary
+        if winner.exception() is not None:
+            # Prefer a successful answer over an early failure
+            winner, loser = loser, winner
+        loser.cancel()
+        result = winner.result()
+        with self._lock:
+            self.hedge_wins += winner is secondary
+        self._record(time.monotonic() - start, True)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "delay": self._adaptive_delay or self.delay or self.initial_delay,
+            }
@@ -1,8 +1,11 @@
 from __future__ import annotations
-from typing import List, Sequence
+from typing import Dict, Iterator, List, Sequence
+
+from boto3.dynamodb.conditions import ConditionBase
 
 from .core import KeyDefinition, ProvisionedThroughput
-from .enums import PROJECTION
+from .enums import PROJECTION, RESULT_FORMAT, NUMERIC
+from .results import Column, format_items, referenced_attributes
 
 
 class BaseSecondaryIndex:
@@ -20,6 +23,16 @@ class BaseSecondaryIndex:
             attributes = list(attributes)
             return {"ProjectionType": "INCLUDE", "NonKeyAttributes": attributes}
 
+    def get_projected_attributes(self) -> set:
+        """
+        Returns the names of the attributes held by the index, or None when it
+        projects every attribute
+        """
+        if list(self.attributes or []) == PROJECTION.ALL:
+            return None
+        keys = self.get_all_keys() | {self._table.partition_key, self._table.sort_key}
+        return {k.name for k in keys if k} | set(self.attributes or [])
+
     def query(
         self,
         key_condition,
@@ -29,7 +42,45 @@ class BaseSecondaryIndex:
         consistent_read: bool = False,
         scan_index_forward: bool = True,
         exclusive_start_key: dict = None,
+        result_format: RESULT_FORMAT = RESULT_FORMAT.DICT,
+        numeric: NUMERIC = None,
+        fetch_missing: bool = False,
+        fill: bool = False,
     ) -> (List[dict], dict):
+        """
+        Queries the index. With fetch_missing, requested attributes the index
+        doesn't project are read from the base table with BatchGetItem and
+        merged into the items, which keep their index order. The filter is
+        evaluated by the index, so it may only use projected attributes
+        """
+        projected = self.get_projected_attributes()
+        if fetch_missing and attributes and projected is not None:
+            if isinstance(filter_expression, ConditionBase):
+                unprojected = referenced_attributes(filter_expression) - projected
+                if unprojected:
+                    missing = ", ".join(sorted(unprojected))
+                    raise ValueError(
+                        f"Index {self.name} can't filter on {missing}, "
+                        "it doesn't project them"
+                    )
+            if set(attributes) - projected:
+                if result_format == RESULT_FORMAT.RAW:
+                    raise ValueError("fetch_missing does not support RAW results")
+                items, last_key = self._query_and_fetch(
+                    attributes,
+                    projected,
+                    key_condition=key_condition,
+                    filter_expression=filter_expression,
+                    limit=limit,
+                    consistent_read=consistent_read,
+                    scan_index_forward=scan_index_forward,
+                    exclusive_start_key=exclusive_start_key,
+                    fill=fill,
+                )
+                numeric = numeric or self._table.numeric
+                items = format_items(items, attributes, result_format, numeric)
+                return (items, last_key)
+
         return self._table.query(
             key_condition=key_condition,
             filter_expression=filter_expression,
@@ -38,6 +89,106 @@ class BaseSecondaryIndex:
             consistent_read=consistent_read,
             scan_index_forward=scan_index_forward,
             exclusive_start_key=exclusive_start_key,
+            result_format=result_format,
+            numeric=numeric,
+            fill=fill,
+            _index=self.name,
+        )
+
+    def _query_and_fetch(
+        self, attributes: Sequence[str], projected: set, **kwargs
+    ) -> (List[dict], dict):
+        table = self._table
+        key_names = [k.name for k in (table.partition_key, table.sort_key) if k]
+        index_attributes = [a for a in attributes if a in projected]
+        fetch_attributes = [a for a in attributes if a not in projected]
+
+        items, last_key = table.query(
+            attributes=list(dict.fromkeys(index_attributes + key_names)),
+            numeric=NUMERIC.DECIMAL,
+            _index=self.name,
+            **kwargs,
+        )
+        keys = [tuple(item[name] for name in key_names) for item in items]
+        fetched = table.batch_get(
+            list(dict.fromkeys(keys)),
+            attributes=list(dict.fromkeys(fetch_attributes + key_names)),
+            consistent_read=kwargs.get("consistent_read", False),
+            numeric=NUMERIC.DECIMAL,
+        )
+        fetched = {tuple(item[name] for name in key_names): item for item in fetched}
+
+        merged = []
+        for key, item in zip(keys, items):
+            item.update(fetched.get(key, {}))
+            merged.append({a: item[a] for a in attributes if a in item})
+        return (merged, last_key)
+
+    def query_pages(
+        self,
+        key_condition,
+        filter_expression=None,
+        attributes: Sequence[str] = None,
+        page_size: int = None,
+        consistent_read: bool = False,
+        scan_index_forward: bool = True,
+        exclusive_start_key: dict = None,
+        result_format: RESULT_FORMAT = RESULT_FORMAT.DICT,
+        numeric: NUMERIC = None,
+        prefetch_pages: int = 0,
+    ) -> Iterator[list]:
+        return self._table.query_pages(
+            key_condition=key_condition,
+            filter_expression=filter_expression,
+            attributes=attributes,
+            page_size=page_size,
+            consistent_read=consistent_read,
+            scan_index_forward=scan_index_forward,
+            exclusive_start_key=exclusive_start_key,
+            result_format=result_format,
+            numeric=numeric,
+            prefetch_pages=prefetch_pages,
+            _index=self.name,
+        )
+
+    def query_columns(
+        self,
+        key_condition,
+        attributes: Sequence[str],
+        filter_expression=None,
+        consistent_read: bool = False,
+        scan_index_forward: bool = True,
+        page_size: int = None,
+        exclusive_start_key: dict = None,
+    ) -> Dict[str, Column]:
+        return self._table.query_columns(
+            key_condition=key_condition,
+            attributes=attributes,
+            filter_expression=filter_expression,
+            consistent_read=consistent_read,
+            scan_index_forward=scan_index_forward,
+            page_size=page_size,
+            exclusive_start_key=exclusive_start_key,
+            _index=self.name,
+        )
+
+    def delete_where(
+        self,
+        key_condition,
+        filter_expression=None,
+        dry_run: bool = False,
+        workers: int = 4,
+        max_rate: float = None,
+        page_size: int = None,
+    ) -> int:
+        """Deletes the base table items matching a query of the index"""
+        return self._table.delete_where(
+            key_condition=key_condition,
+            filter_expression=filter_expression,
+            dry_run=dry_run,
+            workers=workers,
+            max_rate=max_rate,
+            page_size=page_size,
             _index=self.name,
         )
 
@@ -50,6 +201,9 @@ class BaseSecondaryIndex:
         total_segments: int = None,
         segment: int = None,
         exclusive_start_key: dict = None,
+        result_format: RESULT_FORMAT = RESULT_FORMAT.DICT,
+        numeric: NUMERIC = None,
+        fill: bool = False,
     ) -> (List[dict], dict):
         return self._table.scan(
             filter_expression=filter_expression,
@@ -59,6 +213,57 @@ class BaseSecondaryIndex:
             total_segments=total_segments,
             segment=segment,
             exclusive_start_key=exclusive_start_key,
+            result_format=result_format,
+            numeric=numeric,
+            fill=fill,
+            _index=self.name,
+        )
+
+    def scan_pages(
+        self,
+        filter_expression=None,
+        attributes: Sequence[str] = None,
+        page_size: int = None,
+        consistent_read: bool = False,
+        total_segments: int = None,
+        segment: int = None,
+        exclusive_start_key: dict = None,
+        result_format: RESULT_FORMAT = RESULT_FORMAT.DICT,
+        numeric: NUMERIC = None,
+        prefetch_pages: int = 0,
+    ) -> Iterator[list]:
+        return self._table.scan_pages(
+            filter_expression=filter_expression,
+            attributes=attributes,
+            page_size=page_size,
+            consistent_read=consistent_read,
+            total_segments=total_segments,
+            segment=segment,
+            exclusive_start_key=exclusive_start_key,
+            result_format=result_format,
+            numeric=numeric,
+            prefetch_pages=prefetch_pages,
+            _index=self.name,
+        )
+
+    def scan_columns(
+        self,
+        attributes: Sequence[str],
+        filter_expression=None,
+        consistent_read: bool = False,
+        total_segments: int = None,
+        segment: int = None,
+        page_size: int = None,
+        exclusive_start_key: dict = None,
+    ) -> Dict[str, Column]:
+        return self._table.scan_columns(
+            attributes=attributes,
+            filter_expression=filter_expression,
+            consistent_read=consistent_read,
+            total_segments=total_segments,
+            segment=segment,
+            page_size=page_size,
+            exclusive_start_key=exclusive_start_key,
             _index=self.name,
         )
 
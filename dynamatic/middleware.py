@@ -0,0 +1,94 @@
+from __future__ import annotations
+from typing import Any, Callable, Sequence
+import time
+
+
+class OperationContext:
+    """
+    Describes one DynamoDB call as it passes through a table's middleware.
+    request holds the boto3 resource style arguments (python values and
+    condition objects) and may be replaced or mutated before the call is
+    sent. response and elapsed are filled in once it has been sent. raw is
+    set when the call goes through the low-level client and returns wire
+    format items. metadata is free for middleware to share state
+    """
+
+    __slots__ = (
+        "operation",
+        "table",
+        "index",
+        "request",
+        "raw",
+        "response",
+        "started",
+        "elapsed",
+        "metadata",
+    )
+
+    def __init__(
+        self,
+        operation: str,
+        table,
+        request: dict,
+        index: str = None,
+        raw: bool = False,
+    ):
+        self.operation = operation
+        self.table = table
+        self.index = index
+        self.request = request
+        self.raw = raw
+        self.response = None
+        self.started = None
+        self.elapsed = None
+        self.metadata = {}
+
+    def __repr__(self):
+        return (
+            f"<OperationContext {self.operation} table={self.table.name} "
+            f"index={self.index}>"
+        )
+
+
+class Middleware:
+    """
+    Base class for middleware. Any callable taking (context, call_next) and
+    returning the response works as middleware; subclasses of this class can
+    instead override before() and after(). A middleware may also return a
+    response without calling call_next, e.g. from a cache
+    """
+
+    def __call__(self, context: OperationContext, call_next: Callable) -> dict:
+        self.before(context)
+        response = call_next(context)
+        self.after(context)
+        return response
+
+    def before(self, context: OperationContext):
+        pass
+
+    def after(self, context: OperationContext):
+        pass
+
+
+def run_chain(
+    middleware: Sequence[Callable],
+    context: OperationContext,
+    send: Callable[[dict], Any],
+) -> Any:
+    """
+    Passes context through the middleware in order (the first one is the
+    outermost) and finally calls send with the resulting request
+    """
+
+    def call(position: int, context: OperationContext):
+        if position == len(middleware):
+            context.started = time.monotonic()
+            try:
+                context.response = send(context.request)
+            finally:
+                context.elapsed = time.monotonic() - context.started
+            return context.response
+        return middleware[position](context, lambda c: call(position + 1, c))
+
+    return call(0, context)
@@ -0,0 +1,324 @@
+from __future__ import annotations
+from typing import Any, List, Sequence
+import functools
+
+from boto3.dynamodb.conditions import (
+    And,
+    AttributeBase,
+    BeginsWith,
+    Between,
+    ConditionBase,
+    Equals,
+    GreaterThan,
+    GreaterThanEquals,
+    Key,
+    LessThan,
+    LessThanEquals,
+)
+from boto3.dynamodb.types import TypeDeserializer
+
+from .enums import NUMERIC, RESULT_FORMAT
+from .indexes import GlobalSecondaryIndex
+from .results import format_items, referenced_attributes
+
+_RANGE_CONDITIONS = (
+    LessThan,
+    LessThanEquals,
+    GreaterThan,
+    GreaterThanEquals,
+    Between,
+    BeginsWith,
+)
+
+
+def conjuncts(condition: ConditionBase) -> List[ConditionBase]:
+    """Flattens a tree of AND conditions into its individual conditions"""
+    if isinstance(condition, And):
+        return [c for v in condition.get_expression()["values"] for c in conjuncts(v)]
+    return [condition]
+
+
+def key_attribute(condition: ConditionBase) -> str:
+    """
+    Returns the attribute name when the condition could be part of a key
+    condition (a comparison on a plain attribute), otherwise None
+    """
+    if not isinstance(condition, (Equals,) + _RANGE_CONDITIONS):
+        return None
+    subject = condition.get_expression()["values"][0]
+    if isinstance(subject, ConditionBase) or not isinstance(subject, AttributeBase):
+        return None
+    return subject.name
+
+
+def _as_key_condition(condition: ConditionBase) -> ConditionBase:
+    """Rebuilds a comparison made with Attr() so it can be used as a key condition"""
+    subject, *values = condition.get_expression()["values"]
+    return condition.__class__(Key(subject.name), *values)
+
+
+def _describe(value: Any) -> str:
+    """Renders a condition with its values replaced by placeholders"""
+    if isinstance(value, ConditionBase):
+        expression = value.get_expression()
+        return expression["format"].format(
+            *[_describe(v) for v in expression["values"]],
+            operator=expression["operator"],
+        )
+    if isinstance(value, AttributeBase):
+        return value.name
+    return "?"
+
+
+def _sort_key_range(conditions: List[ConditionBase]) -> tuple:
+    """
+    Picks the sort key condition of a query: an equality, else a lower and an
+    upper bound merged into a BETWEEN, else the first range condition. Returns
+    it with the conditions it stands for and the values excluded by strict
+    bounds of a merged range, which are dropped after reading
+    """
+    if not conditions:
+        return (None, [], [])
+    for condition in conditions:
+        if isinstance(condition, Equals):
+            return (condition, [condition], [])
+    lower = next(
+        (c for c in conditions if isinstance(c, (GreaterThan, GreaterThanEquals))),
+        None,
+    )
+    upper = next(
+        (c for c in conditions if isinstance(c, (LessThan, LessThanEquals))), None
+    )
+    if lower is None or upper is None:
+        return (conditions[0], [conditions[0]], [])
+    subject, low = lower.get_expression()["values"]
+    high = upper.get_expression()["values"][1]
+    excluded = [
+        value
+        for condition, value in ((lower, low), (upper, high))
+        if isinstance(condition, (GreaterThan, LessThan))
+    ]
+    return (Between(subject, low, high), [lower, upper], excluded)
+
+
+class Plan:
+    QUERY = "query"
+    SCAN = "scan"
+
+    def __init__(
+        self,
+        table,
+        operation: str,
+        index=None,
+        key_conditions: Sequence[ConditionBase] = (),
+        filter_conditions: Sequence[ConditionBase] = (),
+        attributes: Sequence[str] = None,
+        reasons: Sequence[str] = (),
+        excluded: Sequence[tuple] = (),
+    ):
+        self.table = table
+        self.operation = operation
+        self.index = index
+        self.key_conditions = list(key_conditions)
+        self.filter_conditions = list(filter_conditions)
+        self.attributes = attributes
+        self.reasons = list(reasons)
+        # (attribute, value) pairs read by the key condition but dropped
+        self.excluded = list(excluded)
+
+    @property
+    def key_condition(self) -> ConditionBase:
+        if not self.key_conditions:
+            return None
+        return functools.reduce(
+            lambda a, b: a & b, [_as_key_condition(c) for c in self.key_conditions]
+        )
+
+    @property
+    def filter_expression(self) -> ConditionBase:
+        if not self.filter_conditions:
+            return None
+        return functools.reduce(lambda a, b: a & b, self.filter_conditions)
+
+    def explain(self) -> str:
+        """Describes the chosen plan and why the alternatives were rejected"""
+        source = f"index {self.index.name}" if self.index else "base table"
+        lines = [f"{self.operation.upper()} {self.table.name} using {source}"]
+        if self.key_conditions:
+            lines.append(
+                "key condition: "
+                + " AND ".join(_describe(c) for c in self.key_conditions)
+            )
+        if self.filter_conditions:
+            lines.append(
+                "filter: " + " AND ".join(_describe(c) for c in self.filter_conditions)
+            )
+        if self.excluded:
+            lines.append(
+                "dropped after reading: "
+                + " AND ".join(f"{name} <> ?" for name, _ in self.excluded)
+            )
+        lines += [f"- {reason}" for reason in self.reasons]
+        return "\n".join(lines)
+
+    def execute(self, **kwargs) -> (List[dict], dict):
+        """
+        Runs one page of the plan. Keyword arguments (limit,
+        exclusive_start_key, result_format...) are passed to query/scan
+        """
+        kwargs.setdefault("attributes", self.attributes)
+        kwargs.setdefault("filter_expression", self.filter_expression)
+        if self.index:
+            kwargs["_index"] = self.index.name
+        if self.operation == Plan.SCAN:
+            return self.table.scan(**kwargs)
+        if not self.excluded:
+            return self.table.query(key_condition=self.key_condition, **kwargs)
+        return self._query_excluding(**kwargs)
+
+    def _query_excluding(self, **kwargs) -> (List[dict], dict):
+        name = self.excluded[0][0]
+        excluded = [value for _, value in self.excluded]
+        result_format = kwargs.pop("result_format", RESULT_FORMAT.DICT)
+        raw = result_format == RESULT_FORMAT.RAW
+        # Read with the sort key (and Decimal numbers), format once filtered
+        attributes = kwargs.get("attributes")
+        added = bool(attributes) and name not in attributes
+        if added:
+            kwargs["attributes"] = list(attributes) + [name]
+        if raw:
+            items, last_key = self.table.query(
+                key_condition=self.key_condition, result_format=result_format, **kwargs
+            )
+            deserializer = TypeDeserializer()
+            items = [
+                item
+                for item in items
+                if deserializer.deserialize(item[name]) not in excluded
+            ]
+        else:
+            numeric = kwargs.pop("numeric", None) or self.table.numeric
+            items, last_key = self.table.query(
+                key_condition=self.key_condition, numeric=NUMERIC.DECIMAL, **kwargs
+            )
+            items = [item for item in items if item[name] not in excluded]
+        if added:
+            for item in items:
+                del item[name]
+        if not raw:
+            items = format_items(items, attributes, result_format, numeric)
+        return (items, last_key)
+
+
+class QueryPlanner:
+    """
+    Chooses between the base table and the registered secondary indexes for a
+    condition. A candidate is usable when the condition has an equality on its
+    partition key and its projection holds every requested (and filtered)
+    attribute. Usable candidates are ranked by how much of the key they use,
+    then by how little they project, preferring the base table and LSIs over
+    GSIs. When nothing is usable the plan falls back to a filtered scan
+    """
+
+    def __init__(self, table):
+        self.table = table
+
+    def _candidates(self) -> list:
+        table = self.table
+        candidates = [(None, table.partition_key, table.sort_key)]
+        for index in table._local_secondary_indexes:
+            candidates.append((index, table.partition_key, index.sort_key))
+        for index in table._global_secondary_indexes:
+            candidates.append((index, index.partition_key, index.sort_key))
+        return candidates
+
+    def plan(
+        self,
+        condition: ConditionBase,
+        attributes: Sequence[str] = None,
+        consistent_read: bool = False,
+    ) -> Plan:
+        conditions = conjuncts(condition)
+        needed = set(attributes or []) | referenced_attributes(condition)
+        usable, rejected = [], []
+
+        for index, partition_key, sort_key in self._candidates():
+            name = f"index {index.name}" if index else "base table"
+            key_names = {partition_key.name, sort_key.name if sort_key else None}
+            equalities = [
+                c
+                for c in conditions
+                if isinstance(c, Equals) and key_attribute(c) == partition_key.name
+            ]
+            if not equalities:
+                rejected.append(f"{name}: no equality on {partition_key.name}")
+                continue
+            if consistent_read and isinstance(index, GlobalSecondaryIndex):
+                rejected.append(f"{name}: does not support consistent reads")
+                continue
+
+            projected = index.get_projected_attributes() if index else None
+            if projected is not None and not attributes:
+                rejected.append(f"{name}: does not project all attributes")
+                continue
+            if projected is not None and needed - projected:
+                missing = ", ".join(sorted(needed - projected))
+                rejected.append(f"{name}: projection is missing {missing}")
+                continue
+
+            sort_conditions = [
+                c for c in conditions if sort_key and key_attribute(c) == sort_key.name
+            ]
+            sort_condition, covered, excluded = _sort_key_range(sort_conditions)
+            key_conditions = [equalities[0]]
+            if sort_condition is not None:
+                key_conditions.append(sort_condition)
+            covered = [equalities[0]] + covered
+            filter_conditions = [
+                c for c in conditions if not any(c is k for k in covered)
+            ]
+            if any(referenced_attributes(c) & key_names for c in filter_conditions):
+                rejected.append(f"{name}: leftover conditions on its key attributes")
+                continue
+
+            if sort_condition is None:
+                sort_rank, uses = 2, "partition key"
+            elif isinstance(sort_condition, Equals):
+                sort_rank, uses = 0, "full key"
+            else:
+                sort_rank, uses = 1, "partition key and a sort key range"
+            rank = (
+                sort_rank,
+                len(projected) if projected is not None else float("inf"),
+                1 if isinstance(index, GlobalSecondaryIndex) else 0,
+            )
+            excluded = [(sort_key.name, value) for value in excluded]
+            usable.append(
+                (rank, name, uses, index, key_conditions, filter_conditions, excluded)
+            )
+
+        if not usable:
+            return Plan(
+                self.table,
+                Plan.SCAN,
+                filter_conditions=conditions,
+                attributes=attributes,
+                reasons=rejected + ["no usable key, falling back to a filtered scan"],
+            )
+
+        usable.sort(key=lambda candidate: candidate[0])
+        _, name, uses, index, key_conditions, filter_conditions, excluded = usable[0]
+        reasons = [f"{name}: chosen, queries on its {uses}"]
+        reasons += [
+            f"{candidate[1]}: usable but ranked lower" for candidate in usable[1:]
+        ]
+        return Plan(
+            self.table,
+            Plan.QUERY,
+            index=index,
+            key_conditions=key_conditions,
+            filter_conditions=filter_conditions,
+            attributes=attributes,
+            reasons=reasons + rejected,
+            excluded=excluded,
+        )
@@ -0,0 +1,103 @@
+from __future__ import annotations
+from decimal import Context, Decimal
+from typing import Any, List
+
+from boto3.dynamodb.types import Binary
+
+from .enums import DATATYPE
+
+# DynamoDB numbers have up to 38 significant digits
+_CONTEXT = Context(prec=38)
+
+# How many characters (or bytes) past the common prefix of the bounds are
+# interpolated, enough to tell apart far more ranges than anyone runs
+_WIDTH = 8
+
+_CODE_POINTS = 0x110000
+
+
+def _interpolate(low: int, high: int, splits: int) -> List[int]:
+    return [low + (high - low) * i // splits for i in range(1, splits)]
+
+
+def _to_digits(values: List[int], width: int, base: int) -> int:
+    number = 0
+    for i in range(width):
+        number = number * base + (values[i] if i < len(values) else 0)
+    return number
+
+
+def _from_digits(number: int, width: int, base: int) -> List[int]:
+    digits = []
+    for _ in range(width):
+        number, digit = divmod(number, base)
+        digits.append(digit)
+    digits.reverse()
+    # Trailing zeros were padding, the shorter value sorts first anyway
+    while digits and digits[-1] == 0:
+        digits.pop()
+    return digits
+
+
+def _split_sequence(low, high, splits: int, base: int) -> List[List[int]]:
+    """
+    Splits the range between two sequences of digits (code points or bytes)
+    evenly, treating the part after their common prefix as a number
+    """
+    prefix = 0
+    while prefix < min(len(low), len(high)) and low[prefix] == high[prefix]:
+        prefix += 1
+    low_number = _to_digits(low[prefix:], _WIDTH, base)
+    high_number = _to_digits(high[prefix:], _WIDTH, base)
+    return [
+        list(low[:prefix]) + _from_digits(number, _WIDTH, base)
+        for number in _interpolate(low_number, high_number, splits)
+    ]
+
+
+def _to_char(code_point: int) -> str:
+    if 0xD800 <= code_point <= 0xDFFF:  # surrogates can't be stored
+        code_point = 0xE000
+    return chr(code_point)
+
+
+def split_range(low: Any, high: Any, splits: int, datatype: DATATYPE) -> List[Any]:
+    """
+    Returns up to splits - 1 values strictly between low and high that cut
+    the range into splits parts of about equal width. Numbers are split
+    arithmetically, integers staying integers. Strings and binary values are
+    split lexicographically, the order DynamoDB sorts them in
+    """
+    if splits < 1:
+        raise ValueError("splits must be at least 1")
+    if datatype == DATATYPE.NUMBER:
+        low, high = Decimal(low), Decimal(high)
+        if low == low.to_integral_value() and high == high.to_integral_value():
+            boundaries = [Decimal(b) for b in _interpolate(int(low), int(high), splits)]
+        else:
+            width = _CONTEXT.subtract(high, low)
+            boundaries = [
+                _CONTEXT.add(low, _CONTEXT.divide(_CONTEXT.multiply(width, i), splits))
+                for i in range(1, splits)
+            ]
+    elif datatype == DATATYPE.STRING:
+        low_points, high_points = [ord(c) for c in low], [ord(c) for c in high]
+        # ASCII keys are split over ASCII so the ranges aren't all empty but one
+        ascii = max(low_points + high_points, default=0) < 0x80
+        base = 0x80 if ascii else _CODE_POINTS
+        digits = _split_sequence(low_points, high_points, splits, base)
+        boundaries = ["".join(_to_char(d) for d in b) for b in digits]
+    elif datatype == DATATYPE.BINARY:
+        low = low.value if isinstance(low, Binary) else bytes(low)
+        high = high.value if isinstance(high, Binary) else bytes(high)
+        boundaries = [bytes(b) for b in _split_sequence(low, high, splits, 256)]
+    else:
+        raise ValueError(f"Can't split a range of {datatype} values")
+
+    unique = []
+    for boundary in boundaries:
+        if low < boundary < high and (not unique or boundary > unique[-1]):
+            unique.append(boundary)
+    if datatype == DATATYPE.BINARY:
+        return [Binary(b) for b in unique]
+    return unique
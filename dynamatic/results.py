@@ -0,0 +1,239 @@
+from __future__ import annotations
+from array import array
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Set
+import collections
+import copy
+import functools
+import sys
+
+from boto3.dynamodb.conditions import AttributeBase, ConditionBase
+
+from .enums import NUMERIC, RESULT_FORMAT
+from .wire import deserializer
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+def _native_number(value: Decimal) -> Any:
+    integral = int(value)
+    return integral if integral == value else float(value)
+
+
+def convert_numbers(value: Any, convert: Callable[[Decimal], Any]) -> Any:
+    """
+    Applies convert to a Decimal or to every Decimal nested inside maps, lists
+    and sets
+    """
+    if isinstance(value, Decimal):
+        return convert(value)
+    if isinstance(value, dict):
+        return {k: convert_numbers(v, convert) for k, v in value.items()}
+    if isinstance(value, list):
+        return [convert_numbers(v, convert) for v in value]
+    if isinstance(value, set) and value and isinstance(next(iter(value)), Decimal):
+        return {convert(v) for v in value}
+    return value
+
+
+def to_native(value: Any) -> Any:
+    """Converts Decimals to an int when integral and a float otherwise"""
+    return convert_numbers(value, _native_number)
+
+
+def to_float(value: Any) -> Any:
+    """Converts Decimals to floats"""
+    return convert_numbers(value, float)
+
+
+def decode_numbers(value: Any, numeric: NUMERIC = NUMERIC.DECIMAL) -> Any:
+    """Converts the numbers in a decoded value according to the numeric policy"""
+    if numeric == NUMERIC.DECIMAL:
+        return value
+    if numeric == NUMERIC.NATIVE:
+        return to_native(value)
+    if numeric == NUMERIC.FLOAT:
+        return to_float(value)
+    raise ValueError(f"Unknown numeric policy: {numeric}")
+
+
+def encode_numbers(value: Any) -> Any:
+    """
+    Converts floats (including nested ones) to Decimals so they can be written
+    without boto3 raising Inexact/Rounded errors
+    """
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    if isinstance(value, dict):
+        return {k: encode_numbers(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [encode_numbers(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return {encode_numbers(v) for v in value}
+    if isinstance(value, tuple):
+        return tuple(encode_numbers(v) for v in value)
+    return value
+
+
+def encode_condition(condition: Any) -> Any:
+    """
+    Encodes the floats a condition object (or an expression string, left
+    as it is) compares against, like encode_numbers
+    """
+    if not isinstance(condition, ConditionBase):
+        return condition
+    values = []
+    for value in condition._values:
+        if isinstance(value, ConditionBase):
+            values.append(encode_condition(value))
+        elif isinstance(value, AttributeBase):
+            values.append(value)
+        else:
+            values.append(encode_numbers(value))
+    encoded = copy.copy(condition)
+    encoded._values = tuple(values)
+    return encoded
+
+
+def referenced_attributes(condition: ConditionBase) -> Set[str]:
+    """Returns the top-level attribute names referenced anywhere in a condition"""
+    names = set()
+    for value in condition.get_expression()["values"]:
+        if isinstance(value, ConditionBase):
+            names |= referenced_attributes(value)
+        elif isinstance(value, AttributeBase):
+            names.add(value.name.split(".")[0].split("[")[0])
+    return names
+
+
+@functools.lru_cache(maxsize=256)
+def row_type(attributes: Sequence[str]) -> type:
+    """
+    Returns a compact named tuple class for the given projection. Attribute
+    names that aren't valid identifiers are renamed positionally (_0, _1...)
+    """
+    names = tuple(sys.intern(attribute) for attribute in attributes)
+    return collections.namedtuple("Row", names, rename=True)
+
+
+def format_items(
+    items: List[dict],
+    attributes: Sequence[str] = None,
+    result_format: RESULT_FORMAT = RESULT_FORMAT.DICT,
+    numeric: NUMERIC = NUMERIC.DECIMAL,
+) -> list:
+    """
+    Converts items into the requested result format. Compact formats hold one
+    value per projected attribute (None when missing) in projection order and
+    always use native numbers (floats when the numeric policy is FLOAT)
+    """
+    if result_format == RESULT_FORMAT.DICT:
+        if numeric == NUMERIC.DECIMAL:
+            return items
+        return [decode_numbers(item, numeric) for item in items]
+    if not attributes:
+        raise ValueError(f"{result_format} results require a list of attributes")
+
+    attributes = tuple(attributes)
+    if result_format == RESULT_FORMAT.TUPLE:
+        build = tuple
+    elif result_format == RESULT_FORMAT.ROW:
+        build = row_type(attributes)._make
+    else:
+        raise ValueError(f"Unknown result format: {result_format}")
+    convert = to_float if numeric == NUMERIC.FLOAT else to_native
+    return [build([convert(item.get(a)) for a in attributes]) for item in items]
+
+
+def _parse_number(text: str) -> Any:
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+class Column:
+    """
+    A growable column holding one attribute of every item. Numbers are kept in
+    an array.array (int64, widened to float64 when needed), strings and other
+    values in a list. mask holds a 1 for every item missing the attribute
+    """
+
+    NUMBER = "number"
+    STRING = "string"
+    OBJECT = "object"
+
+    def __init__(self, name: str):
+        self.name = name
+        self.kind = None
+        self.values = []
+        self.mask = bytearray()
+
+    def __len__(self):
+        return len(self.mask)
+
+    def _promote(self, kind: str):
+        if kind == Column.NUMBER:
+            self.values = array("q", (0 for _ in self.mask))
+        elif self.kind == Column.NUMBER:
+            self.values = [
+                None if missing else value
+                for value, missing in zip(self.values, self.mask)
+            ]
+        self.kind = kind
+
+    def _append_number(self, number):
+        try:
+            self.values.append(number)
+        except TypeError:
+            self.values = array("d", self.values)
+            self.values.append(number)
+        except OverflowError:
+            self.values = array("d", self.values)
+            self.values.append(float(number))
+
+    def append(self, value: dict = None):
+        """Appends a wire format value, or a missing value when value is None"""
+        if value is None:
+            self.mask.append(1)
+            self.values.append(0 if self.kind == Column.NUMBER else None)
+            return
+
+        ((datatype, data),) = value.items()
+        if datatype == "N" and self.kind in (None, Column.NUMBER):
+            if self.kind is None:
+                self._promote(Column.NUMBER)
+            self._append_number(_parse_number(data))
+        elif datatype == "S" and self.kind in (None, Column.STRING):
+            self.kind = Column.STRING
+            self.values.append(data)
+        else:
+            if self.kind != Column.OBJECT:
+                self._promote(Column.OBJECT)
+            self.values.append(to_native(deserializer.deserialize(value)))
+        self.mask.append(0)
+
+    def finish(self) -> Column:
+        """Converts numeric columns and the mask to NumPy arrays when available"""
+        if numpy is not None:
+            if self.kind == Column.NUMBER:
+                self.values = numpy.frombuffer(self.values, dtype=self.values.typecode)
+            self.mask = numpy.frombuffer(self.mask, dtype=bool)
+        return self
+
+
+def build_columns(
+    attributes: Sequence[str], pages: Iterable[List[Dict[str, dict]]]
+) -> Dict[str, Column]:
+    """Streams pages of wire format items into one Column per attribute"""
+    columns = {attribute: Column(attribute) for attribute in attributes}
+    appenders = [(attribute, column.append) for attribute, column in columns.items()]
+    for items in pages:
+        for item in items:
+            get = item.get
+            for attribute, append in appenders:
+                append(get(attribute))
+    return {attribute: column.finish() for attribute, column in columns.items()}
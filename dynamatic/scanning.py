@@ -0,0 +1,355 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Sequence, Union
+import base64
+import json
+import math
+import os
+import shutil
+import threading
+
+from .enums import NUMERIC
+from .results import encode_numbers
+from .wire import serialize_item, deserialize_item
+
+# DynamoDB stops a scan page at 1MB, and allows up to 1,000,000 segments
+PAGE_BYTES = 1024 * 1024
+MAX_SEGMENTS = 1000000
+
+
+def choose_segments(
+    size_bytes: int,
+    item_count: int = None,
+    read_capacity: float = None,
+    consistent_read: bool = False,
+    page_size: int = None,
+    max_workers: int = 16,
+    oversplit: int = 4,
+    page_latency: float = 0.05,
+) -> (int, int):
+    """
+    Picks (total_segments, workers) for a parallel scan of size_bytes of
+    data. Workers are added until together they can consume read_capacity
+    units per second, assuming each page takes page_latency seconds (and up
+    to max_workers when the capacity is on-demand). There are oversplit
+    segments per worker so workers finishing early pick up the remaining
+    segments, but never more segments than pages
+    """
+    page_bytes = PAGE_BYTES
+    if page_size and item_count:
+        page_bytes = min(PAGE_BYTES, page_size * size_bytes / item_count)
+    pages = max(1, math.ceil(size_bytes / max(page_bytes, 1)))
+
+    workers = min(max_workers, pages)
+    if read_capacity:
+        units_per_page = math.ceil(page_bytes / 4096) * (1 if consistent_read else 0.5)
+        pages_per_second = read_capacity / max(units_per_page, 0.5)
+        workers = min(workers, max(1, math.ceil(pages_per_second * page_latency)))
+    total_segments = min(pages, workers * oversplit, MAX_SEGMENTS)
+    return (max(total_segments, workers), workers)
+
+
+def _encode_key(key: dict) -> dict:
+    """Converts a key to JSON-friendly wire format (binary values as base64)"""
+    encoded = {}
+    for name, value in serialize_item(encode_numbers(key)).items():
+        if "B" in value:
+            value = {"B": base64.b64encode(value["B"]).decode("ascii")}
+        encoded[name] = value
+    return encoded
+
+
+def _decode_key(key: dict) -> dict:
+    decoded = {}
+    for name, value in key.items():
+        if "B" in value:
+            value = {"B": base64.b64decode(value["B"])}
+        decoded[name] = value
+    return deserialize_item(decoded)
+
+
+class SegmentProgress:
+    def __init__(
+        self,
+        segment: int,
+        last_key: dict = None,
+        done: bool = False,
+        items: int = 0,
+        pages: int = 0,
+        total_segments: int = None,
+    ):
+        self.segment = segment
+        self.last_key = last_key
+        self.done = done
+        self.items = items
+        self.pages = pages
+        self.total_segments = total_segments
+
+    def export(self) -> dict:
+        return {
+            "segment": self.segment,
+            "last_key": _encode_key(self.last_key) if self.last_key else None,
+            "done": self.done,
+            "items": self.items,
+            "pages": self.pages,
+            "total_segments": self.total_segments,
+        }
+
+    @classmethod
+    def load(cls, data: dict) -> SegmentProgress:
+        last_key = data.get("last_key")
+        return cls(
+            segment=data["segment"],
+            last_key=_decode_key(last_key) if last_key else None,
+            done=data.get("done", False),
+            items=data.get("items", 0),
+            pages=data.get("pages", 0),
+            total_segments=data.get("total_segments"),
+        )
+
+
+class CheckpointStore:
+    """Persists the progress of every segment of a scan, keyed by scan id"""
+
+    def load(self, scan_id: str) -> Dict[int, SegmentProgress]:
+        raise NotImplementedError()
+
+    def save(self, scan_id: str, progress: SegmentProgress):
+        raise NotImplementedError()
+
+    def clear(self, scan_id: str):
+        raise NotImplementedError()
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    def __init__(self):
+        self._scans = {}
+        self._lock = threading.Lock()
+
+    def load(self, scan_id: str) -> Dict[int, SegmentProgress]:
+        with self._lock:
+            segments = self._scans.get(scan_id, {})
+            return {s: SegmentProgress.load(p) for s, p in segments.items()}
+
+    def save(self, scan_id: str, progress: SegmentProgress):
+        with self._lock:
+            self._scans.setdefault(scan_id, {})[progress.segment] = progress.export()
+
+    def clear(self, scan_id: str):
+        with self._lock:
+            self._scans.pop(scan_id, None)
+
+
+class FileCheckpointStore(CheckpointStore):
+    """
+    Stores a directory per scan holding one JSON file per segment, replaced
+    atomically on every save. Segments are saved independently, so workers
+    don't wait on each other's checkpoint writes
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, scan_id: str) -> str:
+        safe_id = "".join(c if c.isalnum() or c in "-_." else "_" for c in scan_id)
+        return os.path.join(self.directory, safe_id)
+
+    def load(self, scan_id: str) -> Dict[int, SegmentProgress]:
+        segments = {}
+        path = self._path(scan_id)
+        try:
+            names = os.listdir(path)
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(path, name), "r") as fh:
+                segments[int(name[:-5])] = json.load(fh)
+        return {s: SegmentProgress.load(p) for s, p in segments.items()}
+
+    def save(self, scan_id: str, progress: SegmentProgress):
+        directory = self._path(scan_id)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{progress.segment}.json")
+        with open(path + ".tmp", "w") as fh:
+            json.dump(progress.export(), fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(path + ".tmp", path)
+
+    def clear(self, scan_id: str):
+        shutil.rmtree(self._path(scan_id), ignore_errors=True)
+
+
+class ScanRunner:
+    """
+    Runs a (parallel) scan of a table or secondary index, checkpointing the
+    LastEvaluatedKey of every segment after each page has been handled. A new
+    runner with the same store and scan id resumes where the last one stopped.
+    Pages are handed to the callback from several threads at once and may be
+    delivered again after a restart (at-least-once).
+
+    With total_segments=AUTO the segment and worker counts are chosen when the
+    scan starts from the size, item count and read capacity DescribeTable
+    reports (see choose_segments). A resumed scan keeps its segment count
+    """
+
+    AUTO = "auto"
+
+    def __init__(
+        self,
+        source,
+        total_segments: Union[int, str] = 1,
+        store: CheckpointStore = None,
+        scan_id: str = None,
+        workers: int = None,
+        filter_expression=None,
+        attributes: Sequence[str] = None,
+        consistent_read: bool = False,
+        page_size: int = None,
+        numeric: NUMERIC = None,
+    ):
+        self.source = source
+        self.total_segments = total_segments
+        self.store = store or MemoryCheckpointStore()
+        self.scan_id = scan_id or self._default_scan_id()
+        self.workers = workers
+        self.filter_expression = filter_expression
+        self.attributes = attributes
+        self.consistent_read = consistent_read
+        self.page_size = page_size
+        self.numeric = numeric
+        self._segments = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _default_scan_id(self) -> str:
+        table = getattr(self.source, "_table", None)
+        if table is not None:
+            return f"{table.name}.{self.source.name}.{self.total_segments}"
+        return f"{self.source.name}.{self.total_segments}"
+
+    def _describe_source(self) -> dict:
+        """Returns the size, item count and read capacity of the source"""
+        table = getattr(self.source, "_table", None)
+        description = (table or self.source).describe_table()
+        described = description
+        capacity = description.get("ProvisionedThroughput", {})
+        if table is not None:
+            indexes = description.get("GlobalSecondaryIndexes", []) + description.get(
+                "LocalSecondaryIndexes", []
+            )
+            for index in indexes:
+                if index["IndexName"] == self.source.name:
+                    described = index
+                    # Local indexes share the table's capacity
+                    capacity = index.get("ProvisionedThroughput", capacity)
+        return {
+            "size_bytes": described.get(
+                "IndexSizeBytes", described.get("TableSizeBytes", 0)
+            ),
+            "item_count": described.get("ItemCount", 0),
+            # On-demand tables report 0
+            "read_capacity": capacity.get("ReadCapacityUnits") or None,
+        }
+
+    def _resolve_segments(self, saved: Dict[int, SegmentProgress]):
+        if self.total_segments != self.AUTO:
+            return
+        for progress in saved.values():
+            if progress.total_segments:
+                self.total_segments = progress.total_segments
+                return
+        self.total_segments, workers = choose_segments(
+            consistent_read=self.consistent_read,
+            page_size=self.page_size,
+            **self._describe_source(),
+        )
+        self.workers = self.workers or workers
+
+    def _check_saved(self, saved: Dict[int, SegmentProgress]):
+        """
+        Refuses to resume checkpoints of a different segmentation, whose
+        resume keys would skip or repeat items
+        """
+        for progress in saved.values():
+            saved_segments = progress.total_segments
+            if (
+                saved_segments and saved_segments != self.total_segments
+            ) or progress.segment >= self.total_segments:
+                raise ValueError(
+                    f"Scan {self.scan_id!r} was checkpointed with "
+                    f"{saved_segments or 'more'} segments, not {self.total_segments}: "
+                    "reset() it or use another scan_id"
+                )
+
+    def _scan_segment(self, progress: SegmentProgress, callback: Callable):
+        while not progress.done and not self._stop.is_set():
+            items, last_key = self.source.scan(
+                filter_expression=self.filter_expression,
+                attributes=self.attributes,
+                limit=self.page_size,
+                consistent_read=self.consistent_read,
+                total_segments=self.total_segments,
+                segment=progress.segment,
+                exclusive_start_key=progress.last_key,
+                numeric=self.numeric,
+            )
+            callback(items)
+            with self._lock:
+                progress.items += len(items)
+                progress.pages += 1
+                progress.last_key = last_key
+                progress.done = not last_key
+            self.store.save(self.scan_id, progress)
+
+    def run(self, callback: Callable[[List[dict]], None]):
+        """Scans every unfinished segment, passing each page to callback"""
+        self._stop.clear()
+        saved = self.store.load(self.scan_id)
+        self._resolve_segments(saved)
+        self._check_saved(saved)
+        self._segments = {
+            s: saved.get(s) or SegmentProgress(s) for s in range(self.total_segments)
+        }
+        for progress in self._segments.values():
+            progress.total_segments = self.total_segments
+        # Segments are handed to workers as they free up, so with more
+        # segments than workers the ones finishing early take on more
+        pending = [p for p in self._segments.values() if not p.done]
+        workers = self.workers or self.total_segments
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._scan_segment, progress, callback)
+                for progress in pending
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                self._stop.set()
+                raise
+
+    def stop(self):
+        """Asks the running scan to stop once the in-flight pages are handled"""
+        self._stop.set()
+
+    def reset(self):
+        """Discards the checkpoints so the next run starts from the beginning"""
+        self.store.clear(self.scan_id)
+        self._segments = {}
+
+    def progress(self) -> dict:
+        with self._lock:
+            segments = list(self._segments.values())
+        if not segments:
+            segments = list(self.store.load(self.scan_id).values())
+        return {
+            "total_segments": self.total_segments,
+            "completed_segments": sum(1 for p in segments if p.done),
+            "items": sum(p.items for p in segments),
+            "pages": sum(p.pages for p in segments),
+            "done": bool(segments) and all(p.done for p in segments),
+        }
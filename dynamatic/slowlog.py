@@ -0,0 +1,160 @@
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional
+import collections
+import random
+import re
+import threading
+import time
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+
+from .middleware import Middleware, OperationContext
+
+_VALUE_PLACEHOLDER = re.compile(r":[A-Za-z0-9_]+")
+
+# Operations DynamoDB can report consumed capacity for
+_CAPACITY_OPERATIONS = {
+    "get_item",
+    "batch_get_item",
+    "query",
+    "scan",
+    "put_item",
+    "update_item",
+    "delete_item",
+    "batch_write_item",
+}
+
+
+def expression_shape(
+    expression, names: Dict[str, str] = None, is_key_condition: bool = False
+) -> Optional[str]:
+    """
+    Renders a condition (a condition object or an expression string) with
+    the attribute names filled in and every value replaced by ?, e.g.
+    "pk = ? AND begins_with(sk, ?)"
+    """
+    if expression is None:
+        return None
+    names = dict(names or {})
+    if isinstance(expression, ConditionBase):
+        built = ConditionExpressionBuilder().build_expression(
+            expression, is_key_condition=is_key_condition
+        )
+        names.update(built.attribute_name_placeholders)
+        expression = built.condition_expression
+    # Longest placeholders first so #n1 doesn't clobber #n10
+    for placeholder in sorted(names, key=len, reverse=True):
+        expression = expression.replace(placeholder, names[placeholder])
+    return _VALUE_PLACEHOLDER.sub("?", expression)
+
+
+def _consumed_capacity(response: dict) -> Optional[float]:
+    consumed = response.get("ConsumedCapacity")
+    if consumed is None:
+        return None
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return sum(c.get("CapacityUnits", 0) for c in consumed)
+
+
+def _counts(operation: str, response: dict) -> (Optional[int], Optional[int]):
+    """Returns the number of items returned and read"""
+    if "Count" in response:
+        return (response["Count"], response.get("ScannedCount"))
+    if operation == "get_item":
+        found = int("Item" in response)
+        return (found, found)
+    if operation == "batch_get_item":
+        returned = sum(len(items) for items in response.get("Responses", {}).values())
+        return (returned, returned)
+    return (None, None)
+
+
+class SlowOperationLog(Middleware):
+    """
+    Records table operations slower than threshold seconds, plus a sample
+    (sample_rate, a fraction) of all other operations as a baseline. Each
+    record holds the request shape with values redacted, the projection, how
+    many items were returned against how many were read and the consumed
+    capacity, which is requested from DynamoDB unless track_capacity is off.
+    Only the last capacity records are kept. Each query or scan page is a
+    record of its own; continued tells whether it was a follow-up page and
+    has_more whether another one followed
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.1,
+        capacity: int = 1000,
+        sample_rate: float = 0.0,
+        track_capacity: bool = True,
+        on_record: Callable[[dict], None] = None,
+    ):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.track_capacity = track_capacity
+        self.on_record = on_record
+        self._records = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def __call__(self, context: OperationContext, call_next: Callable) -> dict:
+        if self.track_capacity and context.operation in _CAPACITY_OPERATIONS:
+            if "ReturnConsumedCapacity" not in context.request:
+                context.request = dict(context.request, ReturnConsumedCapacity="TOTAL")
+        start = time.monotonic()
+        error = None
+        try:
+            return call_next(context)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            slow = elapsed >= self.threshold
+            if slow or (self.sample_rate and random.random() < self.sample_rate):
+                self._record(context, elapsed, slow, error)
+
+    def _record(
+        self, context: OperationContext, elapsed: float, slow: bool, error: Exception
+    ):
+        request = context.request
+        response = context.response or {}
+        names = request.get("ExpressionAttributeNames")
+        returned, scanned = _counts(context.operation, response)
+        record = {
+            "time": time.time(),
+            "operation": context.operation,
+            "table": context.table.name,
+            "index": context.index,
+            "elapsed": elapsed,
+            "slow": slow,
+            "key_condition": expression_shape(
+                request.get("KeyConditionExpression"), names, is_key_condition=True
+            ),
+            "filter": expression_shape(request.get("FilterExpression"), names),
+            "condition": expression_shape(request.get("ConditionExpression"), names),
+            "projection": expression_shape(request.get("ProjectionExpression"), names),
+            "limit": request.get("Limit"),
+            "continued": "ExclusiveStartKey" in request,
+            "has_more": bool(response.get("LastEvaluatedKey")),
+            "returned": returned,
+            "scanned": scanned,
+            "consumed_capacity": _consumed_capacity(response),
+            "error": repr(error) if error is not None else None,
+        }
+        with self._lock:
+            self._records.append(record)
+        if self.on_record:
+            self.on_record(record)
+
+    def dump(self, slow_only: bool = False) -> List[dict]:
+        """Returns the recorded operations, oldest first"""
+        with self._lock:
+            records = list(self._records)
+        if slow_only:
+            records = [r for r in records if r["slow"]]
+        return [dict(r) for r in records]
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
@@ -0,0 +1,511 @@
+from __future__ import annotations
+from typing import Any, Callable, List, Sequence, Union
+import io
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+
+from .concurrency import RateLimiter
+from .enums import NUMERIC
+from .exceptions import ClientError, ThrottledException, handle_client_error
+from .expressions import UpdateExpression
+from .results import encode_numbers
+from .table_mixins import _prepare_item, _update_request
+from .wire import dump_value, load_value
+
+# A record is a header (kind, payload length, payload crc32) and a JSON
+# payload, zlib compressed when the compressed flag is set on the kind
+_HEADER = struct.Struct(">BII")
+_COMPRESSED = 0x80
+_COMPRESS_AT = 1024
+
+_PUT = 1
+_UPDATE = 2
+_DELETE = 3
+_KINDS = (_PUT, _UPDATE, _DELETE)
+
+# Request parts holding python values, the others are plain strings
+_VALUE_KEYS = ("Key", "ExpressionAttributeValues")
+
+_CHECKPOINT = "checkpoint.json"
+
+logger = logging.getLogger(__name__)
+
+
+def _segment_name(sequence: int) -> str:
+    return f"spool-{sequence:012d}.log"
+
+
+def _encode_record(kind: int, payload: dict) -> bytes:
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    if len(data) >= _COMPRESS_AT:
+        compressed = zlib.compress(data)
+        if len(compressed) < len(data):
+            kind, data = kind | _COMPRESSED, compressed
+    return _HEADER.pack(kind, len(data), zlib.crc32(data)) + data
+
+
+def _read_record(stream, remaining: int = None) -> (int, dict, int):
+    """
+    Reads the record at the current position of stream and returns its
+    kind, payload and size, or None when it is missing, partial or corrupt.
+    A header with an unknown kind, or a length past the remaining bytes when
+    they are given, is rejected before the payload is read
+    """
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    kind, length, crc = _HEADER.unpack(header)
+    if kind & ~_COMPRESSED not in _KINDS:
+        return None
+    if remaining is not None and _HEADER.size + length > remaining:
+        return None
+    data = stream.read(length)
+    if len(data) < length or zlib.crc32(data) != crc:
+        return None
+    if kind & _COMPRESSED:
+        kind, data = kind & ~_COMPRESSED, zlib.decompress(data)
+    return (kind, json.loads(data.decode("utf-8")), _HEADER.size + length)
+
+
+def _split_records(data: bytes) -> (List[bytes], int):
+    """
+    Splits the records of a segment, skipping each corrupt stretch up to the
+    next record that reads back intact. Returns the intact records and the
+    number of stretches skipped; a torn record at the end isn't counted
+    """
+    stream = io.BytesIO(data)
+    records, corrupt, position = [], 0, 0
+    while position < len(data):
+        stream.seek(position)
+        record = _read_record(stream, len(data) - position)
+        if record is not None:
+            records.append(data[position : position + record[2]])
+            position += record[2]
+            continue
+        # Probe the following offsets, reading only plausible headers
+        following = position + 1
+        while following < len(data):
+            if data[following] & ~_COMPRESSED in _KINDS:
+                stream.seek(following)
+                if _read_record(stream, len(data) - following) is not None:
+                    break
+            following += 1
+        if following == len(data):
+            break
+        corrupt += 1
+        position = following
+    return (records, corrupt)
+
+
+def _dump_request(request: dict) -> dict:
+    return {
+        k: (
+            {name: dump_value(v) for name, v in value.items()}
+            if k in _VALUE_KEYS
+            else value
+        )
+        for k, value in request.items()
+    }
+
+
+def _load_request(payload: dict) -> dict:
+    return {
+        k: (
+            {name: load_value(v) for name, v in value.items()}
+            if k in _VALUE_KEYS
+            else value
+        )
+        for k, value in payload.items()
+    }
+
+
+class WriteSpool:
+    """
+    Absorbs write throttling by appending the writes DynamoDB rejects to an
+    append-only log in directory and replaying them on a background thread,
+    paced to max_rate writes per second and backing off while throttled.
+    While anything is spooled, new writes are spooled behind it so they are
+    applied in order. Consecutive puts and deletes are replayed with
+    BatchWriteItem, updates one by one.
+
+    The log survives restarts: a new spool on the same directory resumes
+    from the last checkpoint and drops a record torn by a crash. Records
+    found corrupt earlier in the log are skipped and logged. Delivery is
+    at least once, so a write may be replayed twice after a crash; keep
+    spooled updates idempotent (Set rather than Add). Conditions and return
+    values aren't supported since a spooled write can't report them. Writes
+    failing with anything but throttling are passed to on_error(kind,
+    request, error) and dropped
+    """
+
+    def __init__(
+        self,
+        table,
+        directory: str,
+        max_rate: float = None,
+        segment_bytes: int = 16 * 1024 * 1024,
+        fsync: bool = True,
+        on_error: Callable[[str, dict, Exception], None] = None,
+        max_backoff: float = 5.0,
+    ):
+        self.table = table
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.on_error = on_error
+        self.max_backoff = max_backoff
+        self._limiter = RateLimiter(max_rate) if max_rate else None
+        self._key_names = [k.name for k in (table.partition_key, table.sort_key) if k]
+        self._condition = threading.Condition()
+        self._closed = False
+        self._stats = {
+            "direct": 0,
+            "spooled": 0,
+            "replayed": 0,
+            "throttled": 0,
+            "failed": 0,
+            "corrupt": 0,
+        }
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+        self._thread = threading.Thread(
+            target=self._drain, name="dynamatic-spool", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> WriteSpool:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Recovery and the log
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _segments(self) -> List[int]:
+        return sorted(
+            int(name[6:-4])
+            for name in os.listdir(self.directory)
+            if name.startswith("spool-") and name.endswith(".log")
+        )
+
+    def _recover(self):
+        try:
+            with open(self._path(_CHECKPOINT)) as f:
+                checkpoint = json.load(f)
+            read_segment, read_offset = checkpoint["segment"], checkpoint["offset"]
+        except FileNotFoundError:
+            read_segment, read_offset = 0, 0
+        segments = self._segments()
+        for sequence in segments:
+            if sequence < read_segment:
+                os.remove(self._path(_segment_name(sequence)))
+        segments = [s for s in segments if s >= read_segment]
+        if segments and segments[0] > read_segment:
+            read_segment, read_offset = segments[0], 0
+
+        pending = 0
+        for sequence in segments:
+            path = self._path(_segment_name(sequence))
+            start = read_offset if sequence == read_segment else 0
+            with open(path, "rb") as f:
+                data = f.read()
+            records, corrupt = _split_records(data[start:])
+            pending += len(records)
+            intact = b"".join(records)
+            if corrupt:
+                logger.warning(
+                    "Skipped %d corrupt stretch(es) of %s, %d bytes lost",
+                    corrupt,
+                    path,
+                    len(data) - start - len(intact),
+                )
+                self._stats["corrupt"] += corrupt
+                # Replayed records stay so the checkpoint offset holds
+                with open(path + ".tmp", "wb") as f:
+                    f.write(data[:start] + intact)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(path + ".tmp", path)
+            elif len(intact) < len(data) - start:
+                # Drops a record torn by a crash
+                with open(path, "r+b") as f:
+                    f.truncate(start + len(intact))
+
+        self._read_segment, self._read_offset = read_segment, read_offset
+        self._write_segment = segments[-1] if segments else max(read_segment, 1)
+        self._writer = open(self._path(_segment_name(self._write_segment)), "ab")
+        self._write_offset = self._writer.tell()
+        if not segments:
+            self._read_segment, self._read_offset = self._write_segment, 0
+        self._pending = pending
+
+    def _append(self, kind: int, payload: dict):
+        record = _encode_record(kind, payload)
+        with self._condition:
+            if self._closed:
+                raise ValueError("The spool is closed")
+            if self._write_offset and self._write_offset + len(record) > (
+                self.segment_bytes
+            ):
+                self._writer.close()
+                self._write_segment += 1
+                self._writer = open(
+                    self._path(_segment_name(self._write_segment)), "ab"
+                )
+                self._write_offset = 0
+            self._writer.write(record)
+            self._writer.flush()
+            if self.fsync:
+                os.fsync(self._writer.fileno())
+            self._write_offset += len(record)
+            self._pending += 1
+            self._stats["spooled"] += 1
+            self._condition.notify_all()
+
+    def _checkpoint(self):
+        path = self._path(_CHECKPOINT)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"segment": self._read_segment, "offset": self._read_offset}, f)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    # Writing
+
+    def _write(self, kind: int, send: Callable, prepare: Callable, deferred: bool):
+        with self._condition:
+            direct = not deferred and not self._pending
+        if direct:
+            try:
+                send()
+                with self._condition:
+                    self._stats["direct"] += 1
+                return True
+            except ThrottledException:
+                with self._condition:
+                    self._stats["throttled"] += 1
+        self._append(kind, prepare())
+        return False
+
+    def put(self, item: dict, deferred: bool = False) -> bool:
+        """
+        Puts item, or spools it when throttled, deferred or queued writes
+        are waiting. Returns whether it was written straight away
+        """
+        return self._write(
+            _PUT,
+            lambda: self.table.put(item),
+            lambda: dump_value(_prepare_item(self.table, item, self.table.numeric)),
+            deferred,
+        )
+
+    def update(
+        self,
+        key: Union[Any, Sequence[Any, Any]],
+        updates: Union[UpdateExpression, List[UpdateExpression]],
+        deferred: bool = False,
+    ) -> bool:
+        def prepare():
+            request, _ = _update_request(self.table, key, updates, self.table.numeric)
+            return _dump_request(request)
+
+        return self._write(
+            _UPDATE, lambda: self.table.update(key, updates), prepare, deferred
+        )
+
+    def delete(
+        self, key: Union[Any, Sequence[Any, Any]], deferred: bool = False
+    ) -> bool:
+        def prepare():
+            encoded = key
+            if self.table.numeric != NUMERIC.DECIMAL:
+                encoded = encode_numbers(key)
+            return dump_value(self.table.convert_key(encoded))
+
+        return self._write(_DELETE, lambda: self.table.delete(key), prepare, deferred)
+
+    # Draining
+
+    def _next_records(self, reader) -> (List[tuple], int):
+        """
+        Reads the next records to replay: a run of puts and deletes on
+        distinct keys that fits a batch, or one update. Returns them with
+        the number of bytes they span
+        """
+        records, keys, size = [], set(), 0
+        while True:
+            position = reader.tell()
+            with self._condition:
+                if self._read_segment == self._write_segment:
+                    if position >= self._write_offset:
+                        break
+            record = _read_record(reader)
+            if record is None:
+                break
+            kind, payload, length = record
+            if kind == _UPDATE:
+                if not records:
+                    records.append((kind, payload))
+                    size += length
+                else:
+                    reader.seek(position)
+                break
+            item = payload["M"]
+            key = json.dumps([item.get(name) for name in self._key_names])
+            if key in keys:
+                reader.seek(position)
+                break
+            keys.add(key)
+            records.append((kind, payload))
+            size += length
+            if len(records) == self.table.BATCH_WRITE_SIZE:
+                break
+        return (records, size)
+
+    def _replay(self, records: List[tuple]):
+        if records[0][0] == _UPDATE:
+            request = _load_request(records[0][1])
+            try:
+                self.table._execute(
+                    "update_item",
+                    request,
+                    lambda r: self.table.get_table().update_item(**r),
+                )
+            except ClientError as e:
+                handle_client_error(e)
+            return
+        requests = []
+        for kind, payload in records:
+            if kind == _PUT:
+                requests.append({"PutRequest": {"Item": load_value(payload)}})
+            else:
+                requests.append({"DeleteRequest": {"Key": load_value(payload)}})
+        self.table._write_batch(requests)
+
+    def _report(self, records: List[tuple], error: Exception):
+        with self._condition:
+            self._stats["failed"] += len(records)
+        if not self.on_error:
+            return
+        names = {_PUT: "put", _UPDATE: "update", _DELETE: "delete"}
+        for kind, payload in records:
+            if kind == _UPDATE:
+                request = _load_request(payload)
+            else:
+                request = {"Item" if kind == _PUT else "Key": load_value(payload)}
+            self.on_error(names[kind], request, error)
+
+    def _drain(self):
+        reader = None
+        attempt = 0
+        while True:
+            with self._condition:
+                while not self._closed and not self._pending:
+                    self._condition.wait()
+                if self._closed:
+                    break
+                segment, offset = self._read_segment, self._read_offset
+            if reader is None:
+                reader = open(self._path(_segment_name(segment)), "rb")
+                reader.seek(offset)
+
+            records, size = self._next_records(reader)
+            if not records:
+                with self._condition:
+                    # The writer has moved past this segment, so once it is
+                    # read to the end it is drained
+                    finished = self._read_segment < self._write_segment and (
+                        reader.tell() == os.fstat(reader.fileno()).st_size
+                    )
+                    if finished:
+                        reader.close()
+                        reader = None
+                        os.remove(self._path(_segment_name(self._read_segment)))
+                        self._read_segment += 1
+                        self._read_offset = 0
+                        self._checkpoint()
+                    else:
+                        self._condition.wait(0.1)
+                continue
+
+            if self._limiter:
+                self._limiter.acquire(len(records))
+            try:
+                self._replay(records)
+                attempt = 0
+            except ThrottledException:
+                with self._condition:
+                    self._stats["throttled"] += 1
+                attempt += 1
+                reader.seek(offset)
+                time.sleep(min(0.05 * 2**attempt, self.max_backoff))
+                continue
+            except Exception as e:
+                self._report(records, e)
+            else:
+                with self._condition:
+                    self._stats["replayed"] += len(records)
+
+            with self._condition:
+                self._read_offset += size
+                self._pending -= len(records)
+                self._checkpoint()
+                self._condition.notify_all()
+        if reader is not None:
+            reader.close()
+
+    # Control
+
+    def pending(self) -> int:
+        """Returns the number of spooled writes not replayed yet"""
+        with self._condition:
+            return self._pending
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Waits until every spooled write has been replayed, or for timeout
+        seconds, and returns whether the spool is empty
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def close(self, drain: bool = False, timeout: float = None):
+        """
+        Stops the background thread. The spooled writes stay on disk for
+        the next spool on the directory, unless drain is set, in which case
+        they are replayed first (for up to timeout seconds)
+        """
+        if drain:
+            self.flush(timeout)
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        with self._condition:
+            self._writer.close()
+
+    def stats(self) -> dict:
+        """
+        Returns how many writes went straight through, were spooled, were
+        replayed, were throttled (including replay attempts) and failed, and
+        how many corrupt stretches of the log recovery skipped
+        """
+        with self._condition:
+            return dict(self._stats, pending=self._pending)
@@ -1,20 +1,251 @@
 from __future__ import annotations
 from copy import copy
-from typing import Sequence, Union, Any, List
+import asyncio
+import functools
+import itertools
+import time
+from typing import Sequence, Union, Any, List, Dict, Iterator
 
 import boto3
-from boto3.dynamodb.conditions import ConditionBase
+from boto3.dynamodb.conditions import ConditionBase, Key
+from boto3.dynamodb.types import Binary
 
 from .exceptions import ClientError, ItemNotFoundException, handle_client_error
 from .expressions import UpdateExpression, serialize
-from .enums import BILLING_MODE, RETURN_VALUES
+from .enums import BILLING_MODE, RETURN_VALUES, RESULT_FORMAT, NUMERIC
 from .core import KeyDefinition
 from .indexes import BaseSecondaryIndex, LocalSecondaryIndex, GlobalSecondaryIndex
+from .planner import Plan, QueryPlanner
+from .capacity import CapacityEstimate, CapacityEstimator
+from .codecs import decode_items, encode_item, encode_updates
+from .coalescing import freeze
+from .concurrency import RateLimiter, chunks, merge, prefetch, run_bounded
+from .entities import PrefixRouter
+from .ranges import split_range
+from .results import (
+    Column,
+    build_columns,
+    format_items,
+    decode_numbers,
+    encode_condition,
+    encode_numbers,
+)
+from . import wire
 
 
 dynamodb = boto3.resource("dynamodb")
 
 
+def _read(table, call, operation: str = None, request: dict = None):
+    """
+    Runs an idempotent read, hedged when the table has a HedgingPolicy and
+    shared with identical in-flight reads when it has a SingleFlight
+    """
+    if table.hedging:
+        call = functools.partial(table.hedging.call, call)
+    if table.coalescing and operation:
+        return table.coalescing.do((table.name, operation, freeze(request)), call)
+    return call()
+
+
+def _send_page(table, operation: str, request: dict, raw: bool = False) -> dict:
+    """
+    Sends a query/scan and returns the response. Raw pages go through the
+    low-level client and keep their items undecoded, but the LastEvaluatedKey
+    is decoded so it can be passed back as exclusive_start_key in either mode
+    """
+
+    def send(request: dict) -> dict:
+        if raw:
+            call = functools.partial(
+                getattr(table.get_client(), operation),
+                TableName=table.name,
+                **wire.build_request(request),
+            )
+        else:
+            call = functools.partial(getattr(table.get_table(), operation), **request)
+        if operation == "query":
+            return _read(table, call, "raw.query" if raw else "query", request)
+        return call()
+
+    response = table._execute(operation, request, send, raw=raw)
+    if raw and response.get("LastEvaluatedKey"):
+        last_key = wire.deserialize_item(response["LastEvaluatedKey"])
+        response = dict(response, LastEvaluatedKey=last_key)
+    return response
+
+
+def _key_names(table, index_name: str = None) -> List[str]:
+    """
+    Names of the attributes making up an item's position in the table, or
+    in the index when one is given
+    """
+    keys = [table.partition_key, table.sort_key]
+    for index in table._local_secondary_indexes + table._global_secondary_indexes:
+        if index.name == index_name:
+            keys += sorted(index.get_all_keys(), key=lambda k: k.name)
+    return list(dict.fromkeys(k.name for k in keys if k))
+
+
+# Largest Limit a filling read asks for in one page
+_MAX_FILL_LIMIT = 1000
+
+
+def _fill(table, operation: str, request: dict, raw: bool) -> (List[dict], dict):
+    """
+    Pages through a query/scan until Limit items have passed the filter or
+    the data ends. After the first page, each page's Limit is sized from the
+    filter selectivity observed so far (Count against ScannedCount). A page
+    matching more items than needed is truncated and the resume key is built
+    from the last item returned
+    """
+    wanted = request["Limit"]
+    key_names = _key_names(table, request.get("IndexName"))
+    request = dict(request)
+    added = []
+    if "ProjectionExpression" in request:
+        # The key attributes are needed to build a resume key
+        names = dict(request["ExpressionAttributeNames"])
+        projection = [request["ProjectionExpression"]]
+        added = [name for name in key_names if name not in names.values()]
+        for i, name in enumerate(added):
+            names[f"#key{i}"] = name
+            projection.append(f"#key{i}")
+        request["ProjectionExpression"] = ", ".join(projection)
+        request["ExpressionAttributeNames"] = names
+
+    items = []
+    matched = scanned = 0
+    last_key = request.get("ExclusiveStartKey")
+    while True:
+        missing = wanted - len(items)
+        limit = missing
+        if scanned:
+            estimate = -(-missing * scanned // max(matched, 1))
+            limit = min(max(estimate, missing), max(_MAX_FILL_LIMIT, missing))
+        request["Limit"] = limit
+        if last_key:
+            request["ExclusiveStartKey"] = last_key
+        response = _send_page(table, operation, request, raw)
+        page = response["Items"]
+        matched += response["Count"]
+        scanned += response["ScannedCount"]
+        last_key = response.get("LastEvaluatedKey")
+        if len(page) > missing:
+            page = page[:missing]
+            last_key = {name: page[-1][name] for name in key_names}
+            if raw:
+                last_key = wire.deserialize_item(last_key)
+        items += page
+        if len(items) == wanted or not last_key:
+            break
+
+    for item in items:
+        for name in added:
+            item.pop(name, None)
+    return (items, last_key)
+
+
+def _decode(table, items: List[dict]) -> List[dict]:
+    """Decompresses the attributes the table has codecs for"""
+    if table.codecs:
+        decode_items(table.codecs, items)
+    return items
+
+
+def _read_page(
+    table,
+    operation: str,
+    request: dict,
+    fill: bool,
+    attributes: Sequence[str],
+    result_format: RESULT_FORMAT,
+    numeric: NUMERIC,
+) -> (List[dict], dict):
+    raw = result_format == RESULT_FORMAT.RAW
+    if fill:
+        if not request.get("Limit"):
+            raise ValueError("fill requires a limit")
+        items, last_key = _fill(table, operation, request, raw)
+    else:
+        response = _send_page(table, operation, request, raw)
+        items, last_key = response["Items"], response.get("LastEvaluatedKey")
+    if raw:
+        return (items, last_key)
+    numeric = numeric or table.numeric
+    items = format_items(_decode(table, items), attributes, result_format, numeric)
+    # The resume key keeps its Decimals whatever the policy, floats would
+    # round large or long key values and resume at the wrong place
+    return (items, last_key)
+
+
+def _forget(table, items: Sequence[dict]):
+    """Removes the keys of written items from the table's negative cache"""
+    if table.negative_cache is None:
+        return
+    names = _key_names(table)
+    for item in items:
+        table.negative_cache.discard(tuple(item[name] for name in names))
+
+
+def _encodes_floats(table, numeric: NUMERIC) -> bool:
+    """
+    Whether floats in a request's inputs are encoded. The table's policy
+    counts as well as the call's: internal reads ask for exact results with
+    numeric=DECIMAL but pass on conditions written under the table's policy
+    """
+    return numeric != NUMERIC.DECIMAL or table.numeric != NUMERIC.DECIMAL
+
+
+def _prepare_item(table, item: dict, numeric: NUMERIC) -> dict:
+    """Drops None values and encodes floats and codec attributes for writing"""
+    item = {k: v for k, v in item.items() if v is not None}
+    if _encodes_floats(table, numeric):
+        item = encode_numbers(item)
+    if table.codecs:
+        item = encode_item(table.codecs, item)
+    return item
+
+
+def _update_request(
+    table,
+    key: Union[Any, Sequence[Any, Any]],
+    updates: Union[UpdateExpression, List[UpdateExpression]],
+    numeric: NUMERIC,
+) -> (dict, List[UpdateExpression]):
+    """
+    Builds the key and update expression of an UpdateItem request, returning
+    it with the updates as they will be written
+    """
+    if _encodes_floats(table, numeric):
+        key = encode_numbers(key)
+    if table.codecs:
+        updates = encode_updates(table.codecs, updates)
+    request = {"Key": table.convert_key(key)}
+    request.update(serialize(updates))
+    if _encodes_floats(table, numeric) and "ExpressionAttributeValues" in request:
+        request["ExpressionAttributeValues"] = encode_numbers(
+            request["ExpressionAttributeValues"]
+        )
+    return (request, updates)
+
+
+def _sort_order(value: Any) -> Any:
+    """Returns a sort key value in a comparable form, Binary as its bytes"""
+    return value.value if isinstance(value, Binary) else value
+
+
+def _pages(read, exclusive_start_key: dict = None, **kwargs) -> Iterator[list]:
+    """Yields every page of a query/scan, following LastEvaluatedKey"""
+    while True:
+        items, exclusive_start_key = read(
+            exclusive_start_key=exclusive_start_key, **kwargs
+        )
+        yield items
+        if not exclusive_start_key:
+            return
+
+
 class CreateMixin:
     _local_secondary_indexes = []
     _global_secondary_indexes = []
@@ -75,13 +306,32 @@ class CreateMixin:
 
     def create_table(self):
         try:
-            self.resource.create_table(**self.export())
+            self._execute(
+                "create_table",
+                self.export(),
+                lambda r: self.resource.create_table(**r),
+            )
+        except ClientError as e:
+            handle_client_error(e)
+
+    def describe_table(self) -> dict:
+        """
+        Returns the table description. DynamoDB refreshes the item count and
+        size in it about every six hours
+        """
+        try:
+            response = self._execute(
+                "describe_table",
+                {"TableName": self.name},
+                lambda r: self.resource.meta.client.describe_table(**r),
+            )
+            return response["Table"]
         except ClientError as e:
             handle_client_error(e)
 
     def delete_table(self):
         try:
-            self.get_table().delete()
+            self._execute("delete_table", {}, lambda r: self.get_table().delete(**r))
         except ClientError as e:
             handle_client_error(e)
 
@@ -92,19 +342,177 @@ class GetMixin:
         key: Union[Any, Sequence[Any, Any]],
         attributes: Sequence[str] = None,
         consistent_read: bool = False,
+        numeric: NUMERIC = None,
+        result_format: RESULT_FORMAT = RESULT_FORMAT.DICT,
     ) -> dict:
+        numeric = numeric or self.numeric
+        if _encodes_floats(self, numeric):
+            key = encode_numbers(key)
         request = {"Key": self.convert_key(key), "ConsistentRead": consistent_read}
         if attributes:
             request.update(self.serialize_attributes(attributes))
         try:
-            response = self.get_table().get_item(**request)
-            return response["Item"]
+            if result_format == RESULT_FORMAT.RAW:
+                response = self._execute(
+                    "get_item",
+                    request,
+                    lambda r: _read(
+                        self,
+                        lambda: self.get_client().get_item(
+                            TableName=self.name, **wire.build_request(r)
+                        ),
+                        "raw.get_item",
+                        r,
+                    ),
+                    raw=True,
+                )
+                return response["Item"]
+            response = self._execute(
+                "get_item",
+                request,
+                lambda r: _read(
+                    self, lambda: self.get_table().get_item(**r), "get_item", r
+                ),
+            )
+            (item,) = format_items(
+                _decode(self, [response["Item"]]), attributes, result_format, numeric
+            )
+            return item
         except KeyError:
             raise ItemNotFoundException()
         except ClientError as e:
             handle_client_error(e)
 
 
+class BatchGetMixin:
+    BATCH_GET_SIZE = 100
+
+    def batch_get(
+        self,
+        keys: Sequence[Union[Any, Sequence[Any, Any]]],
+        attributes: Sequence[str] = None,
+        consistent_read: bool = False,
+        numeric: NUMERIC = None,
+    ) -> List[dict]:
+        """
+        Fetches many items with BatchGetItem, 100 keys per request, retrying
+        unprocessed keys with backoff. Missing items are skipped and the
+        order of the returned items is not guaranteed
+        """
+        numeric = numeric or self.numeric
+        request = {"ConsistentRead": consistent_read}
+        if attributes:
+            request.update(self.serialize_attributes(attributes))
+
+        items = []
+        converted = self.convert_keys(keys, numeric)
+        for batch in chunks(converted, self.BATCH_GET_SIZE):
+            items += self._get_batch(request, batch)
+        return decode_numbers(_decode(self, items), numeric)
+
+    def exists_many(
+        self,
+        keys: Sequence[Union[Any, Sequence[Any, Any]]],
+        consistent_read: bool = False,
+        workers: int = 4,
+        numeric: NUMERIC = None,
+    ) -> List[bool]:
+        """
+        Tells which keys have an item, in the order of keys. Only the key
+        attributes are read, with BatchGetItem requests sent on up to workers
+        threads. Keys the table's negative_cache holds as missing aren't read
+        again (unless consistent_read) and new misses are added to it
+        """
+        names = _key_names(self)
+        request = {"ConsistentRead": consistent_read}
+        request.update(self.serialize_attributes(names))
+
+        cache = self.negative_cache
+        converted = self.convert_keys(keys, numeric or self.numeric)
+        # Keys are identified by their values, in key attribute order
+        frozen = [tuple(key.values()) for key in converted]
+        to_read = {}
+        for frozen_key, key in zip(frozen, converted):
+            if cache is None or consistent_read or frozen_key not in cache:
+                to_read.setdefault(frozen_key, key)
+
+        found = set()
+        batches = chunks(to_read.values(), self.BATCH_GET_SIZE)
+        read = functools.partial(self._get_batch, request)
+        for items in run_bounded(read, batches, workers, "dynamatic-exists"):
+            for item in items:
+                found.add(tuple(item[name] for name in names))
+        if cache is not None:
+            for frozen_key in to_read:
+                if frozen_key not in found:
+                    cache.add(frozen_key)
+        return [frozen_key in found for frozen_key in frozen]
+
+    def _get_batch(self, request: dict, keys: List[dict]) -> List[dict]:
+        """Reads the items of up to 100 keys, retrying unprocessed keys"""
+        items = []
+        pending = {self.name: dict(request, Keys=keys)}
+        attempt = 0
+        while pending:
+            if attempt:
+                time.sleep(min(0.05 * 2 ** attempt, 1))
+            try:
+                response = self._execute(
+                    "batch_get_item",
+                    {"RequestItems": pending},
+                    lambda r: _read(self, lambda: self.resource.batch_get_item(**r)),
+                )
+            except ClientError as e:
+                handle_client_error(e)
+            items += response["Responses"].get(self.name, [])
+            pending = response.get("UnprocessedKeys")
+            attempt += 1
+        return items
+
+
+class BatchWriteMixin:
+    BATCH_WRITE_SIZE = 25
+
+    def batch_write(
+        self,
+        put_items: Sequence[dict] = (),
+        delete_keys: Sequence[Union[Any, Sequence[Any, Any]]] = (),
+        numeric: NUMERIC = None,
+    ):
+        """
+        Puts and deletes many items with BatchWriteItem, 25 requests at a
+        time, retrying unprocessed items with backoff. A key may only appear
+        once per call
+        """
+        numeric = numeric or self.numeric
+        requests = []
+        for item in put_items:
+            item = _prepare_item(self, item, numeric)
+            requests.append({"PutRequest": {"Item": item}})
+        for key in self.convert_keys(delete_keys, numeric):
+            requests.append({"DeleteRequest": {"Key": key}})
+        for batch in chunks(requests, self.BATCH_WRITE_SIZE):
+            self._write_batch(batch)
+
+    def _write_batch(self, requests: List[dict]):
+        pending = {self.name: requests}
+        attempt = 0
+        while pending:
+            if attempt:
+                time.sleep(min(0.05 * 2 ** attempt, 1))
+            try:
+                response = self._execute(
+                    "batch_write_item",
+                    {"RequestItems": pending},
+                    lambda r: self.resource.batch_write_item(**r),
+                )
+            except ClientError as e:
+                handle_client_error(e)
+            pending = response.get("UnprocessedItems")
+            attempt += 1
+        _forget(self, [r["PutRequest"]["Item"] for r in requests if "PutRequest" in r])
+
+
 class QueryMixin:
     def query(
         self,
@@ -115,8 +523,21 @@ class QueryMixin:
         consistent_read: bool = False,
         scan_index_forward: bool = True,
         exclusive_start_key: dict = None,
+        result_format: RESULT_FORMAT = RESULT_FORMAT.DICT,
+        numeric: NUMERIC = None,
+        fill: bool = False,
         _index: str = None,
     ) -> (List[dict], dict):
+        """
+        Reads one page of a query. With fill, limit is the number of items
+        wanted after the filter and pages are read until there are that many
+        or the data ends
+        """
+        numeric = numeric or self.numeric
+        if _encodes_floats(self, numeric):
+            key_condition = encode_condition(key_condition)
+            filter_expression = encode_condition(filter_expression)
+            exclusive_start_key = encode_numbers(exclusive_start_key)
         request = {
             "KeyConditionExpression": key_condition,
             "ConsistentRead": consistent_read,
@@ -133,11 +554,173 @@ class QueryMixin:
         if _index:
             request["IndexName"] = _index
         try:
-            response = self.get_table().query(**request)
-            return (response["Items"], response.get("LastEvaluatedKey"))
+            return _read_page(
+                self, "query", request, fill, attributes, result_format, numeric
+            )
         except ClientError as e:
             handle_client_error(e)
 
+    def query_pages(
+        self,
+        key_condition,
+        filter_expression=None,
+        attributes: Sequence[str] = None,
+        page_size: int = None,
+        consistent_read: bool = False,
+        scan_index_forward: bool = True,
+        exclusive_start_key: dict = None,
+        result_format: RESULT_FORMAT = RESULT_FORMAT.DICT,
+        numeric: NUMERIC = None,
+        prefetch_pages: int = 0,
+        _index: str = None,
+    ) -> Iterator[list]:
+        """
+        Yields every page of a query. With prefetch_pages, up to that many
+        of the following pages are fetched in the background while the
+        caller works on the current one
+        """
+        pages = _pages(
+            self.query,
+            key_condition=key_condition,
+            filter_expression=filter_expression,
+            attributes=attributes,
+            limit=page_size,
+            consistent_read=consistent_read,
+            scan_index_forward=scan_index_forward,
+            exclusive_start_key=exclusive_start_key,
+            result_format=result_format,
+            numeric=numeric,
+            _index=_index,
+        )
+        if prefetch_pages:
+            return prefetch(pages, prefetch_pages)
+        return pages
+
+    def parallel_query(
+        self,
+        partition_value: Any,
+        splits: int = 4,
+        filter_expression=None,
+        attributes: Sequence[str] = None,
+        page_size: int = None,
+        consistent_read: bool = False,
+        scan_index_forward: bool = True,
+        ordered: bool = True,
+        boundaries: Sequence[Any] = None,
+        prefetch_pages: int = 2,
+        numeric: NUMERIC = None,
+    ) -> Iterator[List[dict]]:
+        """
+        Yields the pages of a query over a whole partition, read as splits
+        sort key ranges queried concurrently. The ranges split the span
+        between the first and last sort keys evenly (see split_range) unless
+        boundaries gives the sort key values to split at, e.g. sampled from
+        earlier reads of a skewed partition. With ordered, the pages come in
+        sort key order and each range keeps up to prefetch_pages pages
+        buffered ahead; otherwise they come as soon as any range reads them
+        """
+        if not self.sort_key:
+            raise ValueError("parallel_query requires a table with a sort key")
+        numeric = numeric or self.numeric
+        if _encodes_floats(self, numeric):
+            # The ranges are read with Decimals, the policy applies to results
+            partition_value = encode_numbers(partition_value)
+            filter_expression = encode_condition(filter_expression)
+            if boundaries is not None:
+                boundaries = encode_numbers(list(boundaries))
+        sort_name = self.sort_key.name
+        partition = Key(self.partition_key.name).eq(partition_value)
+
+        def bound(forward: bool) -> Any:
+            items, _ = self.query(
+                partition,
+                attributes=[sort_name],
+                limit=1,
+                consistent_read=consistent_read,
+                scan_index_forward=forward,
+                numeric=NUMERIC.DECIMAL,
+            )
+            return items[0][sort_name] if items else None
+
+        low = bound(True)
+        if low is None:
+            return iter(())
+        high = bound(False)
+        if boundaries is None:
+            boundaries = split_range(low, high, splits, self.sort_key.datatype)
+        else:
+            boundaries = [
+                b
+                for b in sorted(boundaries, key=_sort_order)
+                if _sort_order(low) < _sort_order(b) < _sort_order(high)
+            ]
+        points = [low] + list(boundaries) + [high]
+        ranges = list(zip(points, points[1:])) or [(low, high)]
+        if not scan_index_forward:
+            ranges.reverse()
+
+        projection = None
+        if attributes:
+            projection = list(dict.fromkeys(list(attributes) + [sort_name]))
+
+        def read(lower: Any, upper: Any) -> Iterator[List[dict]]:
+            # Ranges are inclusive at both ends, so the item at a boundary is
+            # left to the range that starts there
+            last = upper == high
+            pages = _pages(
+                self.query,
+                key_condition=partition & Key(sort_name).between(lower, upper),
+                filter_expression=filter_expression,
+                attributes=projection,
+                limit=page_size,
+                consistent_read=consistent_read,
+                scan_index_forward=scan_index_forward,
+                numeric=NUMERIC.DECIMAL,
+            )
+            for page in pages:
+                if not last:
+                    page = [item for item in page if item[sort_name] != upper]
+                if attributes and sort_name not in attributes:
+                    for item in page:
+                        del item[sort_name]
+                if page:
+                    yield decode_numbers(page, numeric)
+
+        readers = [read(lower, upper) for lower, upper in ranges]
+        if ordered:
+            buffered = [
+                prefetch(reader, prefetch_pages, "dynamatic-parallel-query")
+                for reader in readers
+            ]
+            return itertools.chain.from_iterable(buffered)
+        return merge(readers, prefetch_pages * len(readers), "dynamatic-parallel-query")
+
+    def query_columns(
+        self,
+        key_condition,
+        attributes: Sequence[str],
+        filter_expression=None,
+        consistent_read: bool = False,
+        scan_index_forward: bool = True,
+        page_size: int = None,
+        exclusive_start_key: dict = None,
+        _index: str = None,
+    ) -> Dict[str, Column]:
+        """Reads every page of a query into one Column per attribute"""
+        pages = _pages(
+            self.query,
+            key_condition=key_condition,
+            filter_expression=filter_expression,
+            attributes=attributes,
+            limit=page_size,
+            consistent_read=consistent_read,
+            scan_index_forward=scan_index_forward,
+            exclusive_start_key=exclusive_start_key,
+            result_format=RESULT_FORMAT.RAW,
+            _index=_index,
+        )
+        return build_columns(attributes, pages)
+
 
 class ScanMixin:
     def scan(
@@ -149,8 +732,16 @@ class ScanMixin:
         total_segments: int = None,
         segment: int = None,
         exclusive_start_key: dict = None,
+        result_format: RESULT_FORMAT = RESULT_FORMAT.DICT,
+        numeric: NUMERIC = None,
+        fill: bool = False,
         _index: str = None,
     ) -> (List[dict], dict):
+        """Reads one page of a scan, see query for fill"""
+        numeric = numeric or self.numeric
+        if _encodes_floats(self, numeric):
+            filter_expression = encode_condition(filter_expression)
+            exclusive_start_key = encode_numbers(exclusive_start_key)
         request = {"ConsistentRead": consistent_read}
         if filter_expression:
             request["FilterExpression"] = filter_expression
@@ -167,11 +758,215 @@ class ScanMixin:
         if _index:
             request["IndexName"] = _index
         try:
-            response = self.get_table().scan(**request)
-            return (response["Items"], response.get("LastEvaluatedKey"))
+            return _read_page(
+                self, "scan", request, fill, attributes, result_format, numeric
+            )
         except ClientError as e:
             handle_client_error(e)
 
+    def scan_pages(
+        self,
+        filter_expression=None,
+        attributes: Sequence[str] = None,
+        page_size: int = None,
+        consistent_read: bool = False,
+        total_segments: int = None,
+        segment: int = None,
+        exclusive_start_key: dict = None,
+        result_format: RESULT_FORMAT = RESULT_FORMAT.DICT,
+        numeric: NUMERIC = None,
+        prefetch_pages: int = 0,
+        _index: str = None,
+    ) -> Iterator[list]:
+        """Yields every page of a scan, see query_pages"""
+        pages = _pages(
+            self.scan,
+            filter_expression=filter_expression,
+            attributes=attributes,
+            limit=page_size,
+            consistent_read=consistent_read,
+            total_segments=total_segments,
+            segment=segment,
+            exclusive_start_key=exclusive_start_key,
+            result_format=result_format,
+            numeric=numeric,
+            _index=_index,
+        )
+        if prefetch_pages:
+            return prefetch(pages, prefetch_pages)
+        return pages
+
+    def scan_columns(
+        self,
+        attributes: Sequence[str],
+        filter_expression=None,
+        consistent_read: bool = False,
+        total_segments: int = None,
+        segment: int = None,
+        page_size: int = None,
+        exclusive_start_key: dict = None,
+        _index: str = None,
+    ) -> Dict[str, Column]:
+        """Reads every page of a scan into one Column per attribute"""
+        pages = _pages(
+            self.scan,
+            filter_expression=filter_expression,
+            attributes=attributes,
+            limit=page_size,
+            consistent_read=consistent_read,
+            total_segments=total_segments,
+            segment=segment,
+            exclusive_start_key=exclusive_start_key,
+            result_format=RESULT_FORMAT.RAW,
+            _index=_index,
+        )
+        return build_columns(attributes, pages)
+
+
+class CollectionMixin:
+    def get_collection(
+        self,
+        partition_value: Any,
+        entity_prefixes: Dict[str, str],
+        attributes: Sequence[str] = None,
+        consistent_read: bool = False,
+        parallel: bool = False,
+        workers: int = 4,
+        page_size: int = None,
+        numeric: NUMERIC = None,
+    ) -> Dict[str, List[dict]]:
+        """
+        Loads the items of an item collection grouped by entity, where each
+        entity is identified by a sort key prefix, e.g.
+        {"user": "USER#", "order": "ORDER#"}. A single query reads the sort
+        key range spanning the prefixes, stopping after the last one.
+        With parallel, each prefix is read by its own begins_with query
+        """
+        if not self.sort_key:
+            raise ValueError("get_collection requires a table with a sort key")
+        router = PrefixRouter(entity_prefixes)
+        sort_name = self.sort_key.name
+        projection = None
+        if attributes:
+            projection = list(dict.fromkeys(list(attributes) + [sort_name]))
+        partition = Key(self.partition_key.name).eq(partition_value)
+
+        def read(key_condition, entity: str = None) -> List[tuple]:
+            pages = _pages(
+                self.query,
+                key_condition=partition & key_condition,
+                attributes=projection,
+                limit=page_size,
+                consistent_read=consistent_read,
+                numeric=numeric,
+            )
+            routed = []
+            for page in pages:
+                for item in page:
+                    item_entity = router.route(item.get(sort_name))
+                    # A parallel query for a prefix also returns the items of
+                    # longer prefixes nested in it, those are left to their
+                    # own query
+                    if item_entity and (entity is None or item_entity == entity):
+                        routed.append((item_entity, item))
+            return routed
+
+        if parallel:
+            queries = [
+                (Key(sort_name).begins_with(prefix), entity)
+                for prefix, entity in zip(router.prefixes, router.entities)
+            ]
+            results = run_bounded(
+                lambda query: read(*query), queries, workers, "dynamatic-collection"
+            )
+            routed = [pair for result in results for pair in result]
+        else:
+            if router.upper_bound is None:
+                key_condition = Key(sort_name).gte(router.lower_bound)
+            else:
+                key_condition = Key(sort_name).between(
+                    router.lower_bound, router.upper_bound
+                )
+            routed = read(key_condition)
+
+        collection = {entity: [] for entity in entity_prefixes}
+        for entity, item in routed:
+            if attributes and sort_name not in attributes:
+                del item[sort_name]
+            collection[entity].append(item)
+        return collection
+
+
+class PlanMixin:
+    def plan(
+        self,
+        condition: ConditionBase,
+        attributes: Sequence[str] = None,
+        consistent_read: bool = False,
+    ) -> Plan:
+        """Chooses the base table or index best suited to the condition"""
+        return QueryPlanner(self).plan(condition, attributes, consistent_read)
+
+    def find(
+        self,
+        condition: ConditionBase,
+        attributes: Sequence[str] = None,
+        consistent_read: bool = False,
+        **kwargs,
+    ) -> (List[dict], dict):
+        """Runs one page of the plan chosen for the condition"""
+        plan = self.plan(condition, attributes, consistent_read)
+        return plan.execute(consistent_read=consistent_read, **kwargs)
+
+
+class AsyncMixin:
+    """
+    Awaitable versions of the reads, run on the event loop's executor. With
+    a SingleFlight, identical awaited reads on a loop share one executor
+    call, which in turn joins identical reads made by threads
+    """
+
+    async def _run_async(self, method, *args, **kwargs) -> Any:
+        call = functools.partial(method, *args, **kwargs)
+        if self.coalescing:
+            key = (self.name, method.__name__, freeze((args, kwargs)))
+            return await self.coalescing.do_async(key, call)
+        return await asyncio.get_running_loop().run_in_executor(None, call)
+
+    async def get_async(self, *args, **kwargs) -> dict:
+        return await self._run_async(self.get, *args, **kwargs)
+
+    async def batch_get_async(self, *args, **kwargs) -> List[dict]:
+        return await self._run_async(self.batch_get, *args, **kwargs)
+
+    async def query_async(self, *args, **kwargs) -> (List[dict], dict):
+        return await self._run_async(self.query, *args, **kwargs)
+
+    async def scan_async(self, *args, **kwargs) -> (List[dict], dict):
+        return await self._run_async(self.scan, *args, **kwargs)
+
+
+class CapacityMixin:
+    _capacity_estimator = None
+
+    def get_capacity_estimator(self) -> CapacityEstimator:
+        if self._capacity_estimator is None:
+            self._capacity_estimator = CapacityEstimator(self.export())
+        return self._capacity_estimator
+
+    def estimate_put(self, item: dict, old_item: dict = None) -> CapacityEstimate:
+        return self.get_capacity_estimator().put(item, old_item)
+
+    def estimate_update(
+        self,
+        key: Union[Any, Sequence[Any, Any]],
+        updates: Union[UpdateExpression, List[UpdateExpression]],
+        old_item: dict = None,
+    ) -> CapacityEstimate:
+        return self.get_capacity_estimator().update(
+            self.convert_key(key), updates, old_item
+        )
+
 
 class PutMixin:
     def put(
@@ -179,17 +974,28 @@ class PutMixin:
         item: dict,
         condition: ConditionBase = None,
         return_values: RETURN_VALUES = RETURN_VALUES.NONE,
+        numeric: NUMERIC = None,
     ) -> dict:
-        filtered_item = {k: v for k, v in item.items() if v is not None}
+        numeric = numeric or self.numeric
+        filtered_item = _prepare_item(self, item, numeric)
+
+        if self.capacity_hook:
+            self.capacity_hook("put", self.estimate_put(filtered_item))
 
         request = {"Item": filtered_item}
         if condition:
+            if _encodes_floats(self, numeric):
+                condition = encode_condition(condition)
             request["ConditionExpression"] = condition
         if return_values:
             request["ReturnValues"] = return_values
         try:
-            response = self.get_table().put_item(**request)
-            return response.get("Attributes", {})
+            response = self._execute(
+                "put_item", request, lambda r: self.get_table().put_item(**r)
+            )
+            _forget(self, [filtered_item])
+            (attributes,) = _decode(self, [response.get("Attributes", {})])
+            return decode_numbers(attributes, numeric)
         except ClientError as e:
             handle_client_error(e)
 
@@ -200,18 +1006,95 @@ class DeleteMixin:
         key: Union[Any, Sequence[Any, Any]],
         condition: ConditionBase = None,
         return_values: RETURN_VALUES = RETURN_VALUES.NONE,
+        numeric: NUMERIC = None,
     ) -> dict:
+        numeric = numeric or self.numeric
+        if _encodes_floats(self, numeric):
+            key = encode_numbers(key)
         request = {"Key": self.convert_key(key)}
         if condition:
+            if _encodes_floats(self, numeric):
+                condition = encode_condition(condition)
             request["ConditionExpression"] = condition
         if return_values:
             request["ReturnValues"] = return_values
         try:
-            response = self.get_table().delete_item(**request)
-            return response.get("Attributes", {})
+            response = self._execute(
+                "delete_item", request, lambda r: self.get_table().delete_item(**r)
+            )
+            (attributes,) = _decode(self, [response.get("Attributes", {})])
+            return decode_numbers(attributes, numeric)
         except ClientError as e:
             handle_client_error(e)
 
+    def delete_where(
+        self,
+        key_condition,
+        filter_expression=None,
+        dry_run: bool = False,
+        workers: int = 4,
+        max_rate: float = None,
+        page_size: int = None,
+        _index: str = None,
+    ) -> int:
+        """
+        Deletes every item matching a query and returns how many there were.
+        Only the key attributes are read, and they are deleted with
+        BatchWriteItem on a pool of workers, paced to max_rate items per
+        second. With dry_run nothing is deleted and the matches are counted
+        """
+        pages = _pages(
+            self.query,
+            key_condition=key_condition,
+            filter_expression=filter_expression,
+            attributes=_key_names(self),
+            limit=page_size,
+            numeric=NUMERIC.DECIMAL,
+            _index=_index,
+        )
+        return self._delete_pages(pages, dry_run, workers, max_rate)
+
+    def delete_scan(
+        self,
+        filter_expression=None,
+        dry_run: bool = False,
+        workers: int = 4,
+        max_rate: float = None,
+        page_size: int = None,
+        _index: str = None,
+    ) -> int:
+        """Like delete_where, for every item matching a scan"""
+        pages = _pages(
+            self.scan,
+            filter_expression=filter_expression,
+            attributes=_key_names(self),
+            limit=page_size,
+            numeric=NUMERIC.DECIMAL,
+            _index=_index,
+        )
+        return self._delete_pages(pages, dry_run, workers, max_rate)
+
+    def _delete_pages(
+        self, pages: Iterator[list], dry_run: bool, workers: int, max_rate: float
+    ) -> int:
+        key_names = _key_names(self)
+        keys = (
+            {name: item[name] for name in key_names} for page in pages for item in page
+        )
+        if dry_run:
+            return sum(1 for _ in keys)
+
+        limiter = RateLimiter(max_rate) if max_rate else None
+
+        def delete_batch(batch: List[dict]) -> int:
+            if limiter:
+                limiter.acquire(len(batch))
+            self._write_batch([{"DeleteRequest": {"Key": key}} for key in batch])
+            return len(batch)
+
+        batches = chunks(keys, self.BATCH_WRITE_SIZE)
+        return sum(run_bounded(delete_batch, batches, workers, "dynamatic-delete"))
+
 
 class UpdateMixin:
     def update(
@@ -220,16 +1103,26 @@ class UpdateMixin:
         updates: Union[UpdateExpression, List[UpdateExpression]],
         condition: ConditionBase = None,
         return_values: RETURN_VALUES = RETURN_VALUES.NONE,
+        numeric: NUMERIC = None,
     ):
-        request = {"Key": self.convert_key(key)}
+        numeric = numeric or self.numeric
+        request, updates = _update_request(self, key, updates, numeric)
         if condition:
+            if _encodes_floats(self, numeric):
+                condition = encode_condition(condition)
             request["ConditionExpression"] = condition
         if return_values:
             request["ReturnValues"] = return_values
-        request.update(serialize(updates))
+        if self.capacity_hook:
+            estimate = self.get_capacity_estimator().update(request["Key"], updates)
+            self.capacity_hook("update", estimate)
         try:
-            response = self.get_table().update_item(**request)
-            return response.get("Attributes", {})
+            response = self._execute(
+                "update_item", request, lambda r: self.get_table().update_item(**r)
+            )
+            _forget(self, [request["Key"]])
+            (attributes,) = _decode(self, [response.get("Attributes", {})])
+            return decode_numbers(attributes, numeric)
         except ClientError as e:
             handle_client_error(e)
 
@@ -0,0 +1,149 @@
+from __future__ import annotations
+from typing import Dict, List, Union
+from json.encoder import encode_basestring as _encode_string
+import base64
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+
+serializer = TypeSerializer()
+deserializer = TypeDeserializer()
+
+_CONDITION_KEYS = ("KeyConditionExpression", "FilterExpression", "ConditionExpression")
+_ITEM_KEYS = ("Key", "Item", "ExclusiveStartKey")
+
+
+def serialize_item(item: dict) -> Dict[str, dict]:
+    """Converts python values into typed attribute-value maps, e.g. {"S": "foo"}"""
+    return {k: serializer.serialize(v) for k, v in item.items()}
+
+
+def deserialize_item(item: Dict[str, dict]) -> dict:
+    return {k: deserializer.deserialize(v) for k, v in item.items()}
+
+
+def _convert_binary(value: dict, convert) -> dict:
+    """Applies convert to every binary value of a wire format value"""
+    ((datatype, data),) = value.items()
+    if datatype == "B":
+        return {"B": convert(data)}
+    if datatype == "BS":
+        return {"BS": [convert(b) for b in data]}
+    if datatype == "M":
+        return {"M": {k: _convert_binary(v, convert) for k, v in data.items()}}
+    if datatype == "L":
+        return {"L": [_convert_binary(v, convert) for v in data]}
+    return value
+
+
+def _b64encode(value) -> str:
+    return base64.b64encode(getattr(value, "value", value)).decode("ascii")
+
+
+def dump_value(value) -> dict:
+    """
+    Converts a python value into a JSON-safe wire format value, with binary
+    values base64 encoded. Numbers stay exact and sets keep their type
+    """
+    return _convert_binary(serializer.serialize(value), _b64encode)
+
+
+def load_value(value: dict):
+    return deserializer.deserialize(_convert_binary(value, base64.b64decode))
+
+
+def build_request(request: dict) -> dict:
+    """
+    Converts a request built for the boto3 resource (python values and
+    condition objects) into the wire format expected by the low-level client
+    """
+    request = dict(request)
+    names = dict(request.get("ExpressionAttributeNames", {}))
+    values = dict(request.get("ExpressionAttributeValues", {}))
+
+    builder = ConditionExpressionBuilder()
+    for condition_key in _CONDITION_KEYS:
+        condition = request.get(condition_key)
+        if not isinstance(condition, ConditionBase):
+            continue
+        built = builder.build_expression(
+            condition, is_key_condition=condition_key == "KeyConditionExpression"
+        )
+        request[condition_key] = built.condition_expression
+        names.update(built.attribute_name_placeholders)
+        values.update(built.attribute_value_placeholders)
+
+    for item_key in _ITEM_KEYS:
+        if item_key in request:
+            request[item_key] = serialize_item(request[item_key])
+    if names:
+        request["ExpressionAttributeNames"] = names
+    if values:
+        request["ExpressionAttributeValues"] = serialize_item(values)
+    return request
+
+
+def _json_fragments(value: dict, out: List[str]):
+    ((datatype, data),) = value.items()
+    if datatype == "S":
+        out.append(_encode_string(data))
+    elif datatype == "N":
+        # DynamoDB returns numbers normalized, which is valid JSON number text
+        out.append(data)
+    elif datatype == "BOOL":
+        out.append("true" if data else "false")
+    elif datatype == "NULL":
+        out.append("null")
+    elif datatype == "M":
+        _json_map(data, out)
+    elif datatype == "L":
+        out.append("[")
+        for i, element in enumerate(data):
+            if i:
+                out.append(",")
+            _json_fragments(element, out)
+        out.append("]")
+    elif datatype == "SS":
+        out.append("[" + ",".join(_encode_string(s) for s in data) + "]")
+    elif datatype == "NS":
+        out.append("[" + ",".join(data) + "]")
+    elif datatype == "B":
+        out.append('"' + base64.b64encode(data).decode("ascii") + '"')
+    elif datatype == "BS":
+        out.append(
+            "["
+            + ",".join('"' + base64.b64encode(b).decode("ascii") + '"' for b in data)
+            + "]"
+        )
+    else:
+        raise TypeError(f"Unsupported DynamoDB type: {datatype}")
+
+
+def _json_map(item: Dict[str, dict], out: List[str]):
+    out.append("{")
+    for i, (name, value) in enumerate(item.items()):
+        if i:
+            out.append(",")
+        out.append(_encode_string(name))
+        out.append(":")
+        _json_fragments(value, out)
+    out.append("}")
+
+
+def to_json(items: Union[Dict[str, dict], List[Dict[str, dict]]]) -> bytes:
+    """
+    Encodes a wire format item (or a list of them) straight to JSON bytes
+    without building python values first. Binary values are base64 encoded
+    and sets become arrays
+    """
+    out = []
+    if isinstance(items, dict):
+        _json_map(items, out)
+    else:
+        out.append("[")
+        for i, item in enumerate(items):
+            if i:
+                out.append(",")
+            _json_map(item, out)
+        out.append("]")
+    return "".join(out).encode("utf-8")
@@ -16,7 +16,7 @@ setuptools.setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    install_requires=["boto3>=1.9"],
-    python_requires=">=3.6",
+    install_requires=["boto3>=1.24.84"],
+    python_requires=">=3.7",
 )
 
@@ -0,0 +1,33 @@
+import time
+import unittest
+
+from dynamatic.caching import NegativeCache
+
+
+class NegativeCacheTestCase(unittest.TestCase):
+    def test_cache(self):
+        cache = NegativeCache(ttl=60)
+        cache.add("a")
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.hits == 1
+        cache.discard("a")
+        assert "a" not in cache
+        cache.add("b")
+        cache.clear()
+        assert cache.size() == 0
+
+    def test_expiry(self):
+        cache = NegativeCache(ttl=0.05)
+        cache.add("a")
+        time.sleep(0.1)
+        assert "a" not in cache
+        assert cache.size() == 0
+
+    def test_max_size(self):
+        cache = NegativeCache(max_size=2)
+        for key in ("a", "b", "a", "c"):
+            cache.add(key)
+        assert "b" not in cache
+        assert "a" in cache
+        assert "c" in cache
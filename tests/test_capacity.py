@@ -0,0 +1,129 @@
+import unittest
+from decimal import Decimal
+
+import boto3
+
+from dynamatic import Table, KeyDefinition, GlobalSecondaryIndex, LocalSecondaryIndex
+from dynamatic.capacity import (
+    value_size,
+    item_size,
+    write_units,
+    read_units,
+    apply_updates,
+    estimate_put,
+    estimate_update,
+    CapacityEstimator,
+)
+from dynamatic.expressions import Set, Increase, Append, Remove, Add, Delete
+
+dynamodb = boto3.resource(
+    "dynamodb",
+    endpoint_url="http://localhost:8181",
+    aws_access_key_id="AccessKey",
+    aws_secret_access_key="VerySecretKey",
+    region_name="us-west-2",
+)
+
+
+class KeysOnlyIndex(GlobalSecondaryIndex):
+    attributes = None
+
+
+class MyTable(Table):
+    name = "MyCapacityTable"
+    partition_key = KeyDefinition("pk")
+    sort_key = KeyDefinition("sk")
+
+    lsi = LocalSecondaryIndex(sort_key=KeyDefinition("status"))
+    email = KeysOnlyIndex(partition_key=KeyDefinition("email"))
+    tenant = GlobalSecondaryIndex(
+        partition_key=KeyDefinition("tenant"), attributes=["name"]
+    )
+
+
+class SizeTestCase(unittest.TestCase):
+    def test_value_size(self):
+        assert value_size("abc") == 3
+        assert value_size("é") == 2
+        assert value_size(True) == 1
+        assert value_size(None) == 1
+        assert value_size(b"\x00\x01") == 2
+        assert value_size(Decimal("12345")) == 4
+        assert value_size(1000) == 2
+        assert value_size(-1) == 3
+        assert value_size(0.5) == 2
+        assert value_size({"a", "bc"}) == 3
+        assert value_size(["a", 1]) == 3 + 2 + 3
+        assert value_size({"ab": "c"}) == 3 + 1 + 3
+
+        with self.assertRaises(TypeError):
+            value_size(object())
+
+    def test_item_size(self):
+        assert item_size({"pk": "abc", "n": 1, "empty": None}) == 2 + 3 + 1 + 2
+
+    def test_units(self):
+        assert write_units(1) == 1
+        assert write_units(1024) == 1
+        assert write_units(1025) == 2
+        assert read_units(4096) == 0.5
+        assert read_units(4097, consistent_read=True) == 2
+
+    def test_apply_updates(self):
+        item = {"count": 1, "tags": {"a"}, "list": ["a"], "name": "foo"}
+        updated = apply_updates(
+            item,
+            [
+                Increase("count", 2),
+                Add("tags", {"b"}),
+                Append("list", ["b"]),
+                Remove("name"),
+                Set("new", "value"),
+            ],
+        )
+        assert updated == {
+            "count": 3,
+            "tags": {"a", "b"},
+            "list": ["a", "b"],
+            "new": "value",
+        }
+        assert apply_updates(updated, [Delete("tags", {"a"})])["tags"] == {"b"}
+
+
+class CapacityEstimatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.spec = MyTable(resource=dynamodb).export()
+
+    def test_put(self):
+        estimate = estimate_put(self.spec, {"pk": "1", "sk": "1", "data": "x" * 2000})
+        assert estimate.table_units == 2
+        assert estimate.index_units == {"lsi": 0, "email": 0, "tenant": 0}
+        assert estimate.total_units == 2
+
+        item = {"pk": "1", "sk": "1", "status": "a", "email": "e", "data": "x" * 2000}
+        estimate = estimate_put(self.spec, item)
+        # The LSI projects everything, the keys only GSI just the keys
+        assert estimate.index_units == {"lsi": 3, "email": 1, "tenant": 0}
+        assert estimate.total_units == 6
+
+    def test_put_replacing(self):
+        old = {"pk": "1", "sk": "1", "tenant": "a", "name": "foo", "data": "x"}
+        new = dict(old, data="y")
+        estimator = CapacityEstimator(self.spec)
+        assert estimator.put(new, old).index_units["tenant"] == 0
+        assert estimator.put(dict(old, name="bar"), old).index_units["tenant"] == 1
+        assert estimator.put(dict(old, tenant="b"), old).index_units["tenant"] == 2
+        assert estimator.put({"pk": "1", "sk": "1"}, old).index_units["tenant"] == 1
+
+    def test_update(self):
+        key = {"pk": "1", "sk": "1"}
+        estimate = estimate_update(self.spec, key, Set("other", "x"))
+        assert estimate.table_units == 1
+        assert estimate.index_units == {"lsi": 1, "email": 0, "tenant": 0}
+
+        estimate = estimate_update(self.spec, key, {"email": "e", "name": "foo"})
+        assert estimate.index_units == {"lsi": 1, "email": 2, "tenant": 1}
+
+        old = {"pk": "1", "sk": "1", "email": "e"}
+        estimate = estimate_update(self.spec, key, [Remove("email")], old)
+        assert estimate.index_units == {"lsi": 0, "email": 1, "tenant": 0}
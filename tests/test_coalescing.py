@@ -0,0 +1,211 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+
+from dynamatic import Table, KeyDefinition, Key, Attr
+from dynamatic.coalescing import SingleFlight, freeze
+from dynamatic.exceptions import ResourceNotFoundException
+
+dynamodb = boto3.resource(
+    "dynamodb",
+    endpoint_url="http://localhost:8181",
+    aws_access_key_id="AccessKey",
+    aws_secret_access_key="VerySecretKey",
+    region_name="us-west-2",
+)
+
+
+class MyTable(Table):
+    name = "MyCoalescingTable"
+    partition_key = KeyDefinition("pk")
+    billing_mode = Table.BILLING_MODE.PAY_PER_REQUEST
+
+
+def counting_read(result, delay=0.1):
+    calls = []
+
+    def read():
+        calls.append(None)
+        time.sleep(delay)
+        return result
+
+    return read, calls
+
+
+class FreezeTestCase(unittest.TestCase):
+    def test_freeze(self):
+        request = {
+            "KeyConditionExpression": Key("pk").eq("1") & Key("sk").gt(2),
+            "ExpressionAttributeNames": {"#ref0": "a", "#ref1": "b"},
+            "Keys": [{"pk": "1"}],
+        }
+        same = {
+            "ExpressionAttributeNames": {"#ref1": "b", "#ref0": "a"},
+            "Keys": [{"pk": "1"}],
+            "KeyConditionExpression": Key("pk").eq("1") & Key("sk").gt(2),
+        }
+        assert hash(freeze(request)) == hash(freeze(same))
+        assert freeze(request) == freeze(same)
+        assert freeze(Attr("pk").eq("1")) != freeze(Attr("pk").eq("2"))
+        assert freeze({1.5}) == frozenset({freeze(1.5)})
+
+
+class SingleFlightTestCase(unittest.TestCase):
+    def test_do(self):
+        flight = SingleFlight()
+        read, calls = counting_read({"items": [1, 2]})
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = list(executor.map(lambda _: flight.do("key", read), range(10)))
+
+        assert len(calls) == 1
+        assert all(result == {"items": [1, 2]} for result in results)
+        # Followers get their own copy
+        assert len({id(result) for result in results}) == 10
+        assert flight.stats() == {"requests": 10, "coalesced": 9}
+
+        # Once the call completed the next one runs again
+        flight.do("key", read)
+        assert len(calls) == 2
+
+    def test_leader_mutates_result(self):
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def read():
+            started.set()
+            time.sleep(0.05)
+            return {"items": list(range(1000))}
+
+        def leader():
+            result = flight.do("key", read)
+            # Keeps changing its result while the followers copy theirs
+            for i in range(1000):
+                result[i] = i
+                result["items"].pop()
+            return result
+
+        with ThreadPoolExecutor(max_workers=9) as executor:
+            first = executor.submit(leader)
+            started.wait()
+            followers = [executor.submit(flight.do, "key", read) for _ in range(8)]
+            first.result()
+            results = [follower.result() for follower in followers]
+        assert flight.stats()["coalesced"] == 8
+        assert all(result == {"items": list(range(1000))} for result in results)
+
+    def test_do_different_keys(self):
+        flight = SingleFlight()
+        read, calls = counting_read(None, delay=0.05)
+        threads = [
+            threading.Thread(target=flight.do, args=(key, read)) for key in "abc"
+        ]
+        [thread.start() for thread in threads]
+        [thread.join() for thread in threads]
+        assert len(calls) == 3
+
+    def test_do_error(self):
+        flight = SingleFlight()
+
+        def fail():
+            time.sleep(0.05)
+            raise RuntimeError("boom")
+
+        def call(_):
+            try:
+                flight.do("key", fail)
+            except RuntimeError:
+                return "raised"
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            assert list(executor.map(call, range(3))) == ["raised"] * 3
+
+    def test_do_async(self):
+        flight = SingleFlight()
+        read, calls = counting_read([1])
+
+        async def main():
+            return await asyncio.gather(
+                *[flight.do_async("key", read) for _ in range(5)]
+            )
+
+        assert asyncio.run(main()) == [[1]] * 5
+        assert len(calls) == 1
+        assert flight.stats()["coalesced"] == 4
+
+    def test_do_async_leader_mutates_result(self):
+        flight = SingleFlight()
+        read, _ = counting_read([1], delay=0.05)
+
+        async def leader():
+            result = await flight.do_async("key", read)
+            result.append(2)
+            return result
+
+        async def main():
+            return await asyncio.gather(
+                leader(), *[flight.do_async("key", read) for _ in range(3)]
+            )
+
+        assert asyncio.run(main()) == [[1, 2], [1], [1], [1]]
+
+    def test_do_async_leader_cancelled(self):
+        flight = SingleFlight()
+        read, calls = counting_read([1], delay=0.1)
+
+        async def main():
+            leader = asyncio.create_task(flight.do_async("key", read))
+            await asyncio.sleep(0.01)
+            followers = [flight.do_async("key", read) for _ in range(3)]
+            followers = asyncio.gather(*followers)
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await followers
+
+        # The followers still get the result of the running call
+        assert asyncio.run(main()) == [[1]] * 3
+        assert len(calls) == 1
+
+
+class CoalescedTableTestCase(unittest.TestCase):
+    def setUp(self):
+        self.table = MyTable(resource=dynamodb, coalescing=SingleFlight())
+        try:
+            self.table.delete_table()
+        except ResourceNotFoundException:
+            pass
+        self.table.create_table()
+        self.table.put({"pk": "1", "status": "active"})
+
+    def test_get(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            items = list(executor.map(lambda _: self.table.get("1"), range(8)))
+        assert all(item["status"] == "active" for item in items)
+        assert self.table.coalescing.stats()["requests"] == 8
+
+    def test_query(self):
+        items, _ = self.table.query(Key("pk").eq("1"))
+        assert items[0]["status"] == "active"
+
+    def test_async(self):
+        async def main():
+            return await asyncio.gather(
+                *[self.table.get_async("1") for _ in range(5)],
+                self.table.query_async(Key("pk").eq("1")),
+            )
+
+        *items, (queried, _) = asyncio.run(main())
+        assert all(item["status"] == "active" for item in items)
+        assert queried[0]["status"] == "active"
+        # The awaited gets made one call between them
+        assert self.table.coalescing.stats()["coalesced"] >= 4
+
+    def test_async_without_coalescing(self):
+        table = MyTable(resource=dynamodb)
+        item = asyncio.run(table.get_async("1", attributes=["status"]))
+        assert item == {"status": "active"}
@@ -0,0 +1,96 @@
+from decimal import Decimal
+import json
+import unittest
+
+from boto3.dynamodb.types import Binary
+
+from dynamatic.codecs import (
+    MAGIC,
+    LzmaCodec,
+    ZlibCodec,
+    ZstdCodec,
+    decode_items,
+    decode_value,
+    encode_item,
+    encode_updates,
+)
+from dynamatic.expressions import Increase, Set
+
+TEXT = "the quick brown fox jumps over the lazy dog " * 100
+DOCUMENT = {
+    "name": "fox",
+    "count": Decimal("12345678901234567890.123456789"),
+    "ratio": 0.25,
+    "tags": {"a", "b"},
+    "raw": Binary(b"\x00\x01"),
+    "items": [{"text": TEXT}, None, True],
+}
+
+
+class CodecTestCase(unittest.TestCase):
+    def test_round_trip(self):
+        for codec in (ZlibCodec(), LzmaCodec()):
+            encoded = codec.encode(TEXT)
+            assert isinstance(encoded, Binary)
+            assert encoded.value.startswith(MAGIC)
+            assert len(encoded.value) < len(TEXT) / 10
+            assert decode_value(encoded) == TEXT
+
+            encoded = codec.encode(TEXT.encode())
+            assert decode_value(encoded) == Binary(TEXT.encode())
+
+            decoded = decode_value(codec.encode(DOCUMENT))
+            assert decoded == dict(DOCUMENT, ratio=Decimal("0.25"))
+
+    def test_threshold(self):
+        codec = ZlibCodec(threshold=100)
+        assert codec.encode("x" * 99) == "x" * 99
+        assert isinstance(codec.encode("x" * 100), Binary)
+        assert codec.encode({"a": 1}) == {"a": 1}
+        assert codec.encode(None) is None
+
+    def test_incompressible(self):
+        data = bytes(range(256)) * 4
+        data = bytes(b ^ (i * 7919 % 251) for i, b in enumerate(data))
+        codec = ZlibCodec(threshold=10)
+        if len(codec.compress(data)) >= len(data):
+            assert codec.encode(data) == data
+
+    def test_marker_collision(self):
+        codec = ZlibCodec()
+        raw = MAGIC + b"\x01s"
+        encoded = codec.encode(raw)
+        assert encoded != raw
+        assert decode_value(encoded) == Binary(raw)
+
+    def test_unmarked_values(self):
+        assert decode_value("plain") == "plain"
+        assert decode_value(Binary(b"plain")) == Binary(b"plain")
+        assert decode_value({"a": 1}) == {"a": 1}
+
+    def test_unavailable_codec(self):
+        with self.assertRaises(ValueError):
+            decode_value(Binary(MAGIC + b"\xffs" + b"data"))
+
+    def test_zstd(self):
+        try:
+            codec = ZstdCodec()
+        except ImportError:
+            return
+        assert decode_value(codec.encode(TEXT)) == TEXT
+
+    def test_items_and_updates(self):
+        codecs = {"body": ZlibCodec()}
+        item = {"pk": "1", "body": TEXT}
+        encoded = encode_item(codecs, item)
+        assert item["body"] == TEXT
+        assert isinstance(encoded["body"], Binary)
+        assert decode_items(codecs, [encoded]) == [item]
+
+        updates = encode_updates(codecs, {"body": TEXT, "other": TEXT})
+        assert isinstance(updates[0].value, Binary)
+        assert updates[1].value == TEXT
+
+        updates = encode_updates(codecs, [Increase("body", 1)])
+        assert updates[0].value == 1
+        assert type(encode_updates(codecs, Set("body", TEXT))[0]) is Set
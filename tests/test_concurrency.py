@@ -0,0 +1,158 @@
+import threading
+import time
+import unittest
+
+from dynamatic.concurrency import (
+    ElasticPool,
+    RateLimiter,
+    chunks,
+    merge,
+    prefetch,
+    run_bounded,
+)
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    def test_acquire(self):
+        limiter = RateLimiter(100, burst=10)
+        start = time.monotonic()
+        for _ in range(30):
+            limiter.acquire()
+        # the burst is free, the other 20 units take about 0.2 seconds
+        assert 0.15 < time.monotonic() - start < 1
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+
+
+class RunBoundedTestCase(unittest.TestCase):
+    def test_chunks(self):
+        assert list(chunks(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+        assert list(chunks([], 3)) == []
+
+    def test_run_bounded(self):
+        results = run_bounded(lambda x: x * 2, range(100), 4, "test")
+        assert sorted(results) == [x * 2 for x in range(100)]
+
+    def test_lazy(self):
+        pulled = []
+
+        def tasks():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+
+        results = run_bounded(lambda x: x, tasks(), 2, "test")
+        next(results)
+        assert len(pulled) < 10
+        results.close()
+
+    def test_error(self):
+        started = []
+        lock = threading.Lock()
+
+        def call(x):
+            with lock:
+                started.append(x)
+            if x == 3:
+                raise KeyError(x)
+            time.sleep(0.01)
+            return x
+
+        with self.assertRaises(KeyError):
+            list(run_bounded(call, range(1000), 2, "test"))
+        assert len(started) < 1000
+
+
+class ElasticPoolTestCase(unittest.TestCase):
+    def test_submit(self):
+        pool = ElasticPool("elastic", idle_timeout=0.05)
+        futures = [pool.submit(lambda: time.sleep(0.1)) for _ in range(50)]
+        start = time.monotonic()
+        for future in futures:
+            future.result()
+        # Every call got a thread of its own rather than waiting
+        assert time.monotonic() - start < 0.3
+        # Idle threads are reused and then exit
+        assert pool.submit(lambda: 1).result() == 1
+        time.sleep(0.3)
+        assert not [t for t in threading.enumerate() if t.name.startswith("elastic_")]
+
+    def test_error(self):
+        pool = ElasticPool("test", idle_timeout=0.05)
+        with self.assertRaises(KeyError):
+            pool.submit(lambda: {}["missing"]).result()
+
+
+class PrefetchTestCase(unittest.TestCase):
+    def test_prefetch(self):
+        assert list(prefetch(iter(range(100)), 3)) == list(range(100))
+        assert list(prefetch([], 3)) == []
+
+    def test_read_ahead(self):
+        produced = []
+
+        def values():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        pages = prefetch(values(), 3)
+        assert next(pages) == 0
+        time.sleep(0.1)
+        # 3 buffered plus one waiting to be buffered
+        assert len(produced) == 5
+        pages.close()
+        time.sleep(0.2)
+        assert len(produced) == 5
+
+    def test_overlap(self):
+        def slow():
+            for i in range(5):
+                time.sleep(0.05)
+                yield i
+
+        start = time.monotonic()
+        for _ in prefetch(slow(), 2):
+            time.sleep(0.05)
+        assert time.monotonic() - start < 0.45
+
+    def test_error(self):
+        def failing():
+            yield 1
+            raise KeyError("boom")
+
+        pages = prefetch(failing(), 2)
+        assert next(pages) == 1
+        with self.assertRaises(KeyError):
+            next(pages)
+
+    def test_invalid_depth(self):
+        with self.assertRaises(ValueError):
+            next(prefetch([1], 0))
+
+
+class MergeTestCase(unittest.TestCase):
+    def test_merge(self):
+        merged = list(merge([iter(range(50)), iter(range(50, 60)), []], 4))
+        assert sorted(merged) == list(range(60))
+        assert list(merge([], 4)) == []
+
+    def test_concurrent(self):
+        def slow(start):
+            for i in range(start, start + 3):
+                time.sleep(0.05)
+                yield i
+
+        start = time.monotonic()
+        assert sorted(merge([slow(0), slow(3), slow(6), slow(9)], 2)) == list(range(12))
+        assert time.monotonic() - start < 0.4
+
+    def test_error(self):
+        def failing():
+            raise KeyError("boom")
+            yield
+
+        with self.assertRaises(KeyError):
+            list(merge([iter(range(3)), failing()], 2))
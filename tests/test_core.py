@@ -1,10 +1,12 @@
 import unittest
+from decimal import Decimal
 
 from dynamatic.core import (
     KeyDefinition,
     Stream,
     SSESpecification,
     ProvisionedThroughput,
+    ConnectionConfig,
     BaseTable,
 )
 
@@ -86,6 +88,51 @@ class ProvisionedThroughputTestCase(unittest.TestCase):
         }
 
 
+class ConnectionConfigTestCase(unittest.TestCase):
+    def test_export(self):
+        config = ConnectionConfig(
+            max_pool_connections=64,
+            tcp_keepalive=True,
+            connect_timeout=2,
+            read_timeout=5,
+            retry_mode=ConnectionConfig.RETRY_MODE.ADAPTIVE,
+            max_attempts=4,
+        ).export()
+        assert config.max_pool_connections == 64
+        assert config.tcp_keepalive is True
+        assert config.connect_timeout == 2
+        assert config.read_timeout == 5
+        assert config.retries == {"mode": "adaptive", "max_attempts": 4}
+
+    def test_eq(self):
+        assert ConnectionConfig(max_pool_connections=32) == ConnectionConfig(
+            max_pool_connections=32
+        )
+        assert ConnectionConfig(max_pool_connections=32) != ConnectionConfig()
+        assert ConnectionConfig() != "foobar"
+        assert len({ConnectionConfig(), ConnectionConfig()}) == 1
+
+    def test_shared_resource(self):
+        class FirstTable(BaseTable):
+            name = "FirstTable"
+            connection = ConnectionConfig(max_pool_connections=50)
+
+        class SecondTable(BaseTable):
+            name = "SecondTable"
+            connection = ConnectionConfig(max_pool_connections=50)
+
+        first, second = FirstTable(), SecondTable()
+        assert first.resource is second.resource
+        assert first.resource.meta.client.meta.config.max_pool_connections == 50
+        assert first.get_client() is second.get_client()
+        assert first.get_client() is not first.resource.meta.client
+
+        other = BaseTable(
+            name="Other", connection=ConnectionConfig(max_pool_connections=20)
+        )
+        assert other.resource is not first.resource
+
+
 class BaseTableTestCase(unittest.TestCase):
     def test_init(self):
         table = BaseTable(name="TestTable", tags={"foo": "bar"})
@@ -108,6 +155,31 @@ class BaseTableTestCase(unittest.TestCase):
         assert table.convert_key("foo") == {"pk": "foo"}
         assert table.convert_key(("foo", "bar")) == {"pk": "foo", "sk": "bar"}
 
+    def test_convert_keys(self):
+        class MyTable(BaseTable):
+            name = "MyTable"
+            partition_key = KeyDefinition("pk")
+            sort_key = KeyDefinition("sk", KeyDefinition.DATATYPE.NUMBER)
+
+        table = MyTable()
+        keys = ["foo", ("foo", 1), ["foo", 1.5], ("foo",), iter(["foo"])]
+        converted = table.convert_keys(keys, numeric=BaseTable.NUMERIC.FLOAT)
+        assert converted[:4] == [
+            {"pk": "foo"},
+            {"pk": "foo", "sk": 1},
+            {"pk": "foo", "sk": Decimal("1.5")},
+            {"pk": "foo"},
+        ]
+        assert list(converted[4]) == ["pk"]
+        assert table.convert_keys([("foo", 1.5)]) == [{"pk": "foo", "sk": 1.5}]
+        assert table.convert_keys(iter([])) == []
+
+        table = BaseTable(name="TestTable")
+        assert table.convert_keys([("foo", "bar"), b"baz"]) == [
+            {"pk": "foo"},
+            {"pk": b"baz"},
+        ]
+
     def test_serialize_attributes(self):
         table = BaseTable(name="TestTable")
         response = table.serialize_attributes(["foo", "bar", "biz"])
@@ -119,3 +191,14 @@ class BaseTableTestCase(unittest.TestCase):
                 "#ref2": "biz",
             },
         }
+
+        # The projection is memoized but each call gets its own names
+        response["ExpressionAttributeNames"]["#n0"] = "other"
+        assert table.serialize_attributes(("foo", "bar", "biz")) == {
+            "ProjectionExpression": "#ref0, #ref1, #ref2",
+            "ExpressionAttributeNames": {
+                "#ref0": "foo",
+                "#ref1": "bar",
+                "#ref2": "biz",
+            },
+        }
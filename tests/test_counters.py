@@ -0,0 +1,90 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+
+from dynamatic import Table, KeyDefinition
+from dynamatic.counters import CounterAggregator
+from dynamatic.exceptions import ResourceNotFoundException
+from dynamatic.expressions import Increase
+
+dynamodb = boto3.resource(
+    "dynamodb",
+    endpoint_url="http://localhost:8181",
+    aws_access_key_id="AccessKey",
+    aws_secret_access_key="VerySecretKey",
+    region_name="us-west-2",
+)
+
+
+class MyTable(Table):
+    name = "MyCounterTable"
+    partition_key = KeyDefinition("pk")
+    sort_key = KeyDefinition("sk")
+    billing_mode = Table.BILLING_MODE.PAY_PER_REQUEST
+
+
+class CounterAggregatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.table = MyTable(resource=dynamodb)
+        try:
+            self.table.delete_table()
+        except ResourceNotFoundException:
+            pass
+        self.table.create_table()
+
+    def test_flush(self):
+        with CounterAggregator(self.table, interval=60) as counters:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                for i in range(200):
+                    executor.submit(counters.add, ("tenant1", "usage"), "count")
+                    executor.submit(counters.add, ("tenant2", "usage"), "bytes", i)
+            assert counters.pending() == 2
+            assert counters.flush() == 2
+            assert counters.pending() == 0
+
+            counters.add(("tenant1", "usage"), "count", 5)
+            counters.add(("tenant1", "usage"), "count", -5)
+            assert counters.flush() == 0  # deltas that cancel out aren't sent
+
+        assert self.table.get(("tenant1", "usage"))["count"] == 200
+        assert self.table.get(("tenant2", "usage"))["bytes"] == sum(range(200))
+        assert counters.metrics()["updates"] == 2
+
+    def test_close_flushes(self):
+        counters = CounterAggregator(self.table, interval=60)
+        counters.add(("tenant1", "usage"), "count")
+        counters.close()
+        assert self.table.get(("tenant1", "usage"))["count"] == 1
+        with self.assertRaises(RuntimeError):
+            counters.add(("tenant1", "usage"), "count")
+
+    def test_background_flush(self):
+        with CounterAggregator(self.table, interval=60, max_pending=3) as counters:
+            for i in range(5):
+                counters.add(("tenant1", str(i)), "count")
+            deadline = time.monotonic() + 5
+            while not counters.metrics()["flushes"] and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert counters.metrics()["last_flush_latency"] is not None
+            assert counters.pending() == 0
+
+    def test_increase(self):
+        self.table.put({"pk": "tenant1", "sk": "usage", "count": 10})
+        with CounterAggregator(self.table, expression=Increase) as counters:
+            counters.add(("tenant1", "usage"), "count", 2)
+        assert self.table.get(("tenant1", "usage"))["count"] == 12
+
+    def test_failed_flush_keeps_deltas(self):
+        table = MyTable(name="ThisTableDoesntExist", resource=dynamodb)
+        counters = CounterAggregator(table, interval=60)
+        counters.add(("tenant1", "usage"), "count", 3)
+        with self.assertRaises(ResourceNotFoundException):
+            counters.flush()
+        assert counters.pending() == 1
+        assert counters.metrics()["failed_updates"] == 1
+
+        counters.table = self.table
+        counters.close()
+        assert self.table.get(("tenant1", "usage"))["count"] == 3
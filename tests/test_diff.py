@@ -0,0 +1,118 @@
+from decimal import Decimal
+import unittest
+
+import boto3
+
+from dynamatic import Table, KeyDefinition
+from dynamatic.exceptions import ResourceNotFoundException
+from dynamatic.diff import Difference, canonical, diff_tables
+
+dynamodb = boto3.resource(
+    "dynamodb",
+    endpoint_url="http://localhost:8181",
+    aws_access_key_id="AccessKey",
+    aws_secret_access_key="VerySecretKey",
+    region_name="us-west-2",
+)
+
+
+class MyTable(Table):
+    partition_key = KeyDefinition("pk")
+    sort_key = KeyDefinition("sk", KeyDefinition.DATATYPE.NUMBER)
+    billing_mode = Table.BILLING_MODE.PAY_PER_REQUEST
+
+
+class CanonicalTestCase(unittest.TestCase):
+    def test_canonical(self):
+        a = {"a": {"x", "y"}, "b": Decimal("1.0"), "c": {"k": [1, b"\x00"]}}
+        b = {"c": {"k": [1, b"\x00"]}, "b": Decimal("1"), "a": {"y", "x"}}
+        assert canonical(a) == canonical(b)
+        assert canonical(a) != canonical(dict(a, b=Decimal("2")))
+        assert canonical({"s": {b"\x01", b"\x00"}}) == canonical(
+            {"s": {b"\x00", b"\x01"}}
+        )
+        assert canonical({"f": 1.5, "l": [0.1]}) == canonical(
+            {"f": Decimal("1.5"), "l": [Decimal("0.1")]}
+        )
+
+
+class DiffTablesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.a = MyTable(name="MyDiffTableA", resource=dynamodb)
+        self.b = MyTable(name="MyDiffTableB", resource=dynamodb)
+        for table in (self.a, self.b):
+            try:
+                table.delete_table()
+            except ResourceNotFoundException:
+                pass
+            table.create_table()
+        self.items = [
+            {"pk": str(i % 7), "sk": i, "tags": {"x", str(i)}, "doc": {"n": i}}
+            for i in range(200)
+        ]
+        self.a.batch_write(put_items=self.items)
+        self.b.batch_write(put_items=self.items)
+
+    def diff(self, **kwargs) -> list:
+        kwargs.setdefault("total_segments", 3)
+        differences = diff_tables(self.a, self.b, **kwargs)
+        return sorted(
+            list(differences), key=lambda d: (d.kind, d.key["pk"], d.key["sk"])
+        )
+
+    def test_identical(self):
+        differences = diff_tables(self.a, self.b, total_segments=2)
+        assert list(differences) == []
+        assert differences.stats["items_a"] == 200
+        assert differences.stats["items_b"] == 200
+        assert differences.stats["mismatched_buckets"] == 0
+        assert differences.stats["passes"] == 1
+
+    def test_differences(self):
+        self.b.delete(("1", 1))
+        self.a.delete(("2", 2))
+        self.b.put(dict(self.items[3], doc={"n": -1}))
+        self.b.put({"pk": "x", "sk": 1000})
+
+        expected = [
+            Difference(Difference.CHANGED, {"pk": "3", "sk": 3}),
+            Difference(Difference.ONLY_IN_A, {"pk": "1", "sk": 1}),
+            Difference(Difference.ONLY_IN_B, {"pk": "2", "sk": 2}),
+            Difference(Difference.ONLY_IN_B, {"pk": "x", "sk": 1000}),
+        ]
+        assert self.diff() == expected
+        # small memory budgets spread the comparison over more passes
+        differences = diff_tables(
+            self.a, self.b, total_segments=2, buckets=64, max_items=10
+        )
+        assert len(list(differences)) == 4
+        assert differences.stats["passes"] > 2
+        assert differences.stats["differences"] == 4
+
+    def test_export(self):
+        export = lambda: iter(self.items[:-1])
+        differences = list(diff_tables(self.a, export, total_segments=2))
+        assert differences == [
+            Difference(Difference.ONLY_IN_A, {"pk": str(199 % 7), "sk": 199})
+        ]
+
+        with self.assertRaises(ValueError):
+            diff_tables(export, export)
+        assert list(diff_tables(export, export, key_names=["pk", "sk"])) == []
+
+    def test_float_policy(self):
+        a = MyTable(name="MyDiffTableA", resource=dynamodb, numeric=Table.NUMERIC.FLOAT)
+        a.put({"pk": "f", "sk": 0.5, "price": 1.25})
+        self.b.put({"pk": "f", "sk": Decimal("0.5"), "price": Decimal("1.25")})
+        assert list(diff_tables(a, self.b, total_segments=2)) == []
+
+        export = lambda: iter(self.items + [{"pk": "f", "sk": 0.5, "price": 1.5}])
+        differences = list(diff_tables(a, export, total_segments=2))
+        assert differences == [Difference(Difference.CHANGED, {"pk": "f", "sk": 0.5})]
+
+    def test_early_stop(self):
+        self.b.delete(("1", 1))
+        self.b.delete(("2", 2))
+        differences = iter(diff_tables(self.a, self.b, total_segments=4, workers=2))
+        assert next(differences).kind == Difference.ONLY_IN_A
+        differences.close()
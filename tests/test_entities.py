@@ -0,0 +1,37 @@
+import unittest
+
+from dynamatic.entities import PrefixRouter, prefix_upper_bound
+
+
+class PrefixUpperBoundTestCase(unittest.TestCase):
+    def test_prefix_upper_bound(self):
+        assert prefix_upper_bound("USER#") == "USER$"
+        assert prefix_upper_bound("a\U0010ffff") == "b"
+        assert prefix_upper_bound("퟿") == ""
+        assert prefix_upper_bound("\U0010ffff") is None
+
+
+class PrefixRouterTestCase(unittest.TestCase):
+    def test_route(self):
+        router = PrefixRouter(
+            {"user": "USER#", "order": "ORDER#", "line": "ORDER#LINE#", "meta": "A"}
+        )
+        assert router.lower_bound == "A"
+        assert router.upper_bound == "USER$"
+        assert router.route("USER#1") == "user"
+        assert router.route("ORDER#1") == "order"
+        assert router.route("ORDER#LINE#1") == "line"
+        assert router.route("ORDER#M") == "order"
+        assert router.route("ORDER#") == "order"
+        assert router.route("ORDER") is None
+        assert router.route("INVOICE#1") is None
+        assert router.route("ZZZ") is None
+        assert router.route(1) is None
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            PrefixRouter({})
+        with self.assertRaises(ValueError):
+            PrefixRouter({"a": ""})
+        with self.assertRaises(ValueError):
+            PrefixRouter({"a": "A#", "b": "A#"})
@@ -2,7 +2,11 @@ import unittest
 
 from botocore.exceptions import ClientError
 
-from dynamatic.exceptions import handle_client_error, ResourceNotFoundException
+from dynamatic.exceptions import (
+    handle_client_error,
+    ResourceNotFoundException,
+    ThrottledException,
+)
 
 
 class ExceptionsTestCase(unittest.TestCase):
@@ -25,3 +29,17 @@ class ExceptionsTestCase(unittest.TestCase):
         other_error = ResourceNotFoundException()
         with self.assertRaises(ResourceNotFoundException):
             handle_client_error(other_error)
+
+    def test_handle_client_error_throttled(self):
+        for code in (
+            "ProvisionedThroughputExceededException",
+            "ThrottlingException",
+            "RequestLimitExceeded",
+        ):
+            client_error = ClientError({"Error": {"Code": code}}, operation_name="test")
+            with self.assertRaises(ThrottledException) as raised:
+                handle_client_error(client_error)
+            # Code catching ClientError keeps working
+            assert isinstance(raised.exception, ClientError)
+            assert raised.exception.response["Error"]["Code"] == code
+            assert raised.exception.operation_name == "test"
@@ -0,0 +1,130 @@
+import threading
+import time
+import unittest
+
+import boto3
+
+from dynamatic import Table, KeyDefinition
+from dynamatic.exceptions import ResourceNotFoundException
+from dynamatic.hedging import HedgingPolicy
+
+dynamodb = boto3.resource(
+    "dynamodb",
+    endpoint_url="http://localhost:8181",
+    aws_access_key_id="AccessKey",
+    aws_secret_access_key="VerySecretKey",
+    region_name="us-west-2",
+)
+
+
+class MyTable(Table):
+    name = "MyHedgingTable"
+    partition_key = KeyDefinition("pk")
+    billing_mode = Table.BILLING_MODE.PAY_PER_REQUEST
+
+
+def slow_then_fast():
+    """Returns a read whose first call is slow and later calls are fast"""
+    calls = []
+    lock = threading.Lock()
+
+    def read():
+        with lock:
+            calls.append(None)
+            attempt = len(calls)
+        time.sleep(0.5 if attempt == 1 else 0.01)
+        return attempt
+
+    return read
+
+
+class HedgingPolicyTestCase(unittest.TestCase):
+    def test_fast_read_is_not_hedged(self):
+        policy = HedgingPolicy(delay=0.5)
+        assert policy.call(lambda: "foo") == "foo"
+        assert policy.stats()["hedged"] == 0
+        assert policy.stats()["requests"] == 1
+
+    def test_hedge_wins(self):
+        policy = HedgingPolicy(delay=0.02, budget=1)
+        start = time.monotonic()
+        assert policy.call(slow_then_fast()) == 2
+        assert time.monotonic() - start < 0.4
+        assert policy.stats()["hedged"] == 1
+        assert policy.stats()["hedge_wins"] == 1
+
+    def test_budget(self):
+        policy = HedgingPolicy(delay=0.02, budget=0.1)
+        for _ in range(9):
+            policy.call(lambda: None)
+        policy.call(slow_then_fast())
+        # The budget is spent, the next slow read waits for its only attempt
+        assert policy.call(slow_then_fast()) == 1
+        assert policy.stats()["hedged"] == 1
+
+    def test_budget_under_concurrency(self):
+        policy = HedgingPolicy(delay=0.01, budget=0.1)
+        for _ in range(100):
+            policy.call(lambda: None)
+        # 40 slow reads decide whether to hedge at the same moment
+        threads = [
+            threading.Thread(target=policy.call, args=(lambda: time.sleep(0.1),))
+            for _ in range(40)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert policy.stats()["requests"] == 140
+        assert 10 <= policy.stats()["hedged"] <= 0.1 * 140
+
+    def test_primaries_run_concurrently(self):
+        policy = HedgingPolicy(delay=1)
+        start = time.monotonic()
+        threads = [
+            threading.Thread(target=policy.call, args=(lambda: time.sleep(0.2),))
+            for _ in range(64)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # None of them waited for another's thread
+        assert time.monotonic() - start < 0.35
+
+    def test_failure_prefers_success(self):
+        attempts = []
+
+        def read():
+            attempts.append(None)
+            if len(attempts) == 1:
+                time.sleep(0.05)
+                raise RuntimeError("slow failure")
+            time.sleep(0.1)
+            return "ok"
+
+        policy = HedgingPolicy(delay=0.01, budget=1)
+        assert policy.call(read) == "ok"
+
+    def test_adaptive_delay(self):
+        policy = HedgingPolicy(percentile=50, initial_delay=0.2)
+        assert policy.get_delay() == 0.2
+        for _ in range(50):
+            policy.call(lambda: None)
+        assert policy.get_delay() < 0.2
+
+
+class HedgedTableTestCase(unittest.TestCase):
+    def setUp(self):
+        self.table = MyTable(resource=dynamodb, hedging=HedgingPolicy(delay=0))
+        try:
+            self.table.delete_table()
+        except ResourceNotFoundException:
+            pass
+        self.table.create_table()
+        self.table.put({"pk": "1", "status": "active"})
+
+    def test_get(self):
+        assert self.table.get("1")["status"] == "active"
+        assert self.table.batch_get(["1"])[0]["status"] == "active"
+        assert self.table.hedging.stats()["requests"] == 2
@@ -8,6 +8,7 @@ from dynamatic import (
     LocalSecondaryIndex,
     GlobalSecondaryIndex,
     Key,
+    Attr,
 )
 from dynamatic.indexes import BaseSecondaryIndex
 
@@ -33,6 +34,11 @@ class MyTable(Table):
         partition_key=KeyDefinition("sk"),
         sort_key=KeyDefinition("sequence", KeyDefinition.DATATYPE.NUMBER),
     )
+    status_index = GlobalSecondaryIndex(
+        partition_key=KeyDefinition("status"),
+        sort_key=KeyDefinition("sequence", KeyDefinition.DATATYPE.NUMBER),
+        attributes=["color"],
+    )
 
 
 class BaseSecondaryIndexTestCase(unittest.TestCase):
@@ -45,6 +51,19 @@ class BaseSecondaryIndexTestCase(unittest.TestCase):
             "NonKeyAttributes": ["foo", "bar"],
         }
 
+    def test_get_projected_attributes(self):
+        table = MyTable(resource=dynamodb)
+        assert table.gsi.get_projected_attributes() is None
+
+        index = GlobalSecondaryIndex(
+            partition_key=KeyDefinition("email"), attributes=["name"]
+        )
+        index._table = table
+        assert index.get_projected_attributes() == {"pk", "sk", "email", "name"}
+
+        index.attributes = None
+        assert index.get_projected_attributes() == {"pk", "sk", "email"}
+
 
 class IndexTestCase(unittest.TestCase):
     def setUp(self):
@@ -65,6 +84,72 @@ class IndexTestCase(unittest.TestCase):
         items, _ = self.table.lsi.query(Key("pk").eq("1"))
         assert len(items) == 2  # Only 2 items have the status attribute
 
+    def test_lsi_query_result_format(self):
+        rows, _ = self.table.lsi.query(
+            Key("pk").eq("1"),
+            attributes=["sk", "status"],
+            result_format=Table.RESULT_FORMAT.TUPLE,
+        )
+        assert sorted(rows) == [("1", "active"), ("3", "active")]
+
+    def test_query_fetch_missing(self):
+        self.table.put({"pk": "1", "sk": "1", "status": "new", "sequence": 1})
+        self.table.put(
+            {"pk": "3", "sk": "1", "status": "new", "sequence": 2, "color": "red"}
+        )
+        self.table.update(("1", "1"), {"name": "first", "color": "blue"})
+        self.table.update(("3", "1"), {"name": "second"})
+
+        items, _ = self.table.status_index.query(
+            Key("status").eq("new"),
+            attributes=["sequence", "name", "color"],
+            fetch_missing=True,
+        )
+        assert items == [
+            {"sequence": 1, "name": "first", "color": "blue"},
+            {"sequence": 2, "name": "second", "color": "red"},
+        ]
+
+        rows, _ = self.table.status_index.query(
+            Key("status").eq("new"),
+            attributes=["name"],
+            scan_index_forward=False,
+            fetch_missing=True,
+            result_format=Table.RESULT_FORMAT.TUPLE,
+        )
+        assert rows == [("second",), ("first",)]
+
+        # Without fetch_missing only the projected attributes come back
+        items, _ = self.table.status_index.query(
+            Key("status").eq("new"), attributes=["sequence", "color"]
+        )
+        assert items[0] == {"sequence": 1, "color": "blue"}
+
+        # Filters run on the index, they can't see the fetched attributes
+        items, _ = self.table.status_index.query(
+            Key("status").eq("new"),
+            filter_expression=Attr("sequence").gt(1),
+            attributes=["name"],
+            fetch_missing=True,
+        )
+        assert items == [{"name": "second"}]
+        with self.assertRaises(ValueError):
+            self.table.status_index.query(
+                Key("status").eq("new"),
+                filter_expression=Attr("name").eq("first"),
+                attributes=["name"],
+                fetch_missing=True,
+            )
+
+        table = MyTable(resource=dynamodb, numeric=Table.NUMERIC.FLOAT)
+        items, _ = table.status_index.query(
+            Key("status").eq("new"),
+            filter_expression=Attr("sequence").gt(1.5),
+            attributes=["name"],
+            fetch_missing=True,
+        )
+        assert items == [{"name": "second"}]
+
     def test_lsi_scan(self):
         items, _ = self.table.lsi.scan()
         assert len(items) == 3
@@ -73,6 +158,17 @@ class IndexTestCase(unittest.TestCase):
         items, _ = self.table.gsi.query(Key("sk").eq("3") & Key("sequence").gt(3))
         assert len(items) == 1
 
+    def test_gsi_query_columns(self):
+        columns = self.table.gsi.query_columns(
+            Key("sk").eq("1"), attributes=["pk", "sequence"]
+        )
+        assert list(columns["pk"].values) == ["1", "2"]
+        assert list(columns["sequence"].values) == [1, 4]
+
+    def test_lsi_scan_columns(self):
+        columns = self.table.lsi.scan_columns(attributes=["status"])
+        assert sorted(columns["status"].values) == ["active", "active", "deleted"]
+
     def test_gsi_scan(self):
         items, _ = self.table.gsi.scan()
         assert len(items) == 6
@@ -0,0 +1,116 @@
+import unittest
+
+import boto3
+
+from dynamatic import Table, KeyDefinition, Key
+from dynamatic.exceptions import ResourceNotFoundException
+from dynamatic.middleware import Middleware, OperationContext, run_chain
+
+dynamodb = boto3.resource(
+    "dynamodb",
+    endpoint_url="http://localhost:8181",
+    aws_access_key_id="AccessKey",
+    aws_secret_access_key="VerySecretKey",
+    region_name="us-west-2",
+)
+
+
+class MyTable(Table):
+    name = "MyMiddlewareTable"
+    partition_key = KeyDefinition("pk")
+    sort_key = KeyDefinition("sk")
+    billing_mode = Table.BILLING_MODE.PAY_PER_REQUEST
+
+
+class Recorder(Middleware):
+    def __init__(self):
+        self.contexts = []
+
+    def after(self, context):
+        self.contexts.append(context)
+
+
+class RunChainTestCase(unittest.TestCase):
+    def test_order(self):
+        calls = []
+
+        def outer(context, call_next):
+            calls.append("outer")
+            context.request["outer"] = True
+            return call_next(context)
+
+        def inner(context, call_next):
+            calls.append("inner")
+            response = call_next(context)
+            return dict(response, inner=True)
+
+        def send(request):
+            calls.append("send")
+            return {"request": request}
+
+        context = OperationContext("query", MyTable(), {})
+        response = run_chain([outer, inner], context, send)
+        assert calls == ["outer", "inner", "send"]
+        assert response == {"request": {"outer": True}, "inner": True}
+        assert context.response == {"request": {"outer": True}}
+        assert context.elapsed >= 0
+
+    def test_short_circuit(self):
+        cached = lambda context, call_next: {"cached": True}
+        context = OperationContext("get_item", MyTable(), {})
+        assert run_chain([cached], context, None) == {"cached": True}
+        assert context.response is None
+
+
+class MiddlewareTestCase(unittest.TestCase):
+    def setUp(self):
+        self.recorder = Recorder()
+        self.table = MyTable(resource=dynamodb, middleware=[self.recorder])
+        try:
+            self.table.delete_table()
+        except ResourceNotFoundException:
+            pass
+        self.table.create_table()
+
+    def test_operations(self):
+        self.table.put({"pk": "1", "sk": "1"})
+        self.table.batch_write(put_items=[{"pk": "1", "sk": str(i)} for i in range(5)])
+        self.table.get(("1", "1"))
+        self.table.get(("1", "1"), result_format=Table.RESULT_FORMAT.RAW)
+        self.table.batch_get([("1", "2")])
+        self.table.query(Key("pk").eq("1"))
+        self.table.scan(result_format=Table.RESULT_FORMAT.RAW)
+        self.table.update(("1", "1"), {"a": 1})
+        self.table.delete(("1", "1"))
+
+        operations = [(c.operation, c.raw) for c in self.recorder.contexts]
+        assert operations == [
+            ("delete_table", False),
+            ("create_table", False),
+            ("put_item", False),
+            ("batch_write_item", False),
+            ("get_item", False),
+            ("get_item", True),
+            ("batch_get_item", False),
+            ("query", False),
+            ("scan", True),
+            ("update_item", False),
+            ("delete_item", False),
+        ]
+        query = self.recorder.contexts[7]
+        assert query.table is self.table
+        assert len(query.response["Items"]) == 5
+        assert query.elapsed > 0
+
+    def test_mutate_request(self):
+        def limit(context, call_next):
+            if context.operation == "query":
+                context.request = dict(context.request, Limit=2)
+            return call_next(context)
+
+        self.table.batch_write(put_items=[{"pk": "1", "sk": str(i)} for i in range(5)])
+        self.table.middleware.insert(0, limit)
+        items, last_key = self.table.query(Key("pk").eq("1"))
+        assert len(items) == 2
+        assert last_key is not None
+        assert self.recorder.contexts[-1].request["Limit"] == 2
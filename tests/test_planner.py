@@ -0,0 +1,190 @@
+import unittest
+
+import boto3
+
+from dynamatic import (
+    Table,
+    KeyDefinition,
+    LocalSecondaryIndex,
+    GlobalSecondaryIndex,
+    Key,
+    Attr,
+)
+from dynamatic.exceptions import ResourceNotFoundException
+from dynamatic.planner import Plan, conjuncts, key_attribute, referenced_attributes
+
+dynamodb = boto3.resource(
+    "dynamodb",
+    endpoint_url="http://localhost:8181",
+    aws_access_key_id="AccessKey",
+    aws_secret_access_key="VerySecretKey",
+    region_name="us-west-2",
+)
+
+
+class KeysOnlyIndex(GlobalSecondaryIndex):
+    attributes = None
+
+
+class MyTable(Table):
+    name = "MyPlannerTable"
+    partition_key = KeyDefinition("pk")
+    sort_key = KeyDefinition("sk")
+    billing_mode = Table.BILLING_MODE.PAY_PER_REQUEST
+
+    lsi = LocalSecondaryIndex(sort_key=KeyDefinition("status"))
+    gsi = GlobalSecondaryIndex(
+        partition_key=KeyDefinition("sk"),
+        sort_key=KeyDefinition("sequence", KeyDefinition.DATATYPE.NUMBER),
+    )
+    email = KeysOnlyIndex(partition_key=KeyDefinition("email"))
+    tenant = GlobalSecondaryIndex(
+        partition_key=KeyDefinition("tenant"), attributes=["name"]
+    )
+
+
+class ConditionHelpersTestCase(unittest.TestCase):
+    def test_conjuncts(self):
+        condition = Key("pk").eq("1") & Attr("a").gt(1) & Attr("b").exists()
+        assert len(conjuncts(condition)) == 3
+        assert conjuncts(Attr("a").eq(1) | Attr("b").eq(2))[0].expression_operator
+
+    def test_key_attribute(self):
+        assert key_attribute(Attr("a").between(1, 2)) == "a"
+        assert key_attribute(Attr("a").ne(1)) is None
+        assert key_attribute(Attr("a").size().eq(1)) is None
+
+    def test_referenced_attributes(self):
+        condition = (Attr("a.b").eq(1) | ~Attr("c[0]").exists()) & Attr("d").eq(1)
+        assert referenced_attributes(condition) == {"a", "c", "d"}
+
+
+class QueryPlannerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.table = MyTable(resource=dynamodb)
+
+    def test_base_table(self):
+        plan = self.table.plan(Key("pk").eq("1") & Attr("sk").begins_with("user#"))
+        assert plan.operation == Plan.QUERY
+        assert plan.index is None
+        assert len(plan.key_conditions) == 2
+        assert plan.filter_expression is None
+        assert "base table: chosen" in plan.explain()
+
+    def test_prefers_sort_key(self):
+        plan = self.table.plan(Attr("pk").eq("1") & Attr("status").eq("active"))
+        assert plan.index.name == "lsi"
+        assert "base table: usable but ranked lower" in plan.explain()
+
+    def test_gsi(self):
+        plan = self.table.plan(Attr("sk").eq("1") & Attr("sequence").gt(3))
+        assert plan.index.name == "gsi"
+        assert plan.filter_conditions == []
+
+        plan = self.table.plan(Attr("sk").eq("1"), consistent_read=True)
+        assert plan.operation == Plan.SCAN
+        assert "does not support consistent reads" in plan.explain()
+
+    def test_projection_coverage(self):
+        plan = self.table.plan(Attr("email").eq("a@b.c"), attributes=["pk", "sk"])
+        assert plan.index.name == "email"
+
+        plan = self.table.plan(Attr("email").eq("a@b.c"))
+        assert plan.operation == Plan.SCAN
+        assert "index email: does not project all attributes" in plan.explain()
+
+        plan = self.table.plan(Attr("tenant").eq("t"), attributes=["name", "age"])
+        assert plan.operation == Plan.SCAN
+        assert "index tenant: projection is missing age" in plan.explain()
+
+        plan = self.table.plan(
+            Attr("tenant").eq("t") & Attr("name").begins_with("A"), attributes=["pk"]
+        )
+        assert plan.index.name == "tenant"
+        assert len(plan.filter_conditions) == 1
+
+    def test_scan_fallback(self):
+        plan = self.table.plan(Attr("status").eq("active"))
+        assert plan.operation == Plan.SCAN
+        assert plan.key_condition is None
+        assert plan.filter_expression is not None
+        assert "falling back to a filtered scan" in plan.explain()
+
+    def test_leftover_key_conditions(self):
+        plan = self.table.plan(Attr("pk").eq("1") & Attr("sk").ne("2"))
+        assert plan.index.name == "lsi"
+        assert "base table: leftover conditions on its key attributes" in plan.explain()
+
+        plan = self.table.plan(Attr("pk").eq("1") & Attr("status").ne("2"))
+        assert plan.operation == Plan.QUERY
+        assert plan.index is None
+
+    def test_sort_key_range(self):
+        plan = self.table.plan(
+            Attr("pk").eq("1") & Attr("sk").gt("a") & Attr("sk").lt("c")
+        )
+        assert plan.index is None
+        assert plan.filter_conditions == []
+        assert plan.excluded == [("sk", "a"), ("sk", "c")]
+        assert "key condition: pk = ? AND sk BETWEEN ? AND ?" in plan.explain()
+
+        plan = self.table.plan(
+            Attr("pk").eq("1") & Attr("sk").gte("a") & Attr("sk").lte("c")
+        )
+        assert plan.index is None
+        assert plan.excluded == []
+
+    def test_explain(self):
+        plan = self.table.plan(Attr("pk").eq("1") | Attr("pk").eq("2"))
+        assert plan.operation == Plan.SCAN
+        assert "filter: (pk = ? OR pk = ?)" in plan.explain()
+
+        plan = self.table.plan(Key("pk").eq("1") & ~Attr("x").eq(1))
+        assert "filter: (NOT x = ?)" in plan.explain()
+
+        plan = self.table.plan(Key("pk").eq("1") & Attr("x").size().gt(1))
+        assert "filter: size(x) > ?" in plan.explain()
+
+
+class FindTestCase(unittest.TestCase):
+    def setUp(self):
+        self.table = MyTable(resource=dynamodb)
+        try:
+            self.table.delete_table()
+        except ResourceNotFoundException:
+            pass
+        self.table.create_table()
+        self.table.put({"pk": "1", "sk": "1", "status": "active", "sequence": 1})
+        self.table.put({"pk": "1", "sk": "2", "status": "deleted", "sequence": 2})
+        self.table.put({"pk": "2", "sk": "1", "status": "active", "sequence": 3})
+
+    def test_find(self):
+        items, _ = self.table.find(Attr("pk").eq("1") & Attr("status").eq("active"))
+        assert [item["sk"] for item in items] == ["1"]
+
+        items, _ = self.table.find(Attr("sk").eq("1") & Attr("sequence").gte(2))
+        assert [item["pk"] for item in items] == ["2"]
+
+        items, _ = self.table.find(Attr("status").eq("active"), attributes=["pk"])
+        assert sorted(item["pk"] for item in items) == ["1", "2"]
+
+    def test_find_sort_key_range(self):
+        self.table.put({"pk": "1", "sk": "3", "status": "active", "sequence": 4})
+        condition = Attr("pk").eq("1") & Attr("sk").gt("1") & Attr("sk").lt("3")
+        items, _ = self.table.find(condition)
+        assert [item["sk"] for item in items] == ["2"]
+
+        items, _ = self.table.find(condition, attributes=["status"])
+        assert items == [{"status": "deleted"}]
+
+        condition = Attr("pk").eq("1") & Attr("sk").gt("1") & Attr("sk").lte("3")
+        items, _ = self.table.find(
+            condition, attributes=["sk"], result_format=Table.RESULT_FORMAT.TUPLE
+        )
+        assert items == [("2",), ("3",)]
+
+        condition = Attr("pk").eq("1") & Attr("sk").gt("1") & Attr("sk").lt("3")
+        items, _ = self.table.find(
+            condition, attributes=["status"], result_format=Table.RESULT_FORMAT.RAW
+        )
+        assert items == [{"status": {"S": "deleted"}}]
@@ -0,0 +1,49 @@
+import unittest
+from decimal import Decimal
+
+from boto3.dynamodb.types import Binary
+
+from dynamatic.enums import DATATYPE
+from dynamatic.ranges import split_range
+
+
+class SplitRangeTestCase(unittest.TestCase):
+    def test_numbers(self):
+        assert split_range(0, 100, 4, DATATYPE.NUMBER) == [25, 50, 75]
+        assert split_range(-10, 10, 2, DATATYPE.NUMBER) == [0]
+        # Integers stay integers, so a narrow range yields fewer boundaries
+        assert split_range(0, 3, 8, DATATYPE.NUMBER) == [1, 2]
+        assert split_range(Decimal("0.5"), Decimal("1.5"), 4, DATATYPE.NUMBER) == [
+            Decimal("0.75"),
+            Decimal("1"),
+            Decimal("1.25"),
+        ]
+        assert split_range(5, 5, 4, DATATYPE.NUMBER) == []
+
+    def test_strings(self):
+        boundaries = split_range("ORDER#0001", "ORDER#9999", 4, DATATYPE.STRING)
+        assert len(boundaries) == 3
+        assert boundaries == sorted(boundaries)
+        assert all(b.startswith("ORDER#") for b in boundaries)
+        assert [b[6] for b in boundaries] == ["2", "4", "7"]
+
+        boundaries = split_range("a", "b", 4, DATATYPE.STRING)
+        assert all("a" < b < "b" for b in boundaries)
+        assert len(boundaries) == 3
+
+        # Outside ASCII the whole code point space is split, minus surrogates
+        boundaries = split_range("a", "\U0010ffff", 16, DATATYPE.STRING)
+        assert len(boundaries) == 15
+        assert boundaries == sorted(boundaries)
+        assert not any(0xD800 <= ord(b[0]) <= 0xDFFF for b in boundaries)
+        assert split_range("abc", "abc", 4, DATATYPE.STRING) == []
+
+    def test_binary(self):
+        boundaries = split_range(b"\x00", Binary(b"\xff"), 4, DATATYPE.BINARY)
+        assert [b.value for b in boundaries] == [b"?\xc0", b"\x7f\x80", b"\xbf@"]
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            split_range(0, 1, 0, DATATYPE.NUMBER)
+        with self.assertRaises(ValueError):
+            split_range(True, False, 2, DATATYPE.BOOLEAN)
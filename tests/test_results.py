@@ -0,0 +1,148 @@
+import unittest
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import Attr, Key
+
+from dynamatic.enums import RESULT_FORMAT, NUMERIC
+from dynamatic.results import (
+    Column,
+    build_columns,
+    to_native,
+    to_float,
+    decode_numbers,
+    encode_numbers,
+    encode_condition,
+    row_type,
+    format_items,
+)
+
+
+class ResultsTestCase(unittest.TestCase):
+    def test_to_native(self):
+        assert to_native(Decimal("3")) == 3
+        assert isinstance(to_native(Decimal("3")), int)
+        assert to_native(Decimal("3.5")) == 3.5
+        assert isinstance(to_native(Decimal("3.5")), float)
+        assert to_native({"a": [Decimal("1"), {"b": Decimal("0.25")}]}) == {
+            "a": [1, {"b": 0.25}]
+        }
+        assert to_native({Decimal("1"), Decimal("2")}) == {1, 2}
+        assert to_native({"foo", "bar"}) == {"foo", "bar"}
+        assert to_native("foo") == "foo"
+
+    def test_to_float(self):
+        assert to_float({"a": Decimal("3"), "b": [Decimal("0.5")]}) == {
+            "a": 3.0,
+            "b": [0.5],
+        }
+        assert isinstance(to_float(Decimal("3")), float)
+
+    def test_decode_numbers(self):
+        item = {"a": Decimal("3")}
+        assert decode_numbers(item) is item
+        assert isinstance(decode_numbers(item, NUMERIC.NATIVE)["a"], int)
+        assert isinstance(decode_numbers(item, NUMERIC.FLOAT)["a"], float)
+        with self.assertRaises(ValueError):
+            decode_numbers(item, "foo")
+
+    def test_encode_numbers(self):
+        assert encode_numbers(0.1) == Decimal("0.1")
+        assert encode_numbers({"a": [1.5, 2], "b": {0.25}}) == {
+            "a": [Decimal("1.5"), 2],
+            "b": {Decimal("0.25")},
+        }
+        assert encode_numbers(("foo", 2.5)) == ("foo", Decimal("2.5"))
+
+    def test_row_type(self):
+        Row = row_type(("pk", "sequence", "not-an-identifier"))
+        assert row_type(("pk", "sequence", "not-an-identifier")) is Row
+        row = Row("foo", 1, 2)
+        assert row.pk == "foo"
+        assert row.sequence == 1
+        assert row[2] == 2
+
+    def test_encode_condition(self):
+        condition = Key("pk").eq(1.5) & (
+            Attr("a").size().between(1, 2.5) | ~Attr("b").is_in([0.5, "x"])
+        )
+        encoded = encode_condition(condition)
+        assert encoded == Key("pk").eq(Decimal("1.5")) & (
+            Attr("a").size().between(1, Decimal("2.5"))
+            | ~Attr("b").is_in([Decimal("0.5"), "x"])
+        )
+        # The original condition is left alone
+        assert condition.get_expression()["values"][0] == Key("pk").eq(1.5)
+        assert encode_condition("#a = :a") == "#a = :a"
+        assert encode_condition(None) is None
+
+    def test_format_items(self):
+        items = [
+            {"pk": "1", "sequence": Decimal("1")},
+            {"pk": "2", "sequence": Decimal("2.5"), "status": "active"},
+        ]
+        assert format_items(items) is items
+        assert format_items(items, ["pk", "status"], RESULT_FORMAT.TUPLE) == [
+            ("1", None),
+            ("2", "active"),
+        ]
+        rows = format_items(items, ["sequence", "pk"], RESULT_FORMAT.ROW)
+        assert rows[0].sequence == 1
+        assert rows[1].sequence == 2.5
+        assert rows[1].pk == "2"
+
+        floats = format_items(items, ["sequence"], RESULT_FORMAT.TUPLE, NUMERIC.FLOAT)
+        assert isinstance(floats[0][0], float)
+        assert format_items(items, numeric=NUMERIC.NATIVE)[1]["sequence"] == 2.5
+
+        with self.assertRaises(ValueError):
+            format_items(items, None, RESULT_FORMAT.ROW)
+
+
+class ColumnTestCase(unittest.TestCase):
+    def values(self, column):
+        return list(column.values)
+
+    def test_numbers(self):
+        column = Column("sequence")
+        column.append(None)
+        column.append({"N": "1"})
+        column.append({"N": "2"})
+        assert column.kind == Column.NUMBER
+        assert column.values.typecode == "q"
+        assert list(column.values) == [0, 1, 2]
+        assert list(column.mask) == [1, 0, 0]
+
+        column.append({"N": "2.5"})
+        assert column.values.typecode == "d"
+        assert list(column.values) == [0, 1, 2, 2.5]
+
+        column.append({"N": str(2 ** 70)})
+        assert column.values[-1] == float(2 ** 70)
+
+    def test_strings(self):
+        column = Column("status")
+        column.append({"S": "active"})
+        column.append(None)
+        assert column.kind == Column.STRING
+        assert column.values == ["active", None]
+        assert list(column.mask) == [0, 1]
+
+    def test_mixed(self):
+        column = Column("mixed")
+        column.append({"N": "1"})
+        column.append(None)
+        column.append({"S": "foo"})
+        column.append({"L": [{"N": "1.5"}]})
+        assert column.kind == Column.OBJECT
+        assert column.values == [1, None, "foo", [1.5]]
+        assert len(column) == 4
+
+    def test_build_columns(self):
+        pages = [
+            [{"pk": {"S": "1"}, "sequence": {"N": "1"}}],
+            [{"pk": {"S": "2"}}, {"pk": {"S": "3"}, "sequence": {"N": "3"}}],
+        ]
+        columns = build_columns(["pk", "sequence"], pages)
+        assert list(columns["pk"].values) == ["1", "2", "3"]
+        assert list(columns["sequence"].values) == [1, 0, 3]
+        assert [bool(m) for m in columns["sequence"].mask] == [False, True, False]
@@ -0,0 +1,209 @@
+import os
+import tempfile
+import threading
+import unittest
+from decimal import Decimal
+
+import boto3
+
+from dynamatic import Table, KeyDefinition, GlobalSecondaryIndex
+from dynamatic.exceptions import ResourceNotFoundException
+from dynamatic.scanning import (
+    SegmentProgress,
+    MemoryCheckpointStore,
+    FileCheckpointStore,
+    ScanRunner,
+    choose_segments,
+)
+
+dynamodb = boto3.resource(
+    "dynamodb",
+    endpoint_url="http://localhost:8181",
+    aws_access_key_id="AccessKey",
+    aws_secret_access_key="VerySecretKey",
+    region_name="us-west-2",
+)
+
+
+class MyTable(Table):
+    name = "MyScanTable"
+    partition_key = KeyDefinition("pk")
+    sort_key = KeyDefinition("sk", KeyDefinition.DATATYPE.NUMBER)
+    billing_mode = Table.BILLING_MODE.PAY_PER_REQUEST
+
+    gsi = GlobalSecondaryIndex(partition_key=KeyDefinition("status"))
+
+
+class CheckpointStoreTestCase(unittest.TestCase):
+    def assert_round_trip(self, store):
+        progress = SegmentProgress(
+            1, last_key={"pk": "foo", "sk": Decimal("2"), "bin": b"\x00"}, items=5
+        )
+        store.save("scan", progress)
+        store.save("scan", SegmentProgress(0, done=True))
+        loaded = store.load("scan")
+        assert loaded[1].last_key == {"pk": "foo", "sk": Decimal("2"), "bin": b"\x00"}
+        assert loaded[1].items == 5
+        assert not loaded[1].done
+        assert loaded[0].done
+        assert store.load("other") == {}
+
+        store.clear("scan")
+        assert store.load("scan") == {}
+
+    def test_memory_store(self):
+        self.assert_round_trip(MemoryCheckpointStore())
+
+    def test_file_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assert_round_trip(FileCheckpointStore(directory))
+            # A new store over the same directory sees the saved progress
+            FileCheckpointStore(directory).save("scan:1", SegmentProgress(3))
+            assert 3 in FileCheckpointStore(directory).load("scan:1")
+
+    def test_file_store_segments(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = FileCheckpointStore(directory)
+            store.save("scan", SegmentProgress(0, items=1))
+            store.save("scan", SegmentProgress(1, items=2))
+            # each save replaces only its own segment's file
+            assert sorted(os.listdir(os.path.join(directory, "scan"))) == [
+                "0.json",
+                "1.json",
+            ]
+            store.save("scan", SegmentProgress(0, items=3))
+            loaded = store.load("scan")
+            assert (loaded[0].items, loaded[1].items) == (3, 2)
+
+
+class ChooseSegmentsTestCase(unittest.TestCase):
+    def test_small_table(self):
+        assert choose_segments(0) == (1, 1)
+        assert choose_segments(500 * 1024, 1000) == (1, 1)
+
+    def test_capacity(self):
+        gigabyte = 1024**3
+        # 1000 pages, one worker is plenty for 100 read units
+        assert choose_segments(gigabyte, read_capacity=100) == (4, 1)
+        # 10000 units at 128 units per page is 78 pages a second
+        assert choose_segments(gigabyte, read_capacity=10000) == (16, 4)
+        # strongly consistent pages cost twice as much
+        assert choose_segments(gigabyte, read_capacity=10000, consistent_read=True) == (
+            8,
+            2,
+        )
+        # on-demand tables use up to max_workers
+        assert choose_segments(gigabyte, max_workers=8, oversplit=2) == (16, 8)
+
+    def test_page_size(self):
+        # 100 byte items read 10 at a time make 1KB pages
+        assert choose_segments(100 * 1024, 1024, page_size=10) == (64, 16)
+        assert choose_segments(100 * 1024, 1024, page_size=2000) == (1, 1)
+
+
+class ScanRunnerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.table = MyTable(resource=dynamodb)
+        try:
+            self.table.delete_table()
+        except ResourceNotFoundException:
+            pass
+        self.table.create_table()
+        for i in range(20):
+            self.table.put({"pk": str(i % 4), "sk": i, "status": "active"})
+
+    def test_run(self):
+        seen = []
+        lock = threading.Lock()
+
+        def collect(items):
+            with lock:
+                seen.extend(item["sk"] for item in items)
+
+        runner = ScanRunner(self.table, total_segments=3, page_size=2)
+        runner.run(collect)
+        assert sorted(seen) == list(range(20))
+        assert runner.progress()["done"]
+        assert runner.progress()["items"] == 20
+
+    def test_resume(self):
+        store = MemoryCheckpointStore()
+        seen = []
+
+        def fail_after_three_pages(items):
+            if len(seen) >= 6:
+                raise RuntimeError("preempted")
+            seen.extend(item["sk"] for item in items)
+
+        runner = ScanRunner(self.table, store=store, page_size=2)
+        with self.assertRaises(RuntimeError):
+            runner.run(fail_after_three_pages)
+        assert runner.progress()["items"] == 6
+        assert not runner.progress()["done"]
+
+        resumed = ScanRunner(self.table, store=store, page_size=2)
+        resumed.run(lambda items: seen.extend(item["sk"] for item in items))
+        assert sorted(seen) == list(range(20))
+        assert resumed.progress()["done"]
+
+        resumed.reset()
+        assert resumed.progress()["items"] == 0
+
+    def test_float_policy(self):
+        table = MyTable(resource=dynamodb, numeric=Table.NUMERIC.FLOAT)
+        table.put({"pk": "f", "sk": 0.5})
+        with tempfile.TemporaryDirectory() as directory:
+            store = FileCheckpointStore(directory)
+            seen = []
+            runner = ScanRunner(table, store=store, page_size=2)
+            runner.run(seen.extend)
+            assert len(seen) == 21
+            assert 0.5 in [item["sk"] for item in seen]
+
+    def test_resume_other_segments(self):
+        store = MemoryCheckpointStore()
+        store.save("scan", SegmentProgress(1, last_key={"pk": "1"}, total_segments=2))
+        runner = ScanRunner(self.table, total_segments=4, store=store, scan_id="scan")
+        with self.assertRaises(ValueError):
+            runner.run(lambda items: None)
+        # checkpoints saved without a segment count can't be past the last one
+        store.save("other", SegmentProgress(3, last_key={"pk": "1"}))
+        runner = ScanRunner(self.table, total_segments=2, store=store, scan_id="other")
+        with self.assertRaises(ValueError):
+            runner.run(lambda items: None)
+
+    def test_auto(self):
+        store = MemoryCheckpointStore()
+        runner = ScanRunner(self.table, ScanRunner.AUTO, store=store, page_size=2)
+        assert runner.scan_id == "MyScanTable.auto"
+        runner._describe_source = lambda: {
+            "size_bytes": 20 * 100,
+            "item_count": 20,
+            "read_capacity": None,
+        }
+        seen = []
+        runner.run(seen.extend)
+        assert len(seen) == 20
+        assert runner.total_segments == 10
+        assert runner.workers == 10
+        assert store.load(runner.scan_id)[0].total_segments == 10
+
+        # a resumed auto scan keeps its segment count
+        resumed = ScanRunner(self.table, ScanRunner.AUTO, store=store)
+        resumed.run(seen.extend)
+        assert resumed.total_segments == 10
+        assert len(seen) == 20
+
+    def test_describe_source(self):
+        described = ScanRunner(self.table)._describe_source()
+        assert set(described) == {"size_bytes", "item_count", "read_capacity"}
+        assert described["read_capacity"] is None
+        described = ScanRunner(self.table.gsi)._describe_source()
+        assert set(described) == {"size_bytes", "item_count", "read_capacity"}
+
+    def test_index_scan(self):
+        seen = []
+        runner = ScanRunner(self.table.gsi, total_segments=2)
+        assert runner.scan_id == "MyScanTable.gsi.2"
+        runner.run(seen.extend)
+        assert len(seen) == 20
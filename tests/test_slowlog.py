@@ -0,0 +1,98 @@
+import unittest
+
+import boto3
+
+from dynamatic import Table, KeyDefinition, Key, Attr
+from dynamatic.exceptions import ResourceNotFoundException
+from dynamatic.slowlog import SlowOperationLog, expression_shape
+
+dynamodb = boto3.resource(
+    "dynamodb",
+    endpoint_url="http://localhost:8181",
+    aws_access_key_id="AccessKey",
+    aws_secret_access_key="VerySecretKey",
+    region_name="us-west-2",
+)
+
+
+class MyTable(Table):
+    name = "MySlowLogTable"
+    partition_key = KeyDefinition("pk")
+    sort_key = KeyDefinition("sk")
+    billing_mode = Table.BILLING_MODE.PAY_PER_REQUEST
+
+
+class ExpressionShapeTestCase(unittest.TestCase):
+    def test_expression_shape(self):
+        condition = Key("pk").eq("secret") & Key("sk").begins_with("USER#")
+        shape = expression_shape(condition, is_key_condition=True)
+        assert shape == "(pk = ? AND begins_with(sk, ?))"
+        assert "secret" not in shape
+
+        shape = expression_shape(Attr("a").gt(1) | Attr("b").is_in([1, 2]))
+        assert shape == "(a > ? OR b IN (?, ?))"
+
+        names = {"#ref0": "a", "#ref10": "b"}
+        assert expression_shape("#ref0, #ref10", names) == "a, b"
+        assert expression_shape(None) is None
+
+
+class SlowOperationLogTestCase(unittest.TestCase):
+    def setUp(self):
+        self.table = MyTable(resource=dynamodb)
+        try:
+            self.table.delete_table()
+        except ResourceNotFoundException:
+            pass
+        self.table.create_table()
+        self.table.batch_write(
+            put_items=[{"pk": "1", "sk": str(i), "n": i} for i in range(10)]
+        )
+
+    def test_threshold(self):
+        log = SlowOperationLog(threshold=0)
+        self.table.middleware = [log]
+        self.table.query(
+            Key("pk").eq("1"),
+            filter_expression=Attr("n").gt(7),
+            attributes=["n"],
+            limit=5,
+        )
+        (record,) = log.dump()
+        assert record["operation"] == "query"
+        assert record["table"] == "MySlowLogTable"
+        assert record["slow"]
+        assert record["key_condition"] == "pk = ?"
+        assert record["filter"] == "n > ?"
+        assert record["projection"] == "n"
+        assert record["limit"] == 5
+        assert record["has_more"]
+        assert not record["continued"]
+        assert (record["returned"], record["scanned"]) == (0, 5)
+        assert record["consumed_capacity"] > 0
+
+        log.clear()
+        self.table.get(("1", "1"))
+        assert [r["returned"] for r in log.dump()] == [1]
+
+    def test_sampling(self):
+        log = SlowOperationLog(threshold=60, capacity=3)
+        self.table.middleware = [log]
+        self.table.get(("1", "1"))
+        assert log.dump() == []
+
+        log.sample_rate = 1
+        for i in range(5):
+            self.table.get(("1", str(i)))
+        records = log.dump()
+        assert len(records) == 3
+        assert not any(r["slow"] for r in records)
+        assert log.dump(slow_only=True) == []
+
+    def test_error(self):
+        records = []
+        log = SlowOperationLog(threshold=0, on_record=records.append)
+        self.table.middleware = [log]
+        with self.assertRaises(Exception):
+            self.table.query(Key("missing").eq("1"))
+        assert records[0]["error"] is not None
@@ -0,0 +1,184 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import boto3
+from botocore.exceptions import ClientError
+
+from dynamatic import Table, KeyDefinition, Key
+from dynamatic.exceptions import ResourceNotFoundException
+from dynamatic.expressions import Set
+from dynamatic.spool import WriteSpool
+
+dynamodb = boto3.resource(
+    "dynamodb",
+    endpoint_url="http://localhost:8181",
+    aws_access_key_id="AccessKey",
+    aws_secret_access_key="VerySecretKey",
+    region_name="us-west-2",
+)
+
+
+class MyTable(Table):
+    name = "MySpoolTable"
+    partition_key = KeyDefinition("pk")
+    sort_key = KeyDefinition("sk")
+    billing_mode = Table.BILLING_MODE.PAY_PER_REQUEST
+
+
+WRITES = ("put_item", "update_item", "delete_item", "batch_write_item")
+
+
+class Throttle:
+    """Rejects writes with a throttling error while enabled"""
+
+    def __init__(self):
+        self.enabled = False
+        self.operations = []
+
+    def __call__(self, context, call_next):
+        if self.enabled and context.operation in WRITES:
+            raise ClientError(
+                {"Error": {"Code": "ProvisionedThroughputExceededException"}},
+                context.operation,
+            )
+        self.operations.append(context.operation)
+        return call_next(context)
+
+
+class WriteSpoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.throttle = Throttle()
+        self.table = MyTable(
+            resource=dynamodb,
+            middleware=[self.throttle],
+            numeric=Table.NUMERIC.FLOAT,
+        )
+        try:
+            self.table.delete_table()
+        except ResourceNotFoundException:
+            pass
+        self.table.create_table()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def items(self):
+        items, _ = self.table.query(Key("pk").eq("1"), consistent_read=True)
+        return items
+
+    def test_direct(self):
+        with WriteSpool(self.table, self.directory) as spool:
+            assert spool.put({"pk": "1", "sk": "1", "a": 1.5})
+            assert spool.update(("1", "1"), Set("b", 2))
+            assert spool.put({"pk": "1", "sk": "2"})
+            assert spool.delete(("1", "2"))
+            assert spool.stats()["direct"] == 4
+            assert spool.pending() == 0
+        assert self.items() == [{"pk": "1", "sk": "1", "a": 1.5, "b": 2}]
+
+    def test_throttled(self):
+        spool = WriteSpool(self.table, self.directory, fsync=False)
+        self.throttle.enabled = True
+        assert not spool.put({"pk": "1", "sk": "1", "a": 1.5})
+        self.throttle.enabled = False
+        # Writes queue behind the backlog to keep their order
+        assert not spool.update(("1", "1"), Set("b", {"x": b"bytes"}))
+        assert not spool.put({"pk": "1", "sk": "2", "c": {1, 2}})
+        assert not spool.delete(("1", "2"))
+        assert spool.flush(timeout=10)
+        spool.close()
+
+        assert self.items() == [
+            {"pk": "1", "sk": "1", "a": 1.5, "b": {"x": b"bytes"}},
+        ]
+        stats = spool.stats()
+        assert stats["spooled"] == 4
+        assert stats["replayed"] == 4
+        assert stats["throttled"] >= 1
+        assert stats["pending"] == 0
+
+    def test_deferred_batches(self):
+        # Spool every write before a drainer replays any of them
+        spool = WriteSpool(self.table, self.directory, fsync=False, max_backoff=0.05)
+        self.throttle.enabled = True
+        for i in range(30):
+            assert not spool.put({"pk": "1", "sk": f"{i:02d}"}, deferred=True)
+        spool.put({"pk": "1", "sk": "29", "a": 1}, deferred=True)
+        spool.close()
+        self.throttle.enabled = False
+
+        spool = WriteSpool(self.table, self.directory, fsync=False)
+        assert spool.flush(timeout=10)
+        spool.close()
+
+        items = self.items()
+        assert len(items) == 30
+        assert items[-1] == {"pk": "1", "sk": "29", "a": 1}
+        assert self.throttle.operations.count("batch_write_item") == 3
+
+    def test_recovery(self):
+        spool = WriteSpool(self.table, self.directory, segment_bytes=100)
+        self.throttle.enabled = True
+        for i in range(5):
+            spool.put({"pk": "1", "sk": str(i)})
+        spool.close()
+        assert len(os.listdir(self.directory)) > 2
+
+        # A crash in the middle of an append leaves a torn record
+        segments = sorted(n for n in os.listdir(self.directory) if n.endswith(".log"))
+        with open(os.path.join(self.directory, segments[-1]), "ab") as f:
+            f.write(b"\x01\x00\x00")
+
+        self.throttle.enabled = False
+        with WriteSpool(self.table, self.directory) as spool:
+            assert spool.pending() == 5
+            assert spool.flush(timeout=10)
+        assert [item["sk"] for item in self.items()] == ["0", "1", "2", "3", "4"]
+        # Drained segments are removed, the last one is kept for writing
+        assert sorted(os.listdir(self.directory)) == ["checkpoint.json", segments[-1]]
+
+    def test_corrupt_record(self):
+        spool = WriteSpool(self.table, self.directory)
+        self.throttle.enabled = True
+        for i in range(5):
+            spool.put({"pk": "1", "sk": str(i), "padding": "x" * 20})
+        spool.close()
+
+        # Damage the third record's payload, the records after it are intact
+        (segment,) = [n for n in os.listdir(self.directory) if n.endswith(".log")]
+        path = os.path.join(self.directory, segment)
+        with open(path, "rb") as f:
+            data = bytearray(f.read())
+        record_size = len(data) // 5
+        data[record_size * 2 + record_size // 2] ^= 0xFF
+        with open(path, "wb") as f:
+            f.write(data)
+
+        self.throttle.enabled = False
+        with self.assertLogs("dynamatic.spool", "WARNING"):
+            spool = WriteSpool(self.table, self.directory)
+        with spool:
+            assert spool.pending() == 4
+            assert spool.stats()["corrupt"] == 1
+            assert spool.flush(timeout=10)
+        assert [item["sk"] for item in self.items()] == ["0", "1", "3", "4"]
+
+    def test_errors(self):
+        errors = []
+        spool = WriteSpool(
+            self.table,
+            self.directory,
+            fsync=False,
+            on_error=lambda kind, request, error: errors.append((kind, request)),
+        )
+        spool.update(("1", "1"), Set("a", "x"), deferred=True)
+        spool.update(("1", "1"), Set("sk", "3"), deferred=True)
+        spool.put({"pk": "1", "sk": "2"}, deferred=True)
+        assert spool.flush(timeout=10)
+        spool.close()
+
+        assert [kind for kind, _ in errors] == ["update"]
+        assert errors[0][1]["Key"] == {"pk": "1", "sk": "1"}
+        assert spool.stats()["failed"] == 1
+        assert [item["sk"] for item in self.items()] == ["1", "2"]
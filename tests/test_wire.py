@@ -0,0 +1,75 @@
+import json
+import unittest
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import Key, Attr
+
+from dynamatic.wire import serialize_item, deserialize_item, build_request, to_json
+
+
+class WireTestCase(unittest.TestCase):
+    def test_serialize_deserialize_item(self):
+        item = {"pk": "foo", "sequence": Decimal("1"), "tags": {"a"}}
+        serialized = serialize_item(item)
+        assert serialized == {
+            "pk": {"S": "foo"},
+            "sequence": {"N": "1"},
+            "tags": {"SS": ["a"]},
+        }
+        assert deserialize_item(serialized) == item
+
+    def test_build_request(self):
+        request = build_request(
+            {
+                "KeyConditionExpression": Key("pk").eq("foo") & Key("sk").gt("1"),
+                "FilterExpression": Attr("status").eq("active"),
+                "ProjectionExpression": "#ref0",
+                "ExpressionAttributeNames": {"#ref0": "status"},
+                "ExclusiveStartKey": {"pk": "foo", "sk": "1"},
+                "Limit": 10,
+            }
+        )
+        assert request["KeyConditionExpression"] == "(#n0 = :v0 AND #n1 > :v1)"
+        assert request["FilterExpression"] == "#n2 = :v2"
+        assert request["ExpressionAttributeNames"] == {
+            "#ref0": "status",
+            "#n0": "pk",
+            "#n1": "sk",
+            "#n2": "status",
+        }
+        assert request["ExpressionAttributeValues"] == {
+            ":v0": {"S": "foo"},
+            ":v1": {"S": "1"},
+            ":v2": {"S": "active"},
+        }
+        assert request["ExclusiveStartKey"] == {"pk": {"S": "foo"}, "sk": {"S": "1"}}
+        assert request["Limit"] == 10
+
+    def test_to_json(self):
+        item = {
+            "pk": {"S": 'quote " and é'},
+            "count": {"N": "-12.5"},
+            "flag": {"BOOL": True},
+            "nothing": {"NULL": True},
+            "nested": {"M": {"list": {"L": [{"N": "1"}, {"S": "a"}]}}},
+            "strings": {"SS": ["a", "b"]},
+            "numbers": {"NS": ["1", "2"]},
+            "blob": {"B": b"\x00\x01"},
+            "blobs": {"BS": [b"\x02"]},
+        }
+        assert json.loads(to_json(item)) == {
+            "pk": 'quote " and é',
+            "count": -12.5,
+            "flag": True,
+            "nothing": None,
+            "nested": {"list": [1, "a"]},
+            "strings": ["a", "b"],
+            "numbers": [1, 2],
+            "blob": "AAE=",
+            "blobs": ["Ag=="],
+        }
+        assert json.loads(to_json([item, {"pk": {"S": "bar"}}]))[1] == {"pk": "bar"}
+        assert to_json([]) == b"[]"
+
+        with self.assertRaises(TypeError):
+            to_json({"foo": {"XX": "bar"}})